@@ -2,7 +2,9 @@ import sqlite3
 from PyQt5.QtWidgets import (QWidget, QLabel, QLineEdit, QPushButton,
                              QVBoxLayout, QMessageBox)
 
-DB_FILE = "user.db"
+from db_connection import USER_DB, connection, read_connection
+
+DB_FILE = USER_DB
 
 class ProfileManager(QWidget):
     def __init__(self, user_id):
@@ -39,11 +41,9 @@ class ProfileManager(QWidget):
         self.setLayout(layout)
 
     def load_user_data(self):
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute("SELECT name, username, email FROM users WHERE id=?", (self.user_id,))
-        user = cursor.fetchone()
-        conn.close()
+        with read_connection(DB_FILE) as conn:
+            cursor = conn.execute("SELECT name, username, email FROM users WHERE id=?", (self.user_id,))
+            user = cursor.fetchone()
 
         if user:
             self.name_edit.setText(user[0])
@@ -58,15 +58,11 @@ class ProfileManager(QWidget):
             QMessageBox.warning(self, "Error", "Name and email cannot be empty.")
             return
 
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
         try:
-            cursor.execute("""
-                UPDATE users SET name=?, email=? WHERE id=?
-            """, (name, email, self.user_id))
-            conn.commit()
+            with connection(DB_FILE) as conn:
+                conn.execute("""
+                    UPDATE users SET name=?, email=? WHERE id=?
+                """, (name, email, self.user_id))
             QMessageBox.information(self, "Success", "Profile updated successfully!")
         except sqlite3.IntegrityError:
             QMessageBox.warning(self, "Error", "Email already in use.")
-        finally:
-            conn.close()
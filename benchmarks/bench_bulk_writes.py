@@ -0,0 +1,106 @@
+"""Compare per-row writes with the batched database.py write API.
+
+For tasks (user.db) and chat messages (study_room.db) the script inserts the
+same rows three ways on a scratch database and reports rows per second:
+
+    per-call      insert_task / insert_message, one commit per row
+    transaction   the same calls grouped inside db_connection.transaction()
+    bulk          insert_tasks / insert_messages, one executemany per batch
+
+Run from the repository root:
+    python benchmarks/bench_bulk_writes.py [--rows 20000] [--batch 1000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from db_connection import STUDY_ROOM_DB, USER_DB, close_connection, connection, transaction
+
+
+def task_rows(count):
+    return [(f"Task {i}", "Study", f"2024-01-{i % 28 + 1:02d}", f"{i % 24:02d}:00", "") for i in range(count)]
+
+
+def message_rows(count):
+    return [(f"user{i % 50}", f"message number {i}", None) for i in range(count)]
+
+
+def clear(db_file, table):
+    with connection(db_file) as conn:
+        conn.execute(f"DELETE FROM {table}")
+
+
+def per_call_tasks(rows, batch):
+    for row in rows:
+        database.insert_task(*row)
+
+
+def per_call_messages(rows, batch):
+    for sender, message, _ in rows:
+        database.insert_message(sender, message)
+
+
+def grouped(db_file, insert_one):
+    def run(rows, batch):
+        for start in range(0, len(rows), batch):
+            with transaction(db_file):
+                for row in rows[start:start + batch]:
+                    insert_one(row)
+    return run
+
+
+def bulk(insert_many):
+    def run(rows, batch):
+        for start in range(0, len(rows), batch):
+            insert_many(rows[start:start + batch])
+    return run
+
+
+def time_case(label, func, rows, batch, db_file, table):
+    clear(db_file, table)
+    start = time.perf_counter()
+    func(rows, batch)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<12} {len(rows) / elapsed:>12,.0f} rows/s  ({elapsed:.2f}s)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--batch', type=int, default=1000, help="rows per transaction or executemany")
+    parser.add_argument('--per-call-rows', type=int, default=2000,
+                        help="rows for the one-commit-per-row case, which is much slower")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        database.create_task_table()
+        database.create_study_room_tables()
+
+        tasks = task_rows(args.rows)
+        print(f"tasks ({args.rows} rows, batches of {args.batch}):")
+        time_case('per-call', per_call_tasks, tasks[:args.per_call_rows], args.batch, USER_DB, 'tasks')
+        time_case('transaction', grouped(USER_DB, lambda row: database.insert_task(*row)),
+                  tasks, args.batch, USER_DB, 'tasks')
+        time_case('bulk', bulk(database.insert_tasks), tasks, args.batch, USER_DB, 'tasks')
+
+        messages = message_rows(args.rows)
+        print(f"messages ({args.rows} rows, batches of {args.batch}):")
+        time_case('per-call', per_call_messages, messages[:args.per_call_rows], args.batch,
+                  STUDY_ROOM_DB, 'messages')
+        time_case('transaction', grouped(STUDY_ROOM_DB, lambda row: database.insert_message(*row[:2])),
+                  messages, args.batch, STUDY_ROOM_DB, 'messages')
+        time_case('bulk', bulk(database.insert_messages), messages, args.batch, STUDY_ROOM_DB, 'messages')
+
+        close_connection()
+        os.chdir(os.path.dirname(tmp))
+
+
+if __name__ == '__main__':
+    main()
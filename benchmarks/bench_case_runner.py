@@ -0,0 +1,79 @@
+"""Time to check a compiled program against many stdin test cases.
+
+Compiles a small C program that sums its input, makes --cases cases and
+times them run one after another without limits (subprocess.run) and
+through a case_runner.CaseBatch under sandbox limits, with one worker and
+with one per core.
+
+Run from the repository root:
+    python benchmarks/bench_case_runner.py [--cases 200]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from case_runner import PASSED, CaseBatch, TestCase
+from sandbox import Limits
+
+SOURCE = """#include <stdio.h>
+int main(void) {
+    long value, total = 0;
+    while (scanf("%ld", &value) == 1)
+        total += value;
+    printf("%ld\\n", total);
+    return 0;
+}
+"""
+
+
+def make_cases(count):
+    cases = []
+    for i in range(count):
+        values = range(i, i + 1000)
+        cases.append(TestCase(" ".join(map(str, values)) + "\n", f"{sum(values)}\n", str(i + 1)))
+    return cases
+
+
+def time_plain(executable, cases):
+    start = time.perf_counter()
+    passed = sum(subprocess.run([executable], input=case.input.encode(), capture_output=True).stdout.decode()
+                 == case.expected for case in cases)
+    return time.perf_counter() - start, passed
+
+
+def time_sandboxed(executable, cases, workers):
+    start = time.perf_counter()
+    results = dict(CaseBatch(executable, cases, Limits(), workers).results())
+    passed = sum(result.verdict == PASSED for result in results.values())
+    return time.perf_counter() - start, passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cases', type=int, default=200)
+    args = parser.parse_args()
+
+    cases = make_cases(args.cases)
+    cores = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "sum.c")
+        executable = os.path.join(tmp, "sum")
+        with open(source, 'w') as f:
+            f.write(SOURCE)
+        subprocess.run(["gcc", "-O2", "-o", executable, source], check=True)
+
+        print(f"{args.cases} cases, {cores} core(s)")
+        for label, run in (("plain, sequential", lambda: time_plain(executable, cases)),
+                           ("sandboxed, 1 worker", lambda: time_sandboxed(executable, cases, 1)),
+                           (f"sandboxed, {cores} workers", lambda: time_sandboxed(executable, cases, cores))):
+            elapsed, passed = run()
+            print(f"{label:<24}{elapsed:>8.2f} s{args.cases / elapsed:>10.0f} cases/s{passed:>6} passed")
+
+
+if __name__ == '__main__':
+    main()
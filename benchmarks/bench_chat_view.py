@@ -0,0 +1,103 @@
+"""Study Room chat open time and memory: QTextEdit.append per message vs the paged ChatView.
+
+Each case runs in its own process so peak RSS is measured independently.
+Run from the repository root:
+    python benchmarks/bench_chat_view.py [--sizes 10000 100000 1000000] [--legacy-max 100000]
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def seed(count):
+    from db_connection import STUDY_ROOM_DB, close_connection, connection
+    from db_migrations import migrate
+
+    migrate(STUDY_ROOM_DB)
+    with connection(STUDY_ROOM_DB) as conn:
+        conn.executemany(
+            'INSERT INTO messages (sender, message, timestamp) VALUES (?, ?, ?)',
+            ((f"user{i % 40}", f"message number {i} about the assignment",
+              f"2024-01-{1 + i // 86400 % 28:02d} {i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}")
+             for i in range(count)))
+    close_connection()
+
+
+def open_legacy():
+    from datetime import datetime
+    from PyQt5.QtWidgets import QTextEdit
+    from database import get_all_messages
+
+    view = QTextEdit()
+    view.setReadOnly(True)
+    for sender, message, ts in get_all_messages():
+        display_time = datetime.strptime(ts, "%Y-%m-%d %H:%M:%S").strftime("%H:%M")
+        view.append(f"[{display_time}] <b>{sender}:</b> {message}")
+    return view
+
+
+def open_paged():
+    from chat_view import ChatView
+    from database import get_messages_page
+    from study_room import CHAT_PAGE_SIZE
+
+    view = ChatView()
+    view.prepend_messages(get_messages_page(limit=CHAT_PAGE_SIZE))
+    return view
+
+
+def run_case(mode):
+    """Child process: open the chat view once and print seconds and RSS growth in MiB"""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication(sys.argv[:1])
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    view = open_legacy() if mode == 'legacy' else open_paged()
+    view.resize(800, 500)
+    view.show()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{elapsed:.4f} {(peak - baseline) / 1024:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--legacy-max', type=int, default=100_000,
+                        help="skip the QTextEdit path above this many messages")
+    parser.add_argument('--case', choices=['legacy', 'paged'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        run_case(args.case)
+        return
+
+    print(f"{'messages':>10}  {'mode':<8}{'open (s)':>10}{'RSS (MiB)':>12}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            seed(size)
+            for mode in ('legacy', 'paged'):
+                if mode == 'legacy' and size > args.legacy_max:
+                    print(f"{size:>10}  {mode:<8}{'skipped':>10}")
+                    continue
+                out = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--case', mode],
+                    capture_output=True, text=True, check=True, cwd=tmp,
+                ).stdout.split()
+                print(f"{size:>10}  {mode:<8}{float(out[0]):>10.3f}{float(out[1]):>12.1f}")
+            os.chdir(ROOT)
+
+
+if __name__ == '__main__':
+    main()
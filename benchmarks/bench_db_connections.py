@@ -0,0 +1,73 @@
+"""Per-call latency of database.py before and after connection pooling.
+
+Run from the repository root:  python benchmarks/bench_db_connections.py
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from db_connection import close_connection
+
+CALLS = 2000
+
+
+# The connect-per-call versions database.py used before db_connection existed
+def legacy_insert_task(title, category, date, time_, description):
+    conn = sqlite3.connect('user.db')
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT INTO tasks (title, category, date, time, description)
+        VALUES (?, ?, ?, ?, ?)
+    ''', (title, category, date, time_, description))
+    conn.commit()
+    task_id = cursor.lastrowid
+    conn.close()
+    return task_id
+
+
+def legacy_check_user_credentials(username, password):
+    conn = sqlite3.connect('user.db')
+    cursor = conn.cursor()
+    cursor.execute('SELECT * FROM users WHERE username = ? AND password = ?', (username, password))
+    user = cursor.fetchone()
+    conn.close()
+    return user is not None
+
+
+def per_call_us(func, *args):
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        func(*args)
+    return (time.perf_counter() - start) / CALLS * 1e6
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        database.create_table()
+        database.create_task_table()
+        database.insert_user('Bench', 'bench', 'bench@example.com', 'secret')
+
+        task = ('Read', 'Study', '2024-01-01', '10:00', '')
+        login = ('bench', 'secret')
+        rows = [
+            ('insert_task', per_call_us(legacy_insert_task, *task),
+             per_call_us(database.insert_task, *task)),
+            ('check_user_credentials', per_call_us(legacy_check_user_credentials, *login),
+             per_call_us(database.check_user_credentials, *login)),
+        ]
+        close_connection()
+        os.chdir('/')
+
+    print(f"{'function':<24}{'before (us)':>14}{'after (us)':>14}{'speedup':>10}")
+    for name, before, after in rows:
+        print(f"{name:<24}{before:>14.1f}{after:>14.1f}{before / after:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
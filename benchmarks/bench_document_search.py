@@ -0,0 +1,84 @@
+"""Indexing cost and search latency for the shared notes and files index.
+
+Writes --docs shared notes of --words words each into a scratch directory.
+It times a full index build, an incremental pass with nothing changed, a
+pass after editing a handful of notes, and ranked search_documents()
+queries.
+
+Run from the repository root:
+    python benchmarks/bench_document_search.py [--docs 5000] [--words 3000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from db_connection import close_connection
+from document_index import NOTES_DIR, sync_index
+
+VOCABULARY = ("matrix vector eigenvalue determinant integral derivative limit series proof lemma "
+              "theorem graph tree recursion algorithm complexity protein enzyme cell membrane "
+              "photosynthesis osmosis velocity momentum energy entropy").split()
+FILLER = "the a of and to in is that for on with as by this it from".split()
+
+
+def write_notes(count, words):
+    rnd = random.Random(0)
+    pool = VOCABULARY + FILLER * 4
+    notes = []
+    for i in range(count):
+        filename = f"note{i}.md"
+        with open(os.path.join(NOTES_DIR, filename), 'w', encoding='utf-8') as f:
+            f.write(" ".join(rnd.choice(pool) for _ in range(words)))
+        notes.append((1, "bench", f"{rnd.choice(VOCABULARY).title()} notes {i}", filename))
+    database.insert_shared_notes(notes)
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<34}{(time.perf_counter() - start) * 1000:>10.1f} ms  {result}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--docs', type=int, default=5000)
+    parser.add_argument('--words', type=int, default=3000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        os.makedirs(NOTES_DIR)
+        database.create_shared_notes_table()
+        write_notes(args.docs, args.words)
+
+        timed("full index build", sync_index)
+        timed("incremental pass, nothing changed", sync_index)
+        time.sleep(0.01)
+        for i in range(0, args.docs, max(1, args.docs // 5)):
+            with open(os.path.join(NOTES_DIR, f"note{i}.md"), 'a', encoding='utf-8') as f:
+                f.write(" mitochondria")
+        timed("incremental pass, 5 notes edited", sync_index)
+
+        for query in ["eigenvalue", "eigen", "mitochondria", "matrix proof", "nonexistent"]:
+            best = min(_time(lambda: database.search_documents(query)) for _ in range(5))
+            print(f"search {query!r:<27}{best * 1000:>10.2f} ms  {len(database.search_documents(query))} results")
+
+        close_connection()
+        os.chdir(os.path.dirname(tmp))
+
+
+def _time(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Time and memory to open the first screenful of text files of growing size.
+
+Builds text files from 1 MB up to --max-mb, then times opening each with
+mapped_file.MappedTextFile and reading the first PREVIEW_LINES lines. Both
+time and resident memory should stay flat as the file grows.
+
+Run from the repository root:
+    python benchmarks/bench_file_preview.py [--max-mb 1024]
+"""
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mapped_file import MappedTextFile
+
+PREVIEW_LINES = 200
+
+
+def make_text(path, size):
+    line = b"The quick brown fox jumps over the lazy dog. 0123456789\n"
+    block = line * (1024 * 1024 // len(line))
+    with open(path, 'wb') as f:
+        written = 0
+        while written < size:
+            f.write(block)
+            written += len(block)
+
+
+def rss_mb():
+    # ru_maxrss is in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-mb', type=int, default=1024)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        size_mb = 1
+        while size_mb <= args.max_mb:
+            path = os.path.join(tmp, f'{size_mb}.txt')
+            make_text(path, size_mb * 1024 * 1024)
+            start = time.perf_counter()
+            with MappedTextFile(path) as text:
+                lines = text.lines(0, PREVIEW_LINES)
+            elapsed = time.perf_counter() - start
+            print(f"{size_mb:>6} MB: {len(lines)} lines in {elapsed * 1000:7.3f} ms, peak RSS {rss_mb():.0f} MB")
+            os.remove(path)
+            size_mb *= 4
+
+
+if __name__ == '__main__':
+    main()
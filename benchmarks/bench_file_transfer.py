@@ -0,0 +1,95 @@
+"""Throughput of the Study Room file transfer engine against shutil.copyfile.
+
+Creates a scratch file and copies it with shutil.copyfile, with
+file_transfer.copy_file() using each copy method the platform offers, and
+with blob_store.store_file(), which hashes while it copies. It then cancels
+a copy halfway, resumes it and checks the result.
+
+Run from the repository root:
+    python benchmarks/bench_file_transfer.py [--size-mb 1024]
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import file_transfer
+from blob_store import hash_file, store_file
+
+
+def make_source(path, size):
+    block = os.urandom(1024 * 1024)
+    with open(path, 'wb') as f:
+        for _ in range(size // len(block)):
+            f.write(block)
+        f.write(block[:size % len(block)])
+
+
+def report(label, size, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<26} {size / elapsed / (1024 * 1024):>9.0f} MB/s  ({elapsed:.2f}s)")
+
+
+def with_methods(methods, func):
+    original = file_transfer._kernel_methods
+    file_transfer._kernel_methods = lambda: [m for m in methods if m in original()]
+    try:
+        func()
+    finally:
+        file_transfer._kernel_methods = original
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size-mb', type=int, default=1024)
+    parser.add_argument('--dir', help="scratch directory, e.g. on the disk under test")
+    args = parser.parse_args()
+    size = args.size_mb * 1024 * 1024
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        source = os.path.join(tmp, 'source.bin')
+        make_source(source, size)
+        expected = hash_file(source)
+        print(f"copying {args.size_mb} MB; kernel methods available: {file_transfer._kernel_methods()}")
+
+        def target(name):
+            path = os.path.join(tmp, name)
+            if os.path.exists(path):
+                os.remove(path)
+            return path
+
+        report('shutil.copyfile', size, lambda: shutil.copyfile(source, target('copy')))
+        for method in file_transfer._kernel_methods():
+            with_methods([method], lambda: report(f'copy_file ({method})', size,
+                                                  lambda: file_transfer.copy_file(source, target('copy'))))
+        with_methods([], lambda: report('copy_file (buffered)', size,
+                                        lambda: file_transfer.copy_file(source, target('copy'))))
+        blob_dir = os.path.join(tmp, 'blobs')
+        report('store_file (hash + copy)', size, lambda: store_file(source, blob_dir))
+
+        # Cancel at the halfway mark, then resume from the partial copy
+        destination = target('resumed')
+        try:
+            file_transfer.copy_file(source, destination, chunk_size=size // 8 or 1,
+                                    progress=lambda done, total, rate: None,
+                                    cancelled=lambda: os.path.getsize(destination + file_transfer.PART_SUFFIX) >= size // 2)
+        except file_transfer.TransferCancelled:
+            partial = os.path.getsize(destination + file_transfer.PART_SUFFIX)
+            print(f"  cancelled with {partial / size:.0%} copied")
+        digest = hashlib.sha256()
+        file_transfer.copy_file(source, destination, digest=digest)
+        ok = digest.hexdigest() == expected == hash_file(destination)
+        print(f"  resumed copy matches source: {ok}")
+        if not ok:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
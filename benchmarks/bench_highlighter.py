@@ -0,0 +1,91 @@
+"""Syntax highlighting time for a large C++ file: old QRegExp rules vs CppHighlighter.
+
+Generates --lines lines of C++ and times a full rehighlight() with the old
+highlighter (about 70 QRegExp rules, each rebuilt and run on every block)
+and with code_eidtor.CppHighlighter.
+
+Run from the repository root:
+    python benchmarks/bench_highlighter.py [--lines 50000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QRegExp
+from PyQt5.QtGui import QSyntaxHighlighter, QTextDocument
+from PyQt5.QtWidgets import QApplication
+
+from code_eidtor import KEYWORDS, CppHighlighter, make_format
+
+SNIPPET = '''#include <vector>
+// Sums the even entries of a vector
+template <typename T>
+static long sum_even(const std::vector<T> &values) {
+    long total = 0; /* running
+                       total */
+    for (unsigned int i = 0; i < values.size(); i++) {
+        if (values[i] % 2 == 0) total += values[i] * 0x10;
+    }
+    const char *label = "sum // of \\"evens\\"";
+    return total;
+}
+'''
+
+
+class LegacyCppHighlighter(QSyntaxHighlighter):
+    """The highlighter CodeEditor used before, for comparison"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.highlightingRules = [(QRegExp(f"\\b{keyword}\\b"), make_format("#569CD6", True))
+                                  for keyword in KEYWORDS]
+        self.highlightingRules += [
+            (QRegExp("#.*"), make_format("#C586C0")),
+            (QRegExp("\".*\""), make_format("#CE9178")),
+            (QRegExp("\'.*\'"), make_format("#CE9178")),
+            (QRegExp("//[^\n]*"), make_format("#6A9955")),
+            (QRegExp("/\\*.*\\*/"), make_format("#6A9955")),
+            (QRegExp("\\b\\d+\\b"), make_format("#B5CEA8")),
+        ]
+
+    def highlightBlock(self, text):
+        for pattern, format in self.highlightingRules:
+            expression = QRegExp(pattern)
+            index = expression.indexIn(text)
+            while index >= 0:
+                length = expression.matchedLength()
+                self.setFormat(index, length, format)
+                index = expression.indexIn(text, index + length)
+        self.setCurrentBlockState(0)
+
+
+def time_highlighter(highlighter_class, source):
+    document = QTextDocument()
+    document.setPlainText(source)
+    highlighter = highlighter_class(document)
+    start = time.perf_counter()
+    highlighter.rehighlight()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lines', type=int, default=50000)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    snippet_lines = SNIPPET.count('\n')
+    source = SNIPPET * (args.lines // snippet_lines)
+    print(f"{source.count(chr(10))} lines, {len(source) / 1e6:.1f} MB")
+    for label, highlighter_class in (("legacy", LegacyCppHighlighter), ("CppHighlighter", CppHighlighter)):
+        elapsed = time_highlighter(highlighter_class, source)
+        print(f"{label:<16}{elapsed:>8.2f} s{elapsed / source.count(chr(10)) * 1e6:>10.1f} us/line")
+    app.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Image-to-PDF time, peak memory and output size: Pillow save_all vs image_pdf.
+
+Generates --pages 300 dpi A4 scans, either noisy photos or pages of text,
+and converts them with the old in-memory path (open every image, then
+Image.save(save_all=True)) and with image_pdf.convert_images() under each
+set of PageOptions in CASES. Each case runs in its own process. Peak RSS
+counts the parent plus its largest worker.
+
+Run from the repository root:
+    python benchmarks/bench_image_pdf.py [--pages 100] [--workers 4] [--format png] [--content text]
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from image_pdf import BILEVEL, GRAYSCALE, PageOptions
+
+# PageOptions arguments for each image_pdf case
+CASES = {
+    'pipeline': {},
+    'quality60': {'quality': 60},
+    '150dpi': {'dpi': 150},
+    'gray150': {'color': GRAYSCALE, 'dpi': 150},
+    'bw': {'color': BILEVEL},
+}
+
+
+def make_images(directory, count, image_format, content, size=(2480, 3508)):
+    """A4 at 300 dpi; random blocks or lines of text, so the JPEGs do not compress to nothing"""
+    from PIL import Image
+
+    page = make_text_page(size) if content == 'text' else \
+        Image.effect_noise((size[0] // 8, size[1] // 8), 64).resize(size).convert('RGB')
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"scan{i:04d}.{image_format}")
+        page.rotate(i % 4 * 90, expand=False).save(path, quality=92, dpi=(300, 300))
+        paths.append(path)
+    return paths
+
+
+def make_text_page(size):
+    """Black text on slightly noisy off-white paper, like a scanner produces"""
+    import random
+    from PIL import Image, ImageDraw, ImageFont
+
+    rnd = random.Random(0)
+    paper = Image.effect_noise(size, 6).point(lambda v: min(255, v + 110))
+    draw = ImageDraw.Draw(paper)
+    font = ImageFont.load_default(size=36)
+    words = "the integral of a continuous function over a closed interval is bounded".split()
+    for y in range(200, size[1] - 200, 52):
+        draw.text((200, y), " ".join(rnd.choice(words) for _ in range(12)), fill=20, font=font)
+    return paper.convert('RGB')
+
+
+def convert_legacy(paths, output):
+    from PIL import Image
+
+    images = [Image.open(path).convert("RGB") for path in paths]
+    images[0].save(output, save_all=True, append_images=images[1:])
+
+
+def convert_pipeline(paths, output, workers, options):
+    from image_pdf import convert_images
+
+    convert_images(paths, output, workers=workers, options=PageOptions(**options))
+
+
+def run_case(mode, directory, workers):
+    """Child process: convert once and print seconds, peak MiB and output bytes"""
+    paths = sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.startswith('scan'))
+    output = os.path.join(directory, f"{mode}.pdf")
+    start = time.perf_counter()
+    if mode == 'legacy':
+        convert_legacy(paths, output)
+    else:
+        convert_pipeline(paths, output, workers, CASES[mode])
+    elapsed = time.perf_counter() - start
+    peak = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            + resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    print(f"{elapsed:.3f} {peak / 1024:.0f} {os.path.getsize(output)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--format', choices=['jpg', 'png'], default='jpg',
+                        help="source image format; JPEGs can skip re-encoding")
+    parser.add_argument('--content', choices=['photo', 'text'], default='photo',
+                        help="noisy photos, or scanned pages of text")
+    parser.add_argument('--case', choices=['legacy', *CASES], help=argparse.SUPPRESS)
+    parser.add_argument('--dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        run_case(args.case, args.dir, args.workers)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        make_images(tmp, args.pages, args.format, args.content)
+        print(f"{args.pages} {args.format} {args.content} pages of 2480x3508, {args.workers} workers")
+        print(f"{'path':<10}{'seconds':>10}{'peak MiB':>10}{'size MB':>10}")
+        for mode in ('legacy', *CASES):
+            out = subprocess.run([sys.executable, __file__, '--case', mode, '--dir', tmp,
+                                  '--workers', str(args.workers)],
+                                 capture_output=True, text=True, check=True).stdout.split()
+            print(f"{mode:<10}{float(out[0]):>10.2f}{out[1]:>10}{int(out[2]) / 1e6:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Query latency for the indexed access paths, with and without their indexes.
+
+Run from the repository root:  python benchmarks/bench_indexes.py [--rows 1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from db_connection import USER_DB, STUDY_ROOM_DB, close_connection, connection
+from db_migrations import MIGRATIONS, migrate
+
+
+def version_before_indexes(db_file):
+    """Return the schema version just before db_file's index migration"""
+    for number, (description, _) in enumerate(MIGRATIONS[db_file]):
+        if description.startswith('index '):
+            return number
+    raise LookupError(f"{db_file} has no index migration")
+
+
+def seed(rows):
+    rnd = random.Random(0)
+
+    def stamp():
+        return (f"2024-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d} "
+                f"{rnd.randint(0, 23):02d}:{rnd.randint(0, 59):02d}:{rnd.randint(0, 59):02d}")
+
+    with connection(USER_DB) as conn:
+        conn.executemany(
+            'INSERT INTO tasks (title, category, date, time, description) VALUES (?, ?, ?, ?, ?)',
+            ((f"task {i}", "Study", stamp()[:10], stamp()[11:16], "") for i in range(rows)))
+        conn.executemany(
+            'INSERT INTO study_tasks (subject, start_time, duration) VALUES (?, ?, ?)',
+            ((f"subject {i % 500}", stamp(), 25) for i in range(rows)))
+    with connection(STUDY_ROOM_DB) as conn:
+        conn.executemany(
+            'INSERT INTO messages (sender, message, timestamp) VALUES (?, ?, ?)',
+            ((f"user{i % 50}", "hello there", stamp()) for i in range(rows)))
+        conn.executemany(
+            'INSERT INTO shared_files (name, size, path, uploaded_by, timestamp) VALUES (?, ?, ?, ?, ?)',
+            ((f"file{i}.pdf", "12.0", f"/tmp/file{i}.pdf", "user", stamp()) for i in range(rows)))
+
+
+def timed(func, *args, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(*args)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def measure():
+    return {
+        'get_all_tasks': timed(database.get_all_tasks),
+        'get_all_study_tasks': timed(database.get_all_study_tasks),
+        'delete_study_task': timed(database.delete_study_task, 'missing', 'never', repeat=20),
+        'get_all_messages': timed(database.get_all_messages),
+        'get_all_shared_files': timed(database.get_all_shared_files),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000, help="rows per table")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        migrate(USER_DB, version_before_indexes(USER_DB))
+        migrate(STUDY_ROOM_DB, version_before_indexes(STUDY_ROOM_DB))
+        start = time.perf_counter()
+        seed(args.rows)
+        print(f"seeded {args.rows} rows per table in {time.perf_counter() - start:.1f}s")
+
+        before = measure()
+        start = time.perf_counter()
+        migrate(USER_DB)
+        migrate(STUDY_ROOM_DB)
+        print(f"built indexes in {time.perf_counter() - start:.1f}s")
+        after = measure()
+        close_connection()
+        os.chdir('/')
+
+    print(f"{'query':<24}{'no index (ms)':>15}{'indexed (ms)':>15}{'speedup':>10}")
+    for name in before:
+        print(f"{name:<24}{before[name]:>15.2f}{after[name]:>15.2f}{before[name] / after[name]:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
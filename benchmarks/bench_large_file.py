@@ -0,0 +1,86 @@
+"""Time to first paint when CodeEditor opens large generated C++ files.
+
+For each --sizes file (in MB) it times the old way (one read() and
+setPlainText() with the highlighter attached) and large-file mode:
+the first chunk with the viewport highlighted, then the whole file
+loaded, then the idle highlighting pass finished.
+
+Run from the repository root:
+    python benchmarks/bench_large_file.py [--sizes 2 8 32]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+import code_eidtor
+
+LINE = "static const unsigned int table_%d[] = { 0x%04x, %d, %d }; /* entry */\n"
+
+
+def write_header(path, megabytes):
+    with open(path, 'w') as f:
+        f.write("/* generated\n   table */\n#include <stdint.h>\n")
+        i = 0
+        while f.tell() < megabytes * 1000 * 1000:
+            f.write("".join(LINE % (n, n & 0xffff, n * 3, n * 7) for n in range(i, i + 1000)))
+            i += 1000
+
+
+def open_legacy(app, path):
+    editor = code_eidtor.CodeEditor()
+    editor.show()
+    start = time.perf_counter()
+    with open(path, 'r') as file:
+        editor.editor.setPlainText(file.read())
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    editor.close()
+    return elapsed
+
+
+def open_large(app, path):
+    editor = code_eidtor.CodeEditor()
+    editor.show()
+    first_paint = []
+    editor.loader.chunk_loaded.connect(lambda *args: first_paint or first_paint.append(time.perf_counter()))
+    start = time.perf_counter()
+    editor.open_large_file(path, os.path.getsize(path))
+    while not first_paint:
+        app.processEvents()
+    app.processEvents()  # The paint itself
+    first = time.perf_counter() - start
+    while editor.loader.is_loading():
+        app.processEvents()
+    loaded = time.perf_counter() - start
+    while editor.highlighter.deferred:
+        app.processEvents()
+    highlighted = time.perf_counter() - start
+    editor.close()
+    return first, loaded, highlighted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[2, 8, 32])
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    print(f"{'MB':>4}{'legacy s':>12}{'first paint s':>15}{'loaded s':>10}{'highlighted s':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for megabytes in args.sizes:
+            path = os.path.join(tmp, f"table{megabytes}.h")
+            write_header(path, megabytes)
+            legacy = open_legacy(app, path)
+            first, loaded, highlighted = open_large(app, path)
+            print(f"{megabytes:>4}{legacy:>12.2f}{first:>15.3f}{loaded:>10.2f}{highlighted:>15.2f}")
+
+
+if __name__ == '__main__':
+    main()
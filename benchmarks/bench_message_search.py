@@ -0,0 +1,95 @@
+"""Chat search latency at scale: search_messages() against a LIKE scan.
+
+Seeds a scratch study_room.db with --rows messages drawn from a fixed
+vocabulary through insert_messages(), so the FTS5 triggers index them as
+they go. It then times common, rare and multi-word queries, each for the
+first page and for a page deep into the results.
+
+Run from the repository root:
+    python benchmarks/bench_message_search.py [--rows 1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from db_connection import STUDY_ROOM_DB, close_connection, read_connection
+
+COMMON = ["exam", "homework", "lecture", "notes", "question", "deadline", "chapter", "thanks",
+          "anyone", "tomorrow", "library", "group", "slides", "problem", "answer", "today"]
+FILLER = ["the", "a", "is", "for", "on", "we", "can", "do", "it", "about", "at", "in", "to", "and"]
+RARE = ["eigenvalue", "photosynthesis", "mitochondria", "thermodynamics", "recursion"]
+
+
+def seed(rows, batch=50000):
+    rnd = random.Random(0)
+    words = COMMON + FILLER * 3
+
+    def message():
+        text = [rnd.choice(words) for _ in range(rnd.randint(4, 16))]
+        if rnd.random() < 0.001:
+            text.insert(rnd.randrange(len(text)), rnd.choice(RARE))
+        return " ".join(text)
+
+    for start in range(0, rows, batch):
+        database.insert_messages([(f"user{rnd.randrange(200)}", message(), None)
+                                  for _ in range(min(batch, rows - start))])
+
+
+def timed(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, result
+
+
+def like_scan(query, limit=50):
+    with read_connection(STUDY_ROOM_DB) as conn:
+        return conn.execute(
+            'SELECT id, sender, message, timestamp FROM messages WHERE message LIKE ? ORDER BY id DESC LIMIT ?',
+            (f"%{query}%", limit)).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        database.create_study_room_tables()
+        start = time.perf_counter()
+        seed(args.rows)
+        print(f"seeded and indexed {args.rows} messages in {time.perf_counter() - start:.1f}s, "
+              f"database {os.path.getsize(STUDY_ROOM_DB) / 1e6:.0f} MB")
+
+        print(f"{'query':<28}{'FTS page 1':>12}{'FTS page 20':>13}{'LIKE page 1':>13}{'matches':>10}")
+        for query in ["ex", "exam", "eigenvalue", "lecture notes", "deadline tomorrow", "photosynth", "zzzz"]:
+            fts_ms, rows = timed(lambda: database.search_messages(query))
+            cursor = None
+            for _ in range(19):
+                page = database.search_messages(query, cursor=cursor)
+                if not page:
+                    break
+                cursor = page[-1][0]
+            deep_ms, _ = timed(lambda: database.search_messages(query, cursor=cursor))
+            like_ms, _ = timed(lambda: like_scan(query.split()[0]), repeat=1)
+            with read_connection(STUDY_ROOM_DB) as conn:
+                matches = conn.execute('SELECT count(*) FROM messages_fts WHERE messages_fts MATCH ?',
+                                       (database._fts_query(query),)).fetchone()[0]
+            print(f"{query:<28}{fts_ms:>10.2f}ms{deep_ms:>11.2f}ms{like_ms:>11.2f}ms{matches:>10}")
+
+        close_connection()
+        os.chdir(os.path.dirname(tmp))
+
+
+if __name__ == '__main__':
+    main()
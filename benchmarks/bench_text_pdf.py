@@ -0,0 +1,74 @@
+"""Text-to-PDF time, peak Python memory and size: fpdf cell-per-line vs text_pdf.
+
+Generates --lines lines of prose of varying length, lazily, and exports
+them with the old PDFEditorDialog code (one fpdf cell per line, no
+wrapping) when fpdf is installed, and with text_pdf.write_text_pdf().
+
+Run from the repository root:
+    python benchmarks/bench_text_pdf.py [--lines 100000]
+"""
+import argparse
+import importlib.util
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_pdf import write_text_pdf
+
+WORDS = ("the derivative of a function measures how its output changes as its input "
+         "changes and the integral accumulates those changes over an interval").split()
+
+
+def generate_lines(count):
+    rnd = random.Random(0)
+    for _ in range(count):
+        yield " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(0, 40)))
+
+
+def export_fpdf(lines, output):
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+    for line in lines:
+        pdf.cell(200, 10, txt=line, ln=True)
+    pdf.output(output)
+
+
+def measure(label, func, output):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    # A second run for memory, as tracing slows everything down several times
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<12}{elapsed:>10.2f}{peak / 2 ** 20:>12.1f}{os.path.getsize(output) / 1e6:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lines', type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{args.lines} lines")
+        print(f"{'path':<12}{'seconds':>10}{'peak MiB':>12}{'size MB':>10}")
+        if importlib.util.find_spec('fpdf') is None:
+            print("fpdf         not installed, skipped")
+        else:
+            output = os.path.join(tmp, "fpdf.pdf")
+            measure("fpdf", lambda: export_fpdf(generate_lines(args.lines), output), output)
+        output = os.path.join(tmp, "text_pdf.pdf")
+        measure("text_pdf", lambda: write_text_pdf(generate_lines(args.lines), output), output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Icon thumbnail cost per image: full QImage decode vs the thumbnails cache.
+
+Generates --images 12 megapixel phone-sized JPEGs. It times the old way
+(QImage(path).scaled(100, 100), which decodes every pixel), a cold
+load_thumbnail() that decodes with draft() and writes the cache, and a
+warm one that only reads the cached PNG back.
+
+Run from the repository root:
+    python benchmarks/bench_thumbnails.py [--images 100]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage
+
+from thumbnails import load_thumbnail
+
+
+def make_photos(directory, count, size=(4000, 3000)):
+    photo = Image.effect_noise((size[0] // 16, size[1] // 16), 64).resize(size).convert('RGB')
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"IMG_{i:04d}.jpg")
+        photo.save(path, quality=90)
+        paths.append(path)
+    return paths
+
+
+def timed(label, paths, func):
+    start = time.perf_counter()
+    for path in paths:
+        func(path)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28}{elapsed:>10.2f} s{elapsed / len(paths) * 1000:>10.1f} ms/image")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--images', type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_photos(tmp, args.images)
+        cache_dir = os.path.join(tmp, "cache")
+        print(f"{args.images} JPEGs of 4000x3000")
+        timed("QImage.scaled", paths, lambda path: QImage(path).scaled(100, 100, Qt.KeepAspectRatio,
+                                                                        Qt.SmoothTransformation))
+        # As ThumbnailLoader does, read the cached PNG back into a QImage
+        timed("load_thumbnail, cold cache", paths, lambda path: QImage(load_thumbnail(path, cache_dir=cache_dir)))
+        timed("load_thumbnail, warm cache", paths, lambda path: QImage(load_thumbnail(path, cache_dir=cache_dir)))
+
+
+if __name__ == '__main__':
+    main()
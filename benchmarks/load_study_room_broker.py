@@ -0,0 +1,116 @@
+"""Load test for study_room_broker.py with hundreds of simulated chatters.
+
+By default a broker is started in-process on a scratch database. Every
+client sends its messages at a steady rate and reads every broadcast, and
+the script reports fan-out latency, delivery throughput and how many rows
+the write-behind stage persisted.
+
+Run from the repository root:
+    python benchmarks/load_study_room_broker.py [--clients 200] [--messages 10] [--rate 2]
+    python benchmarks/load_study_room_broker.py --address tcp:127.0.0.1:8765   # external broker
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from study_room_broker import StudyRoomBroker, parse_address
+
+
+async def open_client(address):
+    kind, value = parse_address(address)
+    if kind == 'tcp':
+        return await asyncio.open_connection(*value)
+    return await asyncio.open_unix_connection(value)
+
+
+async def chatter(number, address, messages, rate, expected, latencies, ready, go):
+    reader, writer = await open_client(address)
+    writer.write(b'{"type": "hello"}\n')
+    while json.loads(await reader.readline()).get('type') != 'welcome':
+        pass
+    ready.release()
+    await go.wait()
+
+    async def send():
+        for i in range(messages):
+            packet = {'type': 'message', 'sender': f"chatter{number}",
+                      'message': f"message {i} from chatter {number}", 'sent_at': time.perf_counter()}
+            writer.write((json.dumps(packet) + '\n').encode())
+            await writer.drain()
+            await asyncio.sleep(1 / rate)
+
+    sender = asyncio.create_task(send())
+    received = 0
+    while received < expected:
+        line = await reader.readline()
+        if not line:
+            break
+        received += 1
+        latencies.append(time.perf_counter() - json.loads(line)['sent_at'])
+    await sender
+    writer.close()
+    return received
+
+
+async def run(args):
+    broker = None
+    address = args.address
+    tmp = None
+    if address is None:
+        tmp = tempfile.TemporaryDirectory()
+        broker = StudyRoomBroker(os.path.join(tmp.name, 'study_room.db'))
+        server = await broker.start('tcp:127.0.0.1:0')
+        host, port = server.sockets[0].getsockname()[:2]
+        address = f"tcp:{host}:{port}"
+
+    expected = args.clients * args.messages
+    latencies = []
+    ready = asyncio.Semaphore(0)
+    go = asyncio.Event()
+    tasks = [asyncio.create_task(chatter(n, address, args.messages, args.rate, expected, latencies, ready, go))
+             for n in range(args.clients)]
+    for _ in range(args.clients):
+        await ready.acquire()
+
+    start = time.perf_counter()
+    go.set()
+    received = await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    print(f"clients: {args.clients}, messages sent: {expected}, elapsed: {elapsed:.2f}s")
+    print(f"deliveries: {sum(received)} of {expected * args.clients} "
+          f"({sum(received) / elapsed:.0f}/s)")
+    if latencies:
+        latencies.sort()
+        print(f"fan-out latency ms: p50 {statistics.median(latencies) * 1000:.1f}  "
+              f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f}  "
+              f"max {latencies[-1] * 1000:.1f}")
+
+    if broker is not None:
+        await broker.close()
+        print(f"rows persisted by write-behind: {broker.persisted}")
+        tmp.cleanup()
+        if broker.persisted != expected or sum(received) != expected * args.clients:
+            return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--messages', type=int, default=10, help="messages sent per client")
+    parser.add_argument('--rate', type=float, default=2, help="messages per second per client")
+    parser.add_argument('--address', help="use a running broker instead of starting one")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Concurrent chat writers and history readers against study_room.db.
+
+Run from the repository root:
+    python benchmarks/stress_study_room.py [--writers 4] [--readers 8] [--seconds 5] [--profile balanced]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from db_connection import PRAGMA_PROFILES, close_connection, set_pragma_profile
+
+
+def run(writers, readers, seconds, seed_messages):
+    stop = threading.Event()
+    counts = {'writes': 0, 'reads': 0, 'errors': 0}
+    worst_read = [0.0]
+    counts_lock = threading.Lock()
+
+    def record(key, latency=None):
+        with counts_lock:
+            counts[key] += 1
+            if latency is not None and latency > worst_read[0]:
+                worst_read[0] = latency
+
+    def writer(n):
+        try:
+            while not stop.is_set():
+                try:
+                    database.insert_message(f"writer{n}", "ping")
+                    record('writes')
+                except Exception:
+                    record('errors')
+        finally:
+            close_connection()
+
+    def reader():
+        try:
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    database.get_all_messages()
+                    record('reads', time.perf_counter() - start)
+                except Exception:
+                    record('errors')
+        finally:
+            close_connection()
+
+    database.create_study_room_tables()
+    for _ in range(seed_messages):
+        database.insert_message("seed", "hello")
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    close_connection()
+    return counts, worst_read[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--seed', type=int, default=1000, help="messages present before the run")
+    parser.add_argument('--profile', choices=sorted(PRAGMA_PROFILES), default='balanced')
+    args = parser.parse_args()
+
+    set_pragma_profile(args.profile)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        counts, worst_read = run(args.writers, args.readers, args.seconds, args.seed)
+        os.chdir('/')
+
+    print(f"profile={args.profile} writers={args.writers} readers={args.readers}")
+    print(f"writes/s: {counts['writes'] / args.seconds:.0f}")
+    print(f"reads/s:  {counts['reads'] / args.seconds:.0f}")
+    print(f"slowest read: {worst_read * 1000:.1f} ms")
+    print(f"errors:   {counts['errors']}")
+    if counts['errors']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Content-addressed storage for Study Room shared files.
+
+Uploaded files are copied into BLOB_DIR under the hex SHA-256 of their
+contents, fanned out by the first two hex digits:
+
+    study_room_files/3f/3fa4...e1
+
+The same bytes uploaded twice are stored once. study_room.db counts how many
+shared_files rows point at each blob, and a blob is removed from disk only
+when the last of them is deleted.
+"""
+import hashlib
+import os
+
+from file_transfer import copy_file
+
+BLOB_DIR = "study_room_files"
+
+# Files are hashed and copied this many bytes at a time, so an upload never
+# holds more than one chunk in memory.
+CHUNK_SIZE = 1024 * 1024
+
+
+def blob_path(content_hash, blob_dir=BLOB_DIR):
+    """Return the path a blob with this SHA-256 hex digest is stored at"""
+    return os.path.join(blob_dir, content_hash[:2], content_hash)
+
+
+def hash_file(path, chunk_size=CHUNK_SIZE):
+    """Return the SHA-256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _upload_path(path, blob_dir):
+    # Named after the source and its size and mtime, so a cancelled upload of
+    # the same unchanged file resumes into the same partial copy
+    stat = os.stat(path)
+    key = hashlib.sha256(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return os.path.join(blob_dir, '.upload-' + key.hexdigest()[:32])
+
+
+def store_file(path, blob_dir=BLOB_DIR, chunk_size=CHUNK_SIZE, progress=None, cancelled=None):
+    """Copy a file into the store and return (content_hash, size in bytes).
+
+    The copy is hashed as it streams into a staging file next to the store,
+    then renamed into place. If the store already holds the same content the
+    staging copy is dropped instead. progress and cancelled are passed on to
+    file_transfer.copy_file(); a cancelled upload resumes on the next call.
+    """
+    os.makedirs(blob_dir, exist_ok=True)
+    digest = hashlib.sha256()
+    staging_path = _upload_path(path, blob_dir)
+    size = copy_file(path, staging_path, chunk_size, progress, cancelled, digest)
+
+    content_hash = digest.hexdigest()
+    final_path = blob_path(content_hash, blob_dir)
+    if os.path.exists(final_path):
+        os.remove(staging_path)
+    else:
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        os.replace(staging_path, final_path)
+    return content_hash, size
+
+
+def remove_blob(content_hash, blob_dir=BLOB_DIR):
+    """Delete a blob from disk once nothing references it"""
+    path = blob_path(content_hash, blob_dir)
+    if os.path.exists(path):
+        os.remove(path)
@@ -0,0 +1,89 @@
+"""Compiled programs kept between runs of the code editor.
+
+An executable is stored under a hash of everything that went into it: the
+language, the compiler flags and the source text. Running unchanged code
+again then skips the compiler. A cached executable's mtime records when it
+was last used, and the least recently used ones are deleted once the cache
+outgrows its size limit.
+"""
+import hashlib
+import os
+import shutil
+
+BUILD_CACHE_DIR = "build_cache"
+BUILD_CACHE_LIMIT = 256 * 1024 * 1024
+EXECUTABLE_SUFFIX = ".exe" if os.name == 'nt' else ""
+
+
+def build_key(source, language, flags=()):
+    digest = hashlib.sha256()
+    for part in (language, *flags):
+        digest.update(part.encode('utf-8') + b'\0')
+    digest.update(source.encode('utf-8', 'surrogatepass'))
+    return digest.hexdigest()
+
+
+class BuildCache:
+    def __init__(self, cache_dir=BUILD_CACHE_DIR, max_bytes=BUILD_CACHE_LIMIT):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key + EXECUTABLE_SUFFIX)
+
+    def lookup(self, key):
+        """Return the cached executable for key, or None, counting a hit or a miss"""
+        path = self.path(key)
+        try:
+            os.utime(path)  # Now the most recently used
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def store(self, key, executable):
+        """Move a freshly built executable into the cache and return its new path"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path(key)
+        partial = path + ".part"
+        # shutil.move copies, keeping the mode bits, when the build is on another filesystem
+        shutil.move(executable, partial)
+        os.replace(partial, path)
+        self.evict(keep=path)
+        return path
+
+    def entries(self):
+        """Return [(last used, size, path)] of every cached executable, oldest first"""
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.is_file() and not entry.name.endswith(".part"):
+                        st = entry.stat()
+                        entries.append((st.st_mtime, st.st_size, entry.path))
+        except FileNotFoundError:
+            pass
+        return sorted(entries)
+
+    def usage(self):
+        """Return (executables, total bytes)"""
+        entries = self.entries()
+        return len(entries), sum(size for _, size, _ in entries)
+
+    def evict(self, keep=None):
+        """Delete least recently used executables until the cache fits its limit"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue  # Still running, on Windows
+            total -= size
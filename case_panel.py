@@ -0,0 +1,251 @@
+import time
+
+from PyQt5.QtWidgets import (
+    QWidget, QHBoxLayout, QVBoxLayout, QPushButton, QLabel, QPlainTextEdit, QTableWidget,
+    QTableWidgetItem, QAbstractItemView, QHeaderView, QSplitter, QFileDialog, QMessageBox
+)
+from PyQt5.QtGui import QColor, QFont
+from PyQt5.QtCore import Qt, pyqtSignal
+
+from case_runner import PASSED, STOPPED, TestCase, load_cases, output_diff
+from program_runner import CaseRunner
+
+VERDICT_COLORS = {
+    PASSED: "#4ec9b0",
+    STOPPED: "#9d9d9d",
+}
+FAILED_COLOR = "#f48771"
+
+
+class TestCasePanel(QWidget):
+    """Input/expected-output pairs for the code editor, run all at once"""
+
+    run_requested = pyqtSignal()
+    finished = pyqtSignal(str)   # summary
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.cases = []
+        self.results = {}
+        self.runner = None
+        self.started_at = 0
+        self.elapsed = 0
+        self.setStyleSheet("""
+            QPlainTextEdit, QTableWidget {
+                background-color: #1e1e1e;
+                color: #d4d4d4;
+                border: 1px solid #444;
+            }
+            QHeaderView::section {
+                background-color: #2d2d2d;
+                color: #9cdcfe;
+                border: none;
+                padding: 3px;
+            }
+            QPushButton {
+                background-color: #333;
+                color: #fff;
+                padding: 4px 10px;
+                border: 1px solid #444;
+                border-radius: 4px;
+            }
+            QPushButton:disabled {
+                color: #777;
+            }
+        """)
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        buttons = QHBoxLayout()
+        self.add_btn = QPushButton("Add")
+        self.add_btn.clicked.connect(lambda: self.add_case(TestCase()))
+        self.remove_btn = QPushButton("Remove")
+        self.remove_btn.clicked.connect(self.remove_case)
+        self.import_btn = QPushButton("Import Folder")
+        self.import_btn.clicked.connect(self.import_cases)
+        self.run_btn = QPushButton("Run Tests")
+        self.run_btn.clicked.connect(self.run_requested.emit)
+        self.summary_label = QLabel("No test cases")
+        for button in (self.add_btn, self.remove_btn, self.import_btn, self.run_btn):
+            buttons.addWidget(button)
+        buttons.addWidget(self.summary_label, 1)
+
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["Case", "Result", "Time", "Memory"])
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.currentCellChanged.connect(lambda row, *args: self.show_case(row))
+
+        font = QFont("Consolas", 10)
+        self.input_edit = QPlainTextEdit()
+        self.input_edit.setPlaceholderText("Input")
+        self.input_edit.textChanged.connect(self.on_input_edited)
+        self.expected_edit = QPlainTextEdit()
+        self.expected_edit.setPlaceholderText("Expected output")
+        self.expected_edit.textChanged.connect(self.on_expected_edited)
+        self.result_view = QPlainTextEdit()
+        self.result_view.setPlaceholderText("Output, and how it differs from the expected output")
+        self.result_view.setReadOnly(True)
+        for edit in (self.input_edit, self.expected_edit, self.result_view):
+            edit.setFont(font)
+
+        splitter = QSplitter(Qt.Horizontal)
+        for widget in (self.table, self.input_edit, self.expected_edit, self.result_view):
+            splitter.addWidget(widget)
+        layout.addLayout(buttons)
+        layout.addWidget(splitter)
+        self.show_case(-1)
+
+    def add_case(self, case):
+        self.cases.append(case)
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        self.table.setItem(row, 0, QTableWidgetItem(case.name or str(row + 1)))
+        for column in (1, 2, 3):
+            self.table.setItem(row, column, QTableWidgetItem(""))
+        self.table.setCurrentCell(row, 0)
+        if not self.is_running():
+            # The summary of a run in progress is only updated as cases finish
+            self.update_summary()
+
+    def remove_case(self):
+        row = self.table.currentRow()
+        if row < 0 or self.is_running():
+            return
+        del self.cases[row]
+        self.table.removeRow(row)
+        # Results are keyed by row
+        self.results = {index - (index > row): result for index, result in self.results.items() if index != row}
+        self.show_case(self.table.currentRow())
+        self.update_summary()
+
+    def import_cases(self):
+        folder = QFileDialog.getExistingDirectory(self, "Folder with NAME.in and NAME.out files")
+        if not folder:
+            return
+        try:
+            cases = load_cases(folder)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Could not read test cases:\n{str(e)}")
+            return
+        if not cases:
+            QMessageBox.information(self, "Import", "No NAME.in files with a matching NAME.out or NAME.ans found.")
+            return
+        self.table.setUpdatesEnabled(False)
+        for case in cases:
+            self.add_case(case)
+        self.table.setUpdatesEnabled(True)
+
+    def show_case(self, row):
+        valid = 0 <= row < len(self.cases)
+        for edit, text in ((self.input_edit, self.cases[row].input if valid else ""),
+                           (self.expected_edit, self.cases[row].expected if valid else "")):
+            edit.blockSignals(True)
+            edit.setPlainText(text)
+            edit.blockSignals(False)
+            edit.setEnabled(valid)
+        self.show_result(row)
+
+    def show_result(self, row):
+        result = self.results.get(row)
+        if result is None:
+            self.result_view.setPlainText("")
+            return
+        output = result.output
+        text = f"{result.verdict}: {result.run.describe()}; {result.run.stats()}\n\n{output}"
+        if result.verdict not in (PASSED, STOPPED):
+            diff = output_diff(self.cases[row].expected, output)
+            if diff:
+                text += f"\n\n{diff}"
+            if result.run.stderr:
+                text += "\n\nstderr:\n" + result.run.stderr.decode('utf-8', 'replace')
+        self.result_view.setPlainText(text)
+
+    def on_input_edited(self):
+        row = self.table.currentRow()
+        if row >= 0:
+            self.cases[row].input = self.input_edit.toPlainText()
+
+    def on_expected_edited(self):
+        row = self.table.currentRow()
+        if row >= 0:
+            self.cases[row].expected = self.expected_edit.toPlainText()
+
+    def run(self, executable, limits):
+        """Start running every case against executable; finished reports the outcome"""
+        self.results = {}
+        for row in range(self.table.rowCount()):
+            for column in (1, 2, 3):
+                self.table.item(row, column).setText("")
+        self.show_result(self.table.currentRow())
+        self.summary_label.setText(f"Running {len(self.cases)} case(s)...")
+        self.started_at = time.perf_counter()
+        # The runner gets copies, so cases can be edited while it runs
+        cases = [TestCase(case.input, case.expected, case.name) for case in self.cases]
+        self.runner = CaseRunner(executable, cases, limits, parent=self)
+        self.runner.case_finished.connect(self.on_case_finished)
+        self.runner.failed.connect(lambda message: QMessageBox.critical(self, "Error", message))
+        self.runner.finished.connect(self.on_run_finished)
+        self.runner.start()
+
+    def is_running(self):
+        return self.runner is not None and self.runner.isRunning()
+
+    def stop(self):
+        if self.runner is not None:
+            self.runner.stop()
+
+    def wait(self):
+        if self.runner is not None:
+            self.runner.stop()
+            self.runner.wait()
+
+    def set_busy(self, busy):
+        for button in (self.run_btn, self.add_btn, self.remove_btn, self.import_btn):
+            button.setEnabled(not busy)
+
+    def on_case_finished(self, index, result):
+        if index >= self.table.rowCount():
+            return
+        self.results[index] = result
+        verdict_item = self.table.item(index, 1)
+        verdict_item.setText(result.verdict)
+        verdict_item.setForeground(QColor(VERDICT_COLORS.get(result.verdict, FAILED_COLOR)))
+        self.table.item(index, 2).setText(f"{result.run.wall:.3f} s")
+        if result.run.max_rss is not None:
+            self.table.item(index, 3).setText(f"{result.run.max_rss / (1024 * 1024):.1f} MB")
+        self.summary_label.setText(f"{len(self.results)}/{len(self.runner.cases)} case(s) run...")
+        if index == self.table.currentRow():
+            self.show_result(index)
+
+    def on_run_finished(self):
+        self.elapsed = time.perf_counter() - self.started_at
+        self.update_summary()
+        self.finished.emit(self.summary_label.text())
+
+    def update_summary(self):
+        if not self.cases:
+            self.summary_label.setText("No test cases")
+            return
+        if not self.results:
+            self.summary_label.setText(f"{len(self.cases)} case(s)")
+            return
+        passed = sum(result.verdict == PASSED for result in self.results.values())
+        summary = f"Passed {passed}/{len(self.cases)} in {self.elapsed:.2f} s"
+        # Runs cut short by Stop say nothing about the program's speed
+        judged = [result.run for result in self.results.values() if result.verdict != STOPPED]
+        if judged:
+            summary += f", slowest {max(run.wall for run in judged):.3f} s"
+        peaks = [run.max_rss for run in judged if run.max_rss is not None]
+        if peaks:
+            summary += f", peak {max(peaks) / (1024 * 1024):.1f} MB"
+        stopped = len(self.results) - len(judged)
+        if stopped:
+            summary += f", {stopped} stopped"
+        self.summary_label.setText(summary)
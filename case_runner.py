@@ -0,0 +1,166 @@
+"""Checking a compiled program against input/expected-output pairs.
+
+A CaseBatch runs every case through sandbox Workers, one per core, and
+judges the output. Outputs match when they have the same lines, ignoring
+trailing whitespace on a line and blank lines at the end. A case that
+CaseBatch.stop() kills before it passes is reported as STOPPED, not as a
+failure.
+"""
+import difflib
+import os
+import queue
+import re
+import shutil
+import signal
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import sandbox
+
+PASSED = "Passed"
+WRONG_ANSWER = "Wrong answer"
+RUNTIME_ERROR = "Runtime error"
+TIME_LIMIT = "Time limit"
+STOPPED = "Stopped"
+
+INPUT_SUFFIXES = ('.in',)
+EXPECTED_SUFFIXES = ('.out', '.ans')
+
+# Diff lines shown for a wrong answer
+DIFF_LINES = 200
+
+
+class TestCase:
+    def __init__(self, input='', expected='', name=''):
+        self.input = input
+        self.expected = expected
+        self.name = name
+
+
+class CaseResult:
+    def __init__(self, verdict, run):
+        self.verdict = verdict
+        self.run = run   # sandbox.RunResult
+
+    @property
+    def output(self):
+        return self.run.stdout.decode('utf-8', 'replace')
+
+
+def normalise(text):
+    lines = [line.rstrip() for line in text.splitlines()]
+    while lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def judge(run, expected):
+    if run.timed_out or run.signal_number == getattr(signal, 'SIGXCPU', None):
+        return TIME_LIMIT
+    if run.exit_code != 0:
+        return RUNTIME_ERROR
+    if normalise(run.stdout.decode('utf-8', 'replace')) != normalise(expected):
+        return WRONG_ANSWER
+    return PASSED
+
+
+def output_diff(expected, actual, limit=DIFF_LINES):
+    """Unified diff from expected to actual output, cut to limit lines"""
+    lines = list(difflib.unified_diff(normalise(expected), normalise(actual),
+                                      "expected", "output", lineterm=""))
+    if len(lines) > limit:
+        lines = lines[:limit] + [f"... {len(lines) - limit} more lines"]
+    return "\n".join(lines)
+
+
+def _natural_key(name):
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r'(\d+)', name)]
+
+
+def load_cases(folder):
+    """Return a TestCase for every NAME.in in folder that has a NAME.out or NAME.ans"""
+    files = {name.lower(): name for name in os.listdir(folder)}
+    cases = []
+    for name in sorted(files.values(), key=_natural_key):
+        stem, suffix = os.path.splitext(name)
+        if suffix.lower() not in INPUT_SUFFIXES:
+            continue
+        for expected_suffix in EXPECTED_SUFFIXES:
+            expected = files.get((stem + expected_suffix).lower())
+            if expected is not None:
+                break
+        else:
+            continue
+        with open(os.path.join(folder, name), encoding='utf-8', errors='replace') as f:
+            text = f.read()
+        with open(os.path.join(folder, expected), encoding='utf-8', errors='replace') as f:
+            cases.append(TestCase(text, f.read(), stem))
+    return cases
+
+
+class CaseBatch:
+    """One run of a program against a list of cases, which stop() can cut short"""
+
+    def __init__(self, executable, cases, limits, workers=None):
+        self.executable = executable
+        self.cases = cases
+        self.limits = limits
+        self.workers = workers or os.cpu_count() or 1
+        self.started = []
+        self._lock = threading.Lock()
+        self._stop_requested = False
+
+    def stop(self):
+        with self._lock:
+            self._stop_requested = True
+            for worker in self.started:
+                worker.stop()
+
+    def results(self):
+        """Run every case and yield (index, CaseResult) as each finishes.
+
+        Each run is a separate process, so threads are enough to keep every
+        core busy. Every thread has a Worker of its own.
+        """
+        folder = tempfile.mkdtemp(prefix="eduverse-cases-")
+        idle = queue.SimpleQueue()
+        try:
+            with self._lock:
+                for _ in range(min(self.workers, len(self.cases))):
+                    if self._stop_requested:
+                        break
+                    worker = sandbox.Worker(self.executable, self.limits, folder)
+                    self.started.append(worker)
+                    idle.put(worker)
+
+            def run_case(index):
+                if self._stop_requested:
+                    return index, None
+                worker = idle.get()
+                try:
+                    case = self.cases[index]
+                    result = worker.run(str(index), case.input.encode('utf-8'))
+                finally:
+                    idle.put(worker)
+                verdict = judge(result, case.expected)
+                if verdict != PASSED and self._stop_requested:
+                    verdict = STOPPED
+                return index, CaseResult(verdict, result)
+
+            with ThreadPoolExecutor(max_workers=len(self.started) or 1) as pool:
+                futures = [pool.submit(run_case, index) for index in range(len(self.cases))]
+                try:
+                    for future in as_completed(futures):
+                        index, result = future.result()
+                        if result is not None:
+                            yield index, result
+                finally:
+                    # Also when the caller stops early; the pool waits for running cases
+                    for future in futures:
+                        future.cancel()
+                    self.stop()
+        finally:
+            for worker in self.started:
+                worker.close()
+            shutil.rmtree(folder, ignore_errors=True)
@@ -0,0 +1,155 @@
+from PyQt5.QtWidgets import QListView, QStyledItemDelegate, QStyle, QAbstractItemView
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QSize
+from PyQt5.QtGui import QColor, QFont, QFontMetrics
+from datetime import datetime
+
+# Roles exposed by ChatMessageModel in addition to Qt.DisplayRole
+MessageIdRole = Qt.UserRole + 1
+SenderRole = Qt.UserRole + 2
+MessageRole = Qt.UserRole + 3
+TimeRole = Qt.UserRole + 4
+TimestampRole = Qt.UserRole + 5
+
+
+def chat_row(message_id, sender, message, timestamp=None):
+    """Build a model row, formatting the display time once when the row is fetched"""
+    ts = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    # Stored timestamps are "%Y-%m-%d %H:%M:%S", so HH:MM is a plain slice
+    return (message_id, sender, message, ts[11:16], ts)
+
+
+class ChatMessageModel(QAbstractListModel):
+    """Holds only the chat pages loaded so far, oldest first"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        message_id, sender, message, display_time, timestamp = self.rows[index.row()]
+        if role == Qt.DisplayRole:
+            return f"[{display_time}] {sender}: {message}"
+        if role == SenderRole:
+            return sender
+        if role == MessageRole:
+            return message
+        if role == TimeRole:
+            return display_time
+        if role == TimestampRole:
+            return timestamp
+        if role == MessageIdRole:
+            return message_id
+        return None
+
+    def prepend_messages(self, messages):
+        """Insert (id, sender, message, timestamp) rows above the loaded history"""
+        if not messages:
+            return
+        self.beginInsertRows(QModelIndex(), 0, len(messages) - 1)
+        self.rows[:0] = [chat_row(*m) for m in messages]
+        self.endInsertRows()
+
+    def append_message(self, message_id, sender, message, timestamp=None):
+        row = len(self.rows)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.rows.append(chat_row(message_id, sender, message, timestamp))
+        self.endInsertRows()
+
+
+class ChatMessageDelegate(QStyledItemDelegate):
+    """Paints "[HH:MM] sender: message" with the message wrapped under a hanging indent"""
+
+    PADDING = 4
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+
+    def _fonts(self, option):
+        bold = QFont(option.font)
+        bold.setBold(True)
+        return option.fontMetrics, QFontMetrics(bold), bold
+
+    def _header_width(self, fm, bold_fm, index):
+        return (fm.horizontalAdvance(f"[{index.data(TimeRole)}] ")
+                + bold_fm.horizontalAdvance(f"{index.data(SenderRole)}: "))
+
+    def sizeHint(self, option, index):
+        fm, bold_fm, _ = self._fonts(option)
+        width = self.view.viewport().width() - 2 * self.PADDING
+        text_width = max(1, width - self._header_width(fm, bold_fm, index))
+        text_rect = fm.boundingRect(QRect(0, 0, text_width, 0), Qt.TextWordWrap, index.data(MessageRole))
+        return QSize(width, max(fm.height(), text_rect.height()) + 2 * self.PADDING)
+
+    def paint(self, painter, option, index):
+        fm, bold_fm, bold = self._fonts(option)
+        painter.save()
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+
+        rect = option.rect.adjusted(self.PADDING, self.PADDING, -self.PADDING, -self.PADDING)
+        time_text = f"[{index.data(TimeRole)}] "
+        sender_text = f"{index.data(SenderRole)}: "
+
+        painter.setPen(QColor("#808080"))
+        painter.drawText(rect, Qt.AlignLeft | Qt.AlignTop, time_text)
+        x = rect.left() + fm.horizontalAdvance(time_text)
+
+        painter.setPen(option.palette.text().color())
+        painter.setFont(bold)
+        painter.drawText(QRect(x, rect.top(), rect.right() - x, rect.height()),
+                         Qt.AlignLeft | Qt.AlignTop, sender_text)
+        x += bold_fm.horizontalAdvance(sender_text)
+
+        painter.setFont(option.font)
+        painter.drawText(QRect(x, rect.top(), rect.right() - x, rect.height()),
+                         Qt.AlignLeft | Qt.AlignTop | Qt.TextWordWrap, index.data(MessageRole))
+        painter.restore()
+
+
+class ChatView(QListView):
+    """List view over ChatMessageModel; only rows in the viewport are painted"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setModel(ChatMessageModel(self))
+        self.setItemDelegate(ChatMessageDelegate(self))
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setResizeMode(QListView.Adjust)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setWordWrap(True)
+
+        # Keep the newest message in view until the user scrolls away from it
+        self.follow_bottom = True
+        bar = self.verticalScrollBar()
+        bar.valueChanged.connect(self._track_bottom)
+        bar.rangeChanged.connect(self._keep_bottom)
+
+    def _track_bottom(self, value):
+        self.follow_bottom = value == self.verticalScrollBar().maximum()
+
+    def _keep_bottom(self, minimum, maximum):
+        if self.follow_bottom:
+            self.verticalScrollBar().setValue(maximum)
+
+    def prepend_messages(self, messages):
+        """Add older rows above the history without moving what is on screen"""
+        model = self.model()
+        top = self.indexAt(self.viewport().rect().topLeft())
+        offset = self.visualRect(top).top() if top.isValid() else 0
+        model.prepend_messages(messages)
+        if top.isValid():
+            anchor = model.index(top.row() + len(messages))
+            self.scrollTo(anchor, QAbstractItemView.PositionAtTop)
+            bar = self.verticalScrollBar()
+            bar.setValue(bar.value() - offset)
+
+    def append_message(self, message_id, sender, message, timestamp=None):
+        """Add a new row at the bottom; the view follows it if it was already there"""
+        self.model().append_message(message_id, sender, message, timestamp)
@@ -0,0 +1,111 @@
+import os
+import shutil
+import tempfile
+
+from PyQt5.QtCore import QObject, QProcess, QTimer, pyqtSignal
+
+from build_cache import EXECUTABLE_SUFFIX, BuildCache, build_key
+
+COMPILE_TIMEOUT_MS = 30000
+
+
+class CodeCompiler(QObject):
+    """Compiles C/C++ source with gcc/g++ in a QProcess, without blocking the GUI.
+
+    Each build gets a private temporary directory, which cleanup() or the
+    next build deletes. Successful builds go into a BuildCache, and code
+    that is already there is not compiled again.
+    """
+
+    succeeded = pyqtSignal(str, str, bool)   # executable path, compiler warnings, from the cache
+    failed = pyqtSignal(str)           # compiler errors, or why it did not run
+    cancelled = pyqtSignal()
+
+    def __init__(self, timeout_ms=COMPILE_TIMEOUT_MS, flags=(), cache=None, parent=None):
+        super().__init__(parent)
+        self.timeout_ms = timeout_ms
+        self.flags = list(flags)
+        self.cache = cache if cache is not None else BuildCache()
+        self.build_dir = None
+        self.executable = None
+        self._key = None
+        self._stop_reason = None
+
+        self.process = QProcess(self)
+        self.process.finished.connect(self.on_finished)
+        self.process.errorOccurred.connect(self.on_error)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.on_timeout)
+
+    def is_running(self):
+        return self.process.state() != QProcess.NotRunning
+
+    def compile(self, code, is_cpp):
+        """Start compiling code; returns False if a build is already running"""
+        if self.is_running():
+            return False
+        self.cleanup()
+        compiler = "g++" if is_cpp else "gcc"
+        self._key = build_key(code, compiler, self.flags)
+        cached = self.cache.lookup(self._key)
+        if cached is not None:
+            # Reported from the event loop, like a real build
+            QTimer.singleShot(0, lambda: self.succeeded.emit(cached, "", True))
+            return True
+
+        self.build_dir = tempfile.mkdtemp(prefix="eduverse-build-")
+        source = os.path.join(self.build_dir, "main.cpp" if is_cpp else "main.c")
+        with open(source, 'w', encoding='utf-8') as f:
+            f.write(code)
+        self.executable = os.path.join(self.build_dir, "main" + EXECUTABLE_SUFFIX)
+
+        self._stop_reason = None
+        self.process.start(compiler, [*self.flags, source, "-o", self.executable])
+        self.timer.start(self.timeout_ms)
+        return True
+
+    def cancel(self):
+        if self.is_running():
+            self._stop_reason = 'cancelled'
+            self.process.kill()
+
+    def wait(self, timeout_ms=1000):
+        """Cancel any build and wait for the compiler to exit"""
+        self.cancel()
+        return self.process.waitForFinished(timeout_ms)
+
+    def cleanup(self):
+        """Delete the last build's source and executable"""
+        if self.build_dir is not None:
+            shutil.rmtree(self.build_dir, ignore_errors=True)
+            self.build_dir = self.executable = None
+
+    def on_timeout(self):
+        if self.is_running():
+            self._stop_reason = 'timeout'
+            self.process.kill()
+
+    def on_finished(self, exit_code, exit_status):
+        self.timer.stop()
+        messages = self.process.readAllStandardError().data().decode(errors='replace')
+        stop_reason, self._stop_reason = self._stop_reason, None
+        if stop_reason == 'cancelled':
+            self.cancelled.emit()
+        elif stop_reason == 'timeout':
+            self.failed.emit(f"Compilation timed out after {self.timeout_ms / 1000:g} s")
+        elif exit_status == QProcess.NormalExit and exit_code == 0:
+            try:
+                executable = self.cache.store(self._key, self.executable)
+            except OSError as e:
+                self.failed.emit(f"Could not store the build: {e}")
+                return
+            self.succeeded.emit(executable, messages, False)
+        else:
+            self.failed.emit(f"Compilation failed:\n{messages}")
+
+    def on_error(self, error):
+        # A compiler that started and then died is reported by on_finished
+        if error == QProcess.FailedToStart:
+            self.timer.stop()
+            self.failed.emit(f"Could not start {self.process.program()}: {self.process.errorString()}")
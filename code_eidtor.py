@@ -1,72 +1,168 @@
 import os
-import tempfile
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QPlainTextEdit, QFileDialog,
-    QLabel, QComboBox, QStatusBar, QMessageBox
+    QLabel, QComboBox, QStatusBar, QMessageBox, QSpinBox, QTabWidget
 )
 from PyQt5.QtGui import QFont, QColor, QTextCursor, QTextCharFormat, QSyntaxHighlighter
-from PyQt5.QtCore import QProcess, Qt, QRegExp, pyqtSignal
+from PyQt5.QtCore import Qt, QRegularExpression, pyqtSignal
+
+from case_panel import TestCasePanel
+from code_compiler import COMPILE_TIMEOUT_MS, CodeCompiler
+from large_file import ChunkedFileLoader, IdleHighlighter
+from program_runner import ProgramRunner
+from sandbox import Limits
+
+# Files bigger than this open in large-file mode: loaded in chunks and
+# highlighted viewport first
+LARGE_FILE_BYTES = 1024 * 1024
+# Files bigger than this are highlighted without keywords and numbers
+MINIMAL_HIGHLIGHT_BYTES = 16 * 1024 * 1024
+
+# C/C++ keywords
+KEYWORDS = [
+    "asm", "auto", "bool", "break", "case", "catch", "char", "class", "const", "const_cast",
+    "continue", "default", "delete", "do", "double", "dynamic_cast", "else", "enum", "explicit",
+    "export", "extern", "false", "float", "for", "friend", "goto", "if", "inline", "int", "long",
+    "mutable", "namespace", "new", "operator", "private", "protected", "public", "register",
+    "reinterpret_cast", "return", "short", "signed", "sizeof", "static", "static_cast", "struct",
+    "switch", "template", "this", "throw", "true", "try", "typedef", "typeid", "typename", "union",
+    "unsigned", "using", "virtual", "void", "volatile", "wchar_t", "while"
+]
+
+def make_format(color, bold=False):
+    text_format = QTextCharFormat()
+    text_format.setForeground(QColor(color))
+    if bold:
+        text_format.setFontWeight(QFont.Bold)
+    return text_format
 
 class CppHighlighter(QSyntaxHighlighter):
+    """Highlights C/C++ with a single precompiled scanner.
+
+    Every kind of token is one branch of one QRegularExpression, matched
+    left to right. A string therefore hides the comment markers inside it,
+    and a comment hides quotes. Block comments and raw strings that run
+    past the end of a line carry on through the block state.
+    """
+
+    NORMAL = 0
+    IN_COMMENT = 1
+    IN_RAW_STRING = 2   # Plus the index of the raw string's delimiter
+
+    # Capture groups of TOKENS, one per kind of token
+    LINE_COMMENT, BLOCK_COMMENT, RAW_STRING, RAW_DELIMITER, STRING, CHARACTER, NUMBER, KEYWORD = range(1, 9)
+    TOKEN_RULES = [
+        r"(//.*)",
+        r"(/\*)",
+        r'((?:u8|[uUL])?R"([^()\\\s]{0,16})\()',
+        r'("(?:\\.|[^"\\])*"?)',
+        r"('(?:\\.|[^'\\])*'?)",
+        r"\b(0[xX][0-9a-fA-F']+[uUlL]*|[0-9][0-9']*(?:\.[0-9]*)?(?:[eE][+-]?[0-9]+)?[uUlLfF]*)\b",
+        r"\b(" + "|".join(KEYWORDS) + r")\b",
+    ]
+    TOKENS = "|".join(TOKEN_RULES)
+    # Comments and strings only, which the block state needs, for huge files
+    MINIMAL_TOKENS = "|".join(TOKEN_RULES[:5])
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.highlightingRules = []
-        
-        # C/C++ keywords
-        keywords = [
-            "\\basm\\b", "\\bauto\\b", "\\bbool\\b", "\\bbreak\\b", "\\bcase\\b",
-            "\\bcatch\\b", "\\bchar\\b", "\\bclass\\b", "\\bconst\\b", "\\bconst_cast\\b",
-            "\\bcontinue\\b", "\\bdefault\\b", "\\bdelete\\b", "\\bdo\\b", "\\bdouble\\b",
-            "\\bdynamic_cast\\b", "\\belse\\b", "\\benum\\b", "\\bexplicit\\b", "\\bexport\\b",
-            "\\bextern\\b", "\\bfalse\\b", "\\bfloat\\b", "\\bfor\\b", "\\bfriend\\b",
-            "\\bgoto\\b", "\\bif\\b", "\\binline\\b", "\\bint\\b", "\\blong\\b",
-            "\\bmutable\\b", "\\bnamespace\\b", "\\bnew\\b", "\\boperator\\b", "\\bprivate\\b",
-            "\\bprotected\\b", "\\bpublic\\b", "\\bregister\\b", "\\breinterpret_cast\\b",
-            "\\breturn\\b", "\\bshort\\b", "\\bsigned\\b", "\\bsizeof\\b", "\\bstatic\\b",
-            "\\bstatic_cast\\b", "\\bstruct\\b", "\\bswitch\\b", "\\btemplate\\b", "\\bthis\\b",
-            "\\bthrow\\b", "\\btrue\\b", "\\btry\\b", "\\btypedef\\b", "\\btypeid\\b",
-            "\\btypename\\b", "\\bunion\\b", "\\bunsigned\\b", "\\busing\\b", "\\bvirtual\\b",
-            "\\bvoid\\b", "\\bvolatile\\b", "\\bwchar_t\\b", "\\bwhile\\b"
-        ]
-        
-        keyword_format = QTextCharFormat()
-        keyword_format.setForeground(QColor("#569CD6"))
-        keyword_format.setFontWeight(QFont.Bold)
-        for pattern in keywords:
-            self.highlightingRules.append((QRegExp(pattern), keyword_format))
-        
-        # Preprocessor directives
-        preprocessor_format = QTextCharFormat()
-        preprocessor_format.setForeground(QColor("#C586C0"))
-        self.highlightingRules.append((QRegExp("#.*"), preprocessor_format))
-        
-        # Strings
-        string_format = QTextCharFormat()
-        string_format.setForeground(QColor("#CE9178"))
-        self.highlightingRules.append((QRegExp("\".*\""), string_format))
-        self.highlightingRules.append((QRegExp("\'.*\'"), string_format))
-        
-        # Comments
-        comment_format = QTextCharFormat()
-        comment_format.setForeground(QColor("#6A9955"))
-        self.highlightingRules.append((QRegExp("//[^\n]*"), comment_format))
-        self.highlightingRules.append((QRegExp("/\\*.*\\*/"), comment_format))
-        
-        # Numbers
-        number_format = QTextCharFormat()
-        number_format.setForeground(QColor("#B5CEA8"))
-        self.highlightingRules.append((QRegExp("\\b\\d+\\b"), number_format))
+        self.set_minimal(False)
+        # In deferred mode only blocks before highlighted_until or inside
+        # window are highlighted; see large_file.IdleHighlighter
+        self.deferred = False
+        self.highlighted_until = 0
+        self.last_highlighted = -1
+        self.window = (0, -1)
+        self.comment_end = QRegularExpression(r"\*/")
+        self.preprocessor = QRegularExpression(r"^\s*#")
+        self.raw_delimiters = []
+        self.raw_string_ends = {}
+
+        self.keyword_format = make_format("#569CD6", bold=True)
+        self.preprocessor_format = make_format("#C586C0")
+        self.string_format = make_format("#CE9178")
+        self.comment_format = make_format("#6A9955")
+        self.number_format = make_format("#B5CEA8")
+        self.token_formats = {
+            self.LINE_COMMENT: self.comment_format,
+            self.STRING: self.string_format,
+            self.CHARACTER: self.string_format,
+            self.NUMBER: self.number_format,
+            self.KEYWORD: self.keyword_format,
+        }
+
+    def set_minimal(self, minimal):
+        """Skip keywords and numbers, the most frequent tokens"""
+        self.minimal = minimal
+        self.tokens = QRegularExpression(self.MINIMAL_TOKENS if minimal else self.TOKENS)
+        self.tokens.optimize()
+
+    def set_deferred(self, deferred):
+        self.deferred = deferred
+        self.highlighted_until = 0
+        self.last_highlighted = -1
+        self.window = (0, -1)
 
     def highlightBlock(self, text):
-        for pattern, format in self.highlightingRules:
-            expression = QRegExp(pattern)
-            index = expression.indexIn(text)
-            while index >= 0:
-                length = expression.matchedLength()
-                self.setFormat(index, length, format)
-                index = expression.indexIn(text, index + length)
-        
-        self.setCurrentBlockState(0)
+        if self.deferred:
+            number = self.currentBlock().blockNumber()
+            if number >= self.highlighted_until and not self.window[0] <= number <= self.window[1]:
+                return
+            self.last_highlighted = number
+        self.setCurrentBlockState(self.NORMAL)
+        state = self.previousBlockState()
+        start = 0
+        if state == self.IN_COMMENT:
+            start = self.format_until(text, 0, 0, self.comment_end, self.comment_format, state)
+        elif state >= self.IN_RAW_STRING:
+            end = self.raw_string_ends[self.raw_delimiters[state - self.IN_RAW_STRING]]
+            start = self.format_until(text, 0, 0, end, self.string_format, state)
+        elif self.preprocessor.match(text).hasMatch():
+            self.setFormat(0, len(text), self.preprocessor_format)
+        if start >= 0:
+            self.highlight_tokens(text, start)
+
+    def highlight_tokens(self, text, start):
+        matches = self.tokens.globalMatch(text, start)
+        while matches.hasNext():
+            match = matches.next()
+            group = match.lastCapturedIndex()
+            begin = match.capturedStart()
+            if group == self.BLOCK_COMMENT:
+                end = self.format_until(text, begin, match.capturedEnd(), self.comment_end,
+                                        self.comment_format, self.IN_COMMENT)
+            elif group in (self.RAW_STRING, self.RAW_DELIMITER):
+                state = self.raw_string_state(match.captured(self.RAW_DELIMITER))
+                end = self.format_until(text, begin, match.capturedEnd(),
+                                        self.raw_string_ends[self.raw_delimiters[state - self.IN_RAW_STRING]],
+                                        self.string_format, state)
+            else:
+                self.setFormat(begin, match.capturedLength(), self.token_formats[group])
+                continue
+            if end < 0:
+                return
+            matches = self.tokens.globalMatch(text, end)
+
+    def format_until(self, text, begin, search_from, end_expression, text_format, state):
+        """Format from begin through end_expression and return where code resumes.
+
+        If the line ends first, the rest of it is formatted, the block takes
+        state and -1 is returned.
+        """
+        match = end_expression.match(text, search_from)
+        if not match.hasMatch():
+            # Qt counts UTF-16 units, at most twice len(text); setFormat clips the excess
+            self.setFormat(begin, 2 * len(text) - begin, text_format)
+            self.setCurrentBlockState(state)
+            return -1
+        self.setFormat(begin, match.capturedEnd() - begin, text_format)
+        return match.capturedEnd()
+
+    def raw_string_state(self, delimiter):
+        if delimiter not in self.raw_string_ends:
+            self.raw_delimiters.append(delimiter)
+            self.raw_string_ends[delimiter] = QRegularExpression(QRegularExpression.escape(')' + delimiter + '"'))
+        return self.IN_RAW_STRING + self.raw_delimiters.index(delimiter)
 
 class CodeEditor(QDialog):
     def __init__(self, parent=None):
@@ -85,11 +181,21 @@ class CodeEditor(QDialog):
         """)
         
         self.current_file = None
-        self.process = QProcess(self)
-        self.process.readyReadStandardOutput.connect(self.read_stdout)
-        self.process.readyReadStandardError.connect(self.read_stderr)
+        self.large_file_bytes = LARGE_FILE_BYTES
+        self.minimal_highlight_bytes = MINIMAL_HIGHLIGHT_BYTES
+        # Programs run under CPU, memory, file size and process limits
+        self.run_limits = Limits()
+        self.runner = None
+        self.testing = False
+        
+        # Builds run in the background; the program starts when one succeeds
+        self.compiler = CodeCompiler(parent=self)
+        self.compiler.succeeded.connect(self.on_compiled)
+        self.compiler.failed.connect(self.on_compile_failed)
+        self.compiler.cancelled.connect(self.on_compile_cancelled)
         
         self.init_ui()
+        self.set_busy(False)
 
     def init_ui(self):
         layout = QVBoxLayout(self)
@@ -112,18 +218,44 @@ class CodeEditor(QDialog):
         """)
         self.lang_combo.setFixedWidth(100)
         
+        self.timeout_spin = QSpinBox()
+        self.timeout_spin.setRange(1, 600)
+        self.timeout_spin.setValue(COMPILE_TIMEOUT_MS // 1000)
+        self.timeout_spin.setPrefix("Compile timeout: ")
+        self.timeout_spin.setSuffix(" s")
+        self.timeout_spin.setStyleSheet("""
+            QSpinBox {
+                background-color: #333;
+                color: #fff;
+                padding: 4px;
+                border: 1px solid #444;
+                border-radius: 4px;
+            }
+        """)
+        
+        self.run_timeout_spin = QSpinBox()
+        self.run_timeout_spin.setRange(0, 3600)
+        self.run_timeout_spin.setSpecialValueText("Run timeout: off")
+        self.run_timeout_spin.setPrefix("Run timeout: ")
+        self.run_timeout_spin.setSuffix(" s")
+        self.run_timeout_spin.setStyleSheet(self.timeout_spin.styleSheet())
+        
         self.run_btn = self.create_button("Run", self.run_code, "#0e639c")
+        self.stop_btn = self.create_button("Stop", self.stop_code, "#a1260d")
         self.open_btn = self.create_button("Open", self.open_file, "#007acc")
         self.save_btn = self.create_button("Save", self.save_file, "#388a34")
         self.save_as_btn = self.create_button("Save As", self.save_file_as, "#388a34")
         self.clear_btn = self.create_button("Clear", self.clear_output, "#d6563c")
         
         toolbar.addWidget(self.lang_combo)
+        toolbar.addWidget(self.timeout_spin)
+        toolbar.addWidget(self.run_timeout_spin)
         toolbar.addStretch(1)
         toolbar.addWidget(self.open_btn)
         toolbar.addWidget(self.save_btn)
         toolbar.addWidget(self.save_as_btn)
         toolbar.addWidget(self.run_btn)
+        toolbar.addWidget(self.stop_btn)
         toolbar.addWidget(self.clear_btn)
         
         # Editor
@@ -137,6 +269,11 @@ class CodeEditor(QDialog):
             }
         """)
         self.highlighter = CppHighlighter(self.editor.document())
+        self.idle_highlighter = IdleHighlighter(self.editor, self.highlighter, self)
+        self.loader = ChunkedFileLoader(self)
+        self.loader.chunk_loaded.connect(self.on_chunk_loaded)
+        self.loader.finished.connect(self.on_load_finished)
+        self.loader.failed.connect(self.on_load_failed)
         
         # Output
         self.output = QPlainTextEdit()
@@ -150,6 +287,30 @@ class CodeEditor(QDialog):
         """)
         self.output.setReadOnly(True)
         
+        # Test cases, run against the program in parallel
+        self.test_panel = TestCasePanel()
+        self.test_panel.run_requested.connect(self.run_tests)
+        self.test_panel.finished.connect(self.on_tests_finished)
+        
+        self.output_tabs = QTabWidget()
+        self.output_tabs.setStyleSheet("""
+            QTabWidget::pane {
+                border: none;
+            }
+            QTabBar::tab {
+                background-color: #2d2d2d;
+                color: #d4d4d4;
+                padding: 4px 12px;
+                border: 1px solid #444;
+            }
+            QTabBar::tab:selected {
+                background-color: #1e1e1e;
+                color: #c586c0;
+            }
+        """)
+        self.output_tabs.addTab(self.output, "Output")
+        self.output_tabs.addTab(self.test_panel, "Test Cases")
+        
         # Status bar
         self.status_bar = QStatusBar()
         self.status_bar.setStyleSheet("""
@@ -166,8 +327,7 @@ class CodeEditor(QDialog):
         layout.addLayout(toolbar)
         layout.addWidget(QLabel("Editor:"))
         layout.addWidget(self.editor)
-        layout.addWidget(QLabel("Output:"))
-        layout.addWidget(self.output)
+        layout.addWidget(self.output_tabs)
         layout.addWidget(self.status_bar)
 
     def create_button(self, text, slot, color):
@@ -214,6 +374,11 @@ class CodeEditor(QDialog):
         )
         if path:
             try:
+                self.stop_loading()
+                size = os.path.getsize(path)
+                if size > self.large_file_bytes:
+                    self.open_large_file(path, size)
+                    return
                 with open(path, 'r') as file:
                     self.editor.setPlainText(file.read())
                     self.current_file = path
@@ -222,6 +387,46 @@ class CodeEditor(QDialog):
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to open file:\n{str(e)}")
     
+    def open_large_file(self, path, size):
+        self.highlighter.set_minimal(size > self.minimal_highlight_bytes)
+        self.idle_highlighter.start()
+        self.editor.document().setUndoRedoEnabled(False)
+        self.editor.clear()
+        self.editor.setReadOnly(True)  # Until the whole file is in
+        self.current_file = path
+        self.update_language_by_extension(path)
+        self.loader.load(path, size)
+    
+    def on_chunk_loaded(self, text, done, total):
+        first_chunk = self.editor.document().isEmpty()
+        cursor = QTextCursor(self.editor.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+        if first_chunk:
+            self.idle_highlighter.highlight_viewport()
+        self.status_bar.showMessage(f"Loading {self.current_file}... {done * 100 // max(total, 1)}%")
+    
+    def on_load_finished(self):
+        self.editor.setReadOnly(False)
+        self.editor.document().setUndoRedoEnabled(True)
+        self.idle_highlighter.highlight_viewport()
+        self.idle_highlighter.resume()
+        mode = "large file, keywords not highlighted" if self.highlighter.minimal else "large file"
+        self.status_bar.showMessage(f"Opened: {self.current_file} ({mode})")
+    
+    def on_load_failed(self, message):
+        self.stop_loading()
+        QMessageBox.critical(self, "Error", f"Failed to open file:\n{message}")
+    
+    def stop_loading(self):
+        """Abandon any large file still loading and go back to normal highlighting"""
+        if self.loader.is_loading():
+            self.loader.cancel()
+            self.editor.setReadOnly(False)
+            self.editor.document().setUndoRedoEnabled(True)
+        self.idle_highlighter.stop()
+        self.highlighter.set_minimal(False)
+    
     def save_file(self):
         if self.current_file:
             self._save_to_file(self.current_file)
@@ -257,65 +462,123 @@ class CodeEditor(QDialog):
             self.lang_combo.setCurrentIndex(1)  # C++
     
     def run_code(self):
+        self.start_build(testing=False)
+    
+    def run_tests(self):
+        if not self.test_panel.cases:
+            QMessageBox.warning(self, "Warning", "Add some test cases first!")
+            return
+        self.start_build(testing=True)
+    
+    def start_build(self, testing):
         if not self.editor.toPlainText().strip():
             QMessageBox.warning(self, "Warning", "Editor is empty!")
             return
+        if self.compiler.is_running() or self.is_program_running() or self.test_panel.is_running():
+            return
         
+        self.testing = testing
         self.output.clear()
-        self.status_bar.showMessage("Running...")
+        self.status_bar.showMessage("Compiling...")
         
         code = self.editor.toPlainText()
         is_cpp = self.lang_combo.currentText() == "C++"
-        
-        try:
-            # Create temp file
-            with tempfile.NamedTemporaryFile(
-                mode='w', 
-                delete=False, 
-                suffix='.cpp' if is_cpp else '.c'
-            ) as tmp_file:
-                tmp_file.write(code)
-                tmp_path = tmp_file.name
-            
-            # Determine compiler and executable path
-            compiler = "g++" if is_cpp else "gcc"
-            exe_path = tmp_path + (".exe" if os.name == 'nt' else ".out")
-            
-            # Compile
-            compile_cmd = [compiler, tmp_path, "-o", exe_path]
-            compile_proc = QProcess()
-            compile_proc.start(compile_cmd[0], compile_cmd[1:])
-            
-            if not compile_proc.waitForFinished(5000):
-                raise Exception("Compilation timed out")
-            
-            if compile_proc.exitCode() != 0:
-                error = compile_proc.readAllStandardError().data().decode()
-                raise Exception(f"Compilation failed:\n{error}")
-            
-            # Run
-            self.process.start(exe_path)
-            
-        except Exception as e:
-            self.output.appendPlainText(f"Error: {str(e)}")
-            self.status_bar.showMessage("Execution failed")
+        self.compiler.timeout_ms = self.timeout_spin.value() * 1000
+        self.set_busy(True)
+        self.compiler.compile(code, is_cpp)
+    
+    def on_compiled(self, exe_path, warnings, cached):
+        if warnings:
+            self.output.appendPlainText(warnings)
+        self.status_bar.showMessage(f"{'Testing' if self.testing else 'Running'}... "
+                                    f"({'cached build' if cached else 'compiled'}; {self.build_cache_summary()})")
+        self.run_limits.wall_seconds = self.run_timeout_spin.value() or None
+        if self.testing:
+            self.test_panel.run(exe_path, self.run_limits)
+            return
+        self.runner = ProgramRunner(exe_path, self.run_limits, self)
+        self.runner.output.connect(self.append_output)
+        self.runner.error_output.connect(self.append_output)
+        self.runner.run_finished.connect(self.on_program_finished)
+        self.runner.failed.connect(self.on_program_error)
+        self.runner.start()
+    
+    def is_program_running(self):
+        return self.runner is not None and self.runner.isRunning()
+    
+    def build_cache_summary(self):
+        cache = self.compiler.cache
+        count, size = cache.usage()
+        return (f"build cache: {cache.hits} hit(s), {cache.misses} miss(es), "
+                f"{count} build(s), {size // 1024} KB")
+    
+    def on_compile_failed(self, message):
+        self.output.appendPlainText(f"Error: {message}")
+        self.output_tabs.setCurrentWidget(self.output)
+        self.status_bar.showMessage("Execution failed")
+        self.compiler.cleanup()
+        self.set_busy(False)
+    
+    def on_compile_cancelled(self):
+        self.status_bar.showMessage("Compilation cancelled")
+        self.compiler.cleanup()
+        self.set_busy(False)
+    
+    def on_program_finished(self, result):
+        self.status_bar.showMessage(f"Finished ({result.describe()}; {result.stats()}; "
+                                    f"{self.build_cache_summary()})")
+        self.compiler.cleanup()
+        self.set_busy(False)
+    
+    def on_tests_finished(self, summary):
+        self.status_bar.showMessage(f"{summary} ({self.build_cache_summary()})")
+        self.compiler.cleanup()
+        self.set_busy(False)
+    
+    def on_program_error(self, message):
+        self.output.appendPlainText(f"Error: {message}")
+        self.status_bar.showMessage("Execution failed")
+        self.compiler.cleanup()
+        self.set_busy(False)
+    
+    def stop_code(self):
+        if self.compiler.is_running():
+            self.compiler.cancel()
+        elif self.test_panel.is_running():
+            self.test_panel.stop()
+        elif self.is_program_running():
+            self.runner.stop()
+    
+    def set_busy(self, busy):
+        self.run_btn.setEnabled(not busy)
+        self.stop_btn.setEnabled(busy)
+        self.test_panel.set_busy(busy)
     
     def clear_output(self):
         self.output.clear()
         self.status_bar.showMessage("Output cleared")
     
-    def read_stdout(self):
-        text = self.process.readAllStandardOutput().data().decode()
-        self.output.appendPlainText(text)
+    def append_output(self, text):
+        # Output arrives in arbitrary pieces, so no newline of our own
+        self.output.moveCursor(QTextCursor.End)
+        self.output.insertPlainText(text)
+    
+    def stop_processes(self):
+        """Stop any build and program, and delete their temporary files"""
+        self.loader.cancel()
+        self.compiler.wait()
+        if self.runner is not None:
+            self.runner.stop()
+            self.runner.wait()
+        self.test_panel.wait()
+        self.compiler.cleanup()
     
-    def read_stderr(self):
-        text = self.process.readAllStandardError().data().decode()
-        self.output.appendPlainText(f"Error: {text}")
+    def done(self, result):
+        # Escape and reject() close the dialog without a closeEvent
+        self.stop_processes()
+        super().done(result)
     
     def closeEvent(self, event):
-        if self.process.state() == QProcess.Running:
-            self.process.terminate()
-            if not self.process.waitForFinished(1000):
-                self.process.kill()
+        self.stop_processes()
         event.accept()
 
@@ -1,78 +1,47 @@
 import sqlite3
+import os
+from datetime import datetime
+
+from db_connection import USER_DB, STUDY_ROOM_DB, SEARCH_INDEX_DB, connection, read_connection
+from db_migrations import migrate
+from blob_store import blob_path, remove_blob
+
+DB_FILE = USER_DB
 
 def create_table():
     """Create or update the users table with all required columns"""
-    conn = sqlite3.connect('user.db')
-    cursor = conn.cursor()
-    
-    # First create the basic table if it doesn't exist
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            username TEXT NOT NULL UNIQUE,
-            email TEXT NOT NULL UNIQUE,
-            password TEXT NOT NULL
-        )
-    ''')
-    
-    # Add new columns if they don't exist
-    new_columns = [
-        ('university', 'TEXT DEFAULT ""'),
-        ('department', 'TEXT DEFAULT ""'),
-        ('address', 'TEXT DEFAULT ""'),
-        ('phone', 'TEXT DEFAULT ""'),
-        ('bio', 'TEXT DEFAULT ""')
-    ]
-    
-    for column_name, column_type in new_columns:
-        try:
-            cursor.execute(f'ALTER TABLE users ADD COLUMN {column_name} {column_type}')
-        except sqlite3.OperationalError:
-            pass  # Column already exists
-    
-    conn.commit()
-    conn.close()
+    migrate(DB_FILE)
 
 def insert_user(name, username, email, password):
     """Insert a new user into the database"""
-    conn = sqlite3.connect('user.db')
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute('''
-            INSERT INTO users (name, username, email, password)
-            VALUES (?, ?, ?, ?)
-        ''', (name, username, email, password))
-        conn.commit()
+        with connection(DB_FILE) as conn:
+            conn.execute('''
+                INSERT INTO users (name, username, email, password)
+                VALUES (?, ?, ?, ?)
+            ''', (name, username, email, password))
         return True
     except sqlite3.IntegrityError:
         return False  # Username or email already exists
-    finally:
-        conn.close()
 
 def check_user_credentials(username, password):
     """Check if username and password match"""
-    conn = sqlite3.connect('user.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        SELECT * FROM users WHERE username = ? AND password = ?
-    ''', (username, password))
-    user = cursor.fetchone()
-    conn.close()
+    with read_connection(DB_FILE) as conn:
+        cursor = conn.execute('''
+            SELECT * FROM users WHERE username = ? AND password = ?
+        ''', (username, password))
+        user = cursor.fetchone()
     return user is not None
 
 def get_user_info(username):
     """Get complete user information by username"""
-    conn = sqlite3.connect('user.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        SELECT name, username, email, university, department, address, phone, bio
-        FROM users WHERE username = ?
-    ''', (username,))
-    user = cursor.fetchone()
-    conn.close()
-    
+    with read_connection(DB_FILE) as conn:
+        cursor = conn.execute('''
+            SELECT name, username, email, university, department, address, phone, bio
+            FROM users WHERE username = ?
+        ''', (username,))
+        user = cursor.fetchone()
+
     if user:
         return {
             'name': user[0],
@@ -88,77 +57,78 @@ def get_user_info(username):
 
 def update_user_profile(username, **kwargs):
     """Update user profile information"""
-    conn = sqlite3.connect('user.db')
-    cursor = conn.cursor()
-    
     set_clause = ", ".join([f"{k} = ?" for k in kwargs.keys()])
     values = list(kwargs.values()) + [username]
-    
-    cursor.execute(f'''
-        UPDATE users 
-        SET {set_clause}
-        WHERE username = ?
-    ''', values)
-    
-    conn.commit()
-    conn.close()
+
+    with connection(DB_FILE) as conn:
+        cursor = conn.execute(f'''
+            UPDATE users
+            SET {set_clause}
+            WHERE username = ?
+        ''', values)
     return cursor.rowcount > 0
 
-# [Keep all your existing task, study timer, and notes sharing functions below]
+def insert_users(users):
+    """Insert many (name, username, email, password) rows and return the number inserted"""
+    # Like insert_user, a taken username or email skips that row
+    with connection(DB_FILE) as conn:
+        cursor = conn.executemany('''
+            INSERT OR IGNORE INTO users (name, username, email, password)
+            VALUES (?, ?, ?, ?)
+        ''', users)
+    return cursor.rowcount
+
+def delete_users(usernames):
+    """Delete many users by username in one transaction and return the number deleted"""
+    with connection(DB_FILE) as conn:
+        cursor = conn.executemany('DELETE FROM users WHERE username = ?',
+                                  ((username,) for username in usernames))
+    return cursor.rowcount
 
 
 
 # ===== Task Scheduler Database Functions =====
 def create_task_table():
     """Create the tasks table if it does not exist in user.db"""
-    conn = sqlite3.connect('user.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS tasks (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT NOT NULL,
-            category TEXT NOT NULL,
-            date TEXT NOT NULL,
-            time TEXT NOT NULL,
-            description TEXT
-        )
-    ''')
-    conn.commit()
-    conn.close()
+    migrate(DB_FILE)
 
 
 def insert_task(title, category, date, time, description):
     """Insert a new task and return the task ID"""
-    conn = sqlite3.connect('user.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO tasks (title, category, date, time, description)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (title, category, date, time, description))
-    conn.commit()
-    task_id = cursor.lastrowid
-    conn.close()
-    return task_id
+    with connection(DB_FILE) as conn:
+        cursor = conn.execute('''
+            INSERT INTO tasks (title, category, date, time, description)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (title, category, date, time, description))
+    return cursor.lastrowid
 
 def get_all_tasks():
     """Get all tasks ordered by date and time"""
-    conn = sqlite3.connect('user.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        SELECT * FROM tasks 
-        ORDER BY date, time
-    ''')
-    tasks = cursor.fetchall()
-    conn.close()
-    return tasks
+    with read_connection(DB_FILE) as conn:
+        return conn.execute('''
+            SELECT * FROM tasks
+            ORDER BY date, time
+        ''').fetchall()
 
 def delete_task(task_id):
     """Delete a task by ID"""
-    conn = sqlite3.connect('user.db')
-    cursor = conn.cursor()
-    cursor.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
-    conn.commit()
-    conn.close()
+    with connection(DB_FILE) as conn:
+        conn.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
+
+def insert_tasks(tasks):
+    """Insert many (title, category, date, time, description) rows in one transaction"""
+    with connection(DB_FILE) as conn:
+        cursor = conn.executemany('''
+            INSERT INTO tasks (title, category, date, time, description)
+            VALUES (?, ?, ?, ?, ?)
+        ''', tasks)
+    return cursor.rowcount
+
+def delete_tasks(task_ids):
+    """Delete many tasks by ID in one transaction"""
+    with connection(DB_FILE) as conn:
+        cursor = conn.executemany('DELETE FROM tasks WHERE id = ?', ((task_id,) for task_id in task_ids))
+    return cursor.rowcount
 
 
 
@@ -166,165 +136,330 @@ def delete_task(task_id):
 
 def create_study_timer_table():
     """Create the study timer table if it doesn't exist"""
-    conn = sqlite3.connect('user.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS study_tasks (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            subject TEXT NOT NULL,
-            start_time TEXT NOT NULL,
-            duration INTEGER NOT NULL
-        )
-    ''')
-    conn.commit()
-    conn.close()
+    migrate(DB_FILE)
 
 def insert_study_task(subject, start_time, duration):
     """Insert a new study task into the database."""
-    conn = sqlite3.connect('user.db')
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO study_tasks (subject, start_time, duration) VALUES (?, ?, ?)",
-        (subject, start_time, duration)
-    )
-    conn.commit()
-    conn.close()
+    with connection(DB_FILE) as conn:
+        conn.execute(
+            "INSERT INTO study_tasks (subject, start_time, duration) VALUES (?, ?, ?)",
+            (subject, start_time, duration)
+        )
 
 def get_all_study_tasks():
     """Retrieve all study tasks from the database."""
-    conn = sqlite3.connect('user.db')
-    cursor = conn.cursor()
-    cursor.execute("SELECT subject, start_time, duration FROM study_tasks")
-    tasks = cursor.fetchall()
-    conn.close()
-    return tasks
+    with read_connection(DB_FILE) as conn:
+        return conn.execute("SELECT subject, start_time, duration FROM study_tasks").fetchall()
 
 def delete_study_task(subject, start_time):
     """Delete a task from the database."""
-    conn = sqlite3.connect('user.db')
-    cursor = conn.cursor()
-    cursor.execute(
-        "DELETE FROM study_tasks WHERE subject = ? AND start_time = ?",
-        (subject, start_time)
-    )
-    conn.commit()
-    conn.close()
-
-   
-# ===== Notes Sharing Database Functions =====
-import sqlite3
-import os
-from datetime import datetime
+    with connection(DB_FILE) as conn:
+        conn.execute(
+            "DELETE FROM study_tasks WHERE subject = ? AND start_time = ?",
+            (subject, start_time)
+        )
+
+def insert_study_tasks(study_tasks):
+    """Insert many (subject, start_time, duration) rows in one transaction."""
+    with connection(DB_FILE) as conn:
+        cursor = conn.executemany(
+            "INSERT INTO study_tasks (subject, start_time, duration) VALUES (?, ?, ?)",
+            study_tasks
+        )
+    return cursor.rowcount
+
+def delete_study_tasks(keys):
+    """Delete many (subject, start_time) study tasks in one transaction."""
+    with connection(DB_FILE) as conn:
+        cursor = conn.executemany(
+            "DELETE FROM study_tasks WHERE subject = ? AND start_time = ?",
+            keys
+        )
+    return cursor.rowcount
+
 
-DB_FILE = "user.db"
+# ===== Notes Sharing Database Functions =====
 
 def create_shared_notes_table():
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS shared_notes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            uploader_id INTEGER,
-            uploader_name TEXT,
-            title TEXT,
-            filename TEXT,
-            upload_date TEXT
-        )
-    """)
-    conn.commit()
-    conn.close()
+    migrate(DB_FILE)
 
 def insert_shared_note(uploader_id, uploader_name, title, filename):
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO shared_notes (uploader_id, uploader_name, title, filename, upload_date)
-        VALUES (?, ?, ?, ?, ?)
-    """, (uploader_id, uploader_name, title, filename, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-    conn.commit()
-    conn.close()
+    with connection(DB_FILE) as conn:
+        conn.execute("""
+            INSERT INTO shared_notes (uploader_id, uploader_name, title, filename, upload_date)
+            VALUES (?, ?, ?, ?, ?)
+        """, (uploader_id, uploader_name, title, filename, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
 
 def get_shared_notes():
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, uploader_name, title, filename FROM shared_notes")
-    notes = cursor.fetchall()
-    conn.close()
-    return notes
+    with read_connection(DB_FILE) as conn:
+        return conn.execute("SELECT id, uploader_name, title, filename FROM shared_notes").fetchall()
 
 def delete_shared_note(note_id):
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute("SELECT filename FROM shared_notes WHERE id=?", (note_id,))
-    result = cursor.fetchone()
-    if result:
-        file_path = os.path.join("shared_notes", result[0])
+    with connection(DB_FILE) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT filename FROM shared_notes WHERE id=?", (note_id,))
+        result = cursor.fetchone()
+        if result:
+            file_path = os.path.join("shared_notes", result[0])
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        cursor.execute("DELETE FROM shared_notes WHERE id=?", (note_id,))
+
+def insert_shared_notes(notes):
+    """Insert many (uploader_id, uploader_name, title, filename) rows in one transaction"""
+    upload_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with connection(DB_FILE) as conn:
+        cursor = conn.executemany("""
+            INSERT INTO shared_notes (uploader_id, uploader_name, title, filename, upload_date)
+            VALUES (?, ?, ?, ?, ?)
+        """, (tuple(note) + (upload_date,) for note in notes))
+    return cursor.rowcount
+
+def delete_shared_notes(note_ids):
+    """Delete many shared notes in one transaction, then remove their files"""
+    note_ids = list(note_ids)
+    with connection(DB_FILE) as conn:
+        filenames = [row[0] for note_id in note_ids
+                     for row in conn.execute("SELECT filename FROM shared_notes WHERE id=?", (note_id,))]
+        cursor = conn.executemany("DELETE FROM shared_notes WHERE id=?", ((note_id,) for note_id in note_ids))
+    for filename in filenames:
+        file_path = os.path.join("shared_notes", filename)
         if os.path.exists(file_path):
             os.remove(file_path)
-    cursor.execute("DELETE FROM shared_notes WHERE id=?", (note_id,))
-    conn.commit()
-    conn.close()
+    return cursor.rowcount
 
-    
 
 
-STUDY_ROOM_DB = 'study_room.db'
+
+# ===== Study Room Database Functions =====
 
 def create_study_room_tables():
-    conn = sqlite3.connect(STUDY_ROOM_DB)
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS messages (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            sender TEXT NOT NULL,
-            message TEXT NOT NULL,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS shared_files (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            size TEXT NOT NULL,
-            path TEXT NOT NULL,
-            uploaded_by TEXT NOT NULL,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    conn.commit()
-    conn.close()
+    migrate(STUDY_ROOM_DB)
 
 def insert_message(sender, message):
-    conn = sqlite3.connect(STUDY_ROOM_DB)
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO messages (sender, message) VALUES (?, ?)
-    ''', (sender, message))
-    conn.commit()
-    conn.close()
+    with connection(STUDY_ROOM_DB) as conn:
+        cursor = conn.execute('''
+            INSERT INTO messages (sender, message) VALUES (?, ?)
+        ''', (sender, message))
+    return cursor.lastrowid
 
 def get_all_messages():
-    conn = sqlite3.connect(STUDY_ROOM_DB)
-    cursor = conn.cursor()
-    cursor.execute('SELECT sender, message, timestamp FROM messages ORDER BY timestamp')
-    messages = cursor.fetchall()
-    conn.close()
-    return messages
-
-def insert_shared_file(name, size, path, uploaded_by):
-    conn = sqlite3.connect(STUDY_ROOM_DB)
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO shared_files (name, size, path, uploaded_by) VALUES (?, ?, ?, ?)
-    ''', (name, size, path, uploaded_by))
-    conn.commit()
-    conn.close()
+    with read_connection(STUDY_ROOM_DB) as conn:
+        return conn.execute('SELECT sender, message, timestamp FROM messages ORDER BY timestamp').fetchall()
+
+def get_messages_page(before=None, limit=50):
+    """Return up to `limit` messages older than the (timestamp, id) cursor, oldest first"""
+    # before=None gives the newest page; the next older page starts from the
+    # (timestamp, id) of the first row returned.
+    with read_connection(STUDY_ROOM_DB) as conn:
+        if before is None:
+            rows = conn.execute('''
+                SELECT id, sender, message, timestamp FROM messages
+                ORDER BY timestamp DESC, id DESC LIMIT ?
+            ''', (limit,)).fetchall()
+        else:
+            rows = conn.execute('''
+                SELECT id, sender, message, timestamp FROM messages
+                WHERE (timestamp, id) < (?, ?)
+                ORDER BY timestamp DESC, id DESC LIMIT ?
+            ''', (before[0], before[1], limit)).fetchall()
+    rows.reverse()
+    return rows
+
+def get_messages_after(last_id, limit=500):
+    """Return up to `limit` (id, sender, message, timestamp) rows with id > last_id"""
+    with read_connection(STUDY_ROOM_DB) as conn:
+        return conn.execute('''
+            SELECT id, sender, message, timestamp FROM messages
+            WHERE id > ? ORDER BY id LIMIT ?
+        ''', (last_id, limit)).fetchall()
+
+def _fts_query(text):
+    """Turn search box text into an FTS5 query that matches every word.
+
+    The last word matches as a prefix, since it may still be being typed.
+    """
+    # Quoting each word keeps FTS5 operators and punctuation in user input
+    # from being parsed as query syntax. Only the last word is a prefix
+    # because prefix terms cost far more to look up than whole words.
+    words = ['"' + word.replace('"', '""') + '"' for word in text.split()]
+    if words:
+        words[-1] += '*'
+    return " ".join(words)
+
+def search_messages(query, limit=50, cursor=None, highlight=('[', ']')):
+    """Return up to `limit` (id, sender, snippet, timestamp) matches, newest first.
+
+    Every word of query must appear in the message or sender name, the last
+    one possibly as the start of a longer word. The snippet wraps matched
+    words in the highlight pair. Pass the id of the last row returned as
+    cursor to fetch the next page.
+    """
+    match = _fts_query(query)
+    if not match:
+        return []
+    # Without a cursor every rowid qualifies
+    before = cursor if cursor is not None else 2 ** 63 - 1
+    with read_connection(STUDY_ROOM_DB) as conn:
+        return conn.execute('''
+            SELECT m.id, m.sender, snippet(messages_fts, 1, ?, ?, '...', 16), m.timestamp
+            FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid
+            WHERE messages_fts MATCH ? AND messages_fts.rowid < ?
+            ORDER BY messages_fts.rowid DESC LIMIT ?
+        ''', (highlight[0], highlight[1], match, before, limit)).fetchall()
+
+def insert_shared_file(name, size, path, uploaded_by, content_hash=None):
+    """Record a shared file; content_hash names its copy in blob_store.py's store"""
+    with connection(STUDY_ROOM_DB) as conn:
+        cursor = conn.execute('''
+            INSERT INTO shared_files (name, size, path, uploaded_by, content_hash) VALUES (?, ?, ?, ?, ?)
+        ''', (name, size, path, uploaded_by, content_hash))
+        if content_hash is not None:
+            _retain_blobs(conn, [content_hash])
+    return cursor.lastrowid
+
+def delete_shared_file(file_id):
+    """Delete a shared file record and its stored copy once no other record uses it"""
+    return delete_shared_files([file_id]) > 0
+
+def insert_messages(messages):
+    """Insert many (sender, message, timestamp) rows in one transaction; a None timestamp means now"""
+    with connection(STUDY_ROOM_DB) as conn:
+        cursor = conn.executemany('''
+            INSERT INTO messages (sender, message, timestamp)
+            VALUES (?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+        ''', messages)
+    return cursor.rowcount
+
+def delete_messages(message_ids):
+    """Delete many messages by ID in one transaction"""
+    with connection(STUDY_ROOM_DB) as conn:
+        cursor = conn.executemany('DELETE FROM messages WHERE id = ?',
+                                  ((message_id,) for message_id in message_ids))
+    return cursor.rowcount
+
+def insert_shared_files(files):
+    """Insert many (name, size, path, uploaded_by[, content_hash]) rows in one transaction"""
+    rows = [tuple(file) + (None,) * (5 - len(file)) for file in files]
+    with connection(STUDY_ROOM_DB) as conn:
+        cursor = conn.executemany('''
+            INSERT INTO shared_files (name, size, path, uploaded_by, content_hash) VALUES (?, ?, ?, ?, ?)
+        ''', rows)
+        _retain_blobs(conn, [row[4] for row in rows if row[4] is not None])
+    return cursor.rowcount
+
+def delete_shared_files(file_ids):
+    """Delete many shared file records in one transaction, then remove unreferenced blobs"""
+    file_ids = list(file_ids)
+    with connection(STUDY_ROOM_DB) as conn:
+        hashes = [row[0] for file_id in file_ids
+                  for row in conn.execute('SELECT content_hash FROM shared_files WHERE id = ?', (file_id,))
+                  if row[0] is not None]
+        cursor = conn.executemany('DELETE FROM shared_files WHERE id = ?',
+                                  ((file_id,) for file_id in file_ids))
+        unreferenced = _release_blobs(conn, hashes)
+    # Only touch the disk once the rows are gone for good
+    for content_hash in unreferenced:
+        remove_blob(content_hash)
+    return cursor.rowcount
+
+def _retain_blobs(conn, hashes):
+    conn.executemany('''
+        INSERT INTO blobs (hash, refcount) VALUES (?, 1)
+        ON CONFLICT (hash) DO UPDATE SET refcount = refcount + 1
+    ''', ((content_hash,) for content_hash in hashes))
+
+def _release_blobs(conn, hashes):
+    """Drop one reference per hash and return the hashes nothing refers to any more"""
+    conn.executemany('UPDATE blobs SET refcount = refcount - 1 WHERE hash = ?',
+                     ((content_hash,) for content_hash in hashes))
+    unreferenced = [content_hash for content_hash in set(hashes)
+                    if conn.execute('SELECT refcount FROM blobs WHERE hash = ?',
+                                    (content_hash,)).fetchone()[0] <= 0]
+    conn.executemany('DELETE FROM blobs WHERE hash = ?', ((content_hash,) for content_hash in unreferenced))
+    return unreferenced
+
+def _shared_file_dict(row):
+    # Files stored by content are opened from the blob store; older records
+    # still point at the uploader's original path
+    content_hash = row[5]
+    path = blob_path(content_hash) if content_hash else row[3]
+    return {"id": row[0], "name": row[1], "size": row[2], "path": path, "uploaded_by": row[4],
+            "content_hash": content_hash}
 
 def get_all_shared_files():
-    conn = sqlite3.connect(STUDY_ROOM_DB)
-    cursor = conn.cursor()
-    cursor.execute('SELECT name, size, path FROM shared_files ORDER BY timestamp')
-    files = cursor.fetchall()
-    conn.close()
+    with read_connection(STUDY_ROOM_DB) as conn:
+        files = conn.execute(
+            'SELECT id, name, size, path, uploaded_by, content_hash FROM shared_files ORDER BY timestamp'
+        ).fetchall()
     # Return as list of dicts for convenience
-    return [{"name": row[0], "size": row[1], "path": row[2]} for row in files]
+    return [_shared_file_dict(row) for row in files]
+
+def get_shared_files_after(last_id):
+    """Return shared files with id > last_id, oldest first"""
+    with read_connection(STUDY_ROOM_DB) as conn:
+        files = conn.execute(
+            'SELECT id, name, size, path, uploaded_by, content_hash FROM shared_files WHERE id > ? ORDER BY id',
+            (last_id,)
+        ).fetchall()
+    return [_shared_file_dict(row) for row in files]
+
+def get_study_room_data_version():
+    """Return a counter that changes whenever another connection commits to study_room.db"""
+    with read_connection(STUDY_ROOM_DB) as conn:
+        return conn.execute('PRAGMA data_version').fetchone()[0]
+
+
+
+# ===== Document Search Database Functions =====
+
+def create_search_index_tables():
+    migrate(SEARCH_INDEX_DB)
+
+def get_indexed_documents():
+    """Return {(source, source_id): (id, content_hash, mtime, size)} for every indexed document"""
+    with read_connection(SEARCH_INDEX_DB) as conn:
+        rows = conn.execute('SELECT source, source_id, id, content_hash, mtime, size FROM documents').fetchall()
+    return {(row[0], row[1]): row[2:] for row in rows}
+
+def save_indexed_document(source, source_id, title, path, content_hash, mtime, size, body):
+    """Add or replace a document and its full-text entry"""
+    with connection(SEARCH_INDEX_DB) as conn:
+        conn.execute('''
+            INSERT INTO documents (source, source_id, title, path, content_hash, mtime, size)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (source, source_id) DO UPDATE SET
+                title = excluded.title, path = excluded.path, content_hash = excluded.content_hash,
+                mtime = excluded.mtime, size = excluded.size
+        ''', (source, source_id, title, path, content_hash, mtime, size))
+        document_id = conn.execute('SELECT id FROM documents WHERE source = ? AND source_id = ?',
+                                   (source, source_id)).fetchone()[0]
+        conn.execute('DELETE FROM documents_fts WHERE rowid = ?', (document_id,))
+        conn.execute('INSERT INTO documents_fts (rowid, title, body) VALUES (?, ?, ?)',
+                     (document_id, title, body))
+
+def delete_indexed_documents(keys):
+    """Drop many (source, source_id) documents from the index in one transaction"""
+    with connection(SEARCH_INDEX_DB) as conn:
+        document_ids = [(row[0],) for source, source_id in keys
+                        for row in conn.execute('SELECT id FROM documents WHERE source = ? AND source_id = ?',
+                                                (source, source_id))]
+        conn.executemany('DELETE FROM documents_fts WHERE rowid = ?', document_ids)
+        cursor = conn.executemany('DELETE FROM documents WHERE id = ?', document_ids)
+    return cursor.rowcount
+
+def search_documents(query, limit=20, highlight=('[', ']')):
+    """Return up to `limit` (source, source_id, title, path, snippet) matches, best first.
+
+    Matching works as in search_messages. Hits in a title rank above hits
+    in the body.
+    """
+    match = _fts_query(query)
+    if not match:
+        return []
+    with read_connection(SEARCH_INDEX_DB) as conn:
+        return conn.execute('''
+            SELECT d.source, d.source_id, d.title, d.path, snippet(documents_fts, 1, ?, ?, '...', 24)
+            FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid
+            WHERE documents_fts MATCH ? ORDER BY rank LIMIT ?
+        ''', (highlight[0], highlight[1], match, limit)).fetchall()
@@ -0,0 +1,164 @@
+"""EXPLAIN QUERY PLAN audit for every query issued by database.py.
+
+Each public function in database.py is called against scratch databases
+while the SQL it runs is traced. Every traced SELECT/UPDATE/DELETE is then
+explained, and the audit fails if a filtered or ordered query scans a table
+without an index or sorts through a temporary b-tree.
+
+    python db_audit.py          # exit status 1 on any finding
+"""
+import inspect
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+
+import database
+from db_connection import (
+    USER_DB, STUDY_ROOM_DB, SEARCH_INDEX_DB, close_connection, get_connection, get_read_connection
+)
+from db_migrations import migrate
+
+# Sample arguments for each public database.py function. The audit refuses
+# to pass while a function is missing here, so new queries cannot slip by.
+AUDITED_CALLS = [
+    ('create_table', ()),
+    ('create_task_table', ()),
+    ('create_study_timer_table', ()),
+    ('create_shared_notes_table', ()),
+    ('create_study_room_tables', ()),
+    ('insert_user', ('Audit', 'audit', 'audit@example.com', 'secret')),
+    ('check_user_credentials', ('audit', 'secret')),
+    ('get_user_info', ('audit',)),
+    ('update_user_profile', ('audit',), {'bio': 'audited'}),
+    ('insert_task', ('Read', 'Study', '2024-01-01', '10:00', '')),
+    ('get_all_tasks', ()),
+    ('delete_task', (1,)),
+    ('insert_study_task', ('Maths', '2024-01-01 10:00', 25)),
+    ('get_all_study_tasks', ()),
+    ('delete_study_task', ('Maths', '2024-01-01 10:00')),
+    ('insert_shared_note', (1, 'Audit', 'Notes', 'notes.txt')),
+    ('get_shared_notes', ()),
+    ('delete_shared_note', (1,)),
+    ('insert_message', ('audit', 'hello')),
+    ('get_all_messages', ()),
+    ('get_messages_page', ()),
+    ('get_messages_page', (('2024-01-01 10:00:00', 1),)),
+    ('insert_shared_file', ('notes.pdf', '1.0', '/tmp/notes.pdf', 'audit')),
+    ('get_all_shared_files', ()),
+    ('get_messages_after', (0,)),
+    ('get_shared_files_after', (0,)),
+    ('get_study_room_data_version', ()),
+    ('insert_users', ([('Bulk', 'bulk', 'bulk@example.com', 'secret')],)),
+    ('delete_users', (['bulk'],)),
+    ('insert_tasks', ([('Read', 'Study', '2024-01-02', '09:00', '')],)),
+    ('delete_tasks', ([2],)),
+    ('insert_study_tasks', ([('Physics', '2024-01-02 09:00', 25)],)),
+    ('delete_study_tasks', ([('Physics', '2024-01-02 09:00')],)),
+    ('insert_shared_notes', ([(1, 'Audit', 'More notes', 'more.txt')],)),
+    ('delete_shared_notes', ([2],)),
+    ('insert_messages', ([('audit', 'bulk hello', None)],)),
+    ('delete_messages', ([2],)),
+    ('insert_shared_files', ([('more.pdf', '1.0', '/tmp/more.pdf', 'audit')],)),
+    ('delete_shared_files', ([2],)),
+    ('insert_shared_file', ('same.pdf', '1.0', '/tmp/same.pdf', 'audit', 'ab' * 32)),
+    ('delete_shared_file', (3,)),
+    ('search_messages', ('hello',)),
+    ('search_messages', ('hello audit',), {'cursor': 10}),
+    ('create_search_index_tables', ()),
+    ('save_indexed_document', ('note', 1, 'Notes', 'shared_notes/notes.txt', 'ab' * 32, 1.0, 10, 'eigenvalue')),
+    ('get_indexed_documents', ()),
+    ('search_documents', ('eigenvalue',)),
+    ('delete_indexed_documents', ([('note', 1)],)),
+]
+
+_AUDITED_VERBS = ('SELECT', 'UPDATE', 'DELETE', 'WITH')
+_FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$')
+
+
+def public_functions():
+    """Return the names of the query functions database.py exposes"""
+    return sorted(
+        name for name, func in inspect.getmembers(database, inspect.isfunction)
+        if func.__module__ == database.__name__ and not name.startswith('_')
+    )
+
+
+def trace_queries():
+    """Run AUDITED_CALLS and return the distinct (db_file, sql) pairs they issued"""
+    statements = []
+    for db_file in (USER_DB, STUDY_ROOM_DB, SEARCH_INDEX_DB):
+        for conn in (get_connection(db_file), get_read_connection(db_file)):
+            conn.set_trace_callback(lambda sql, db_file=db_file: statements.append((db_file, sql)))
+
+    for entry in AUDITED_CALLS:
+        name, args = entry[0], entry[1]
+        kwargs = entry[2] if len(entry) > 2 else {}
+        getattr(database, name)(*args, **kwargs)
+
+    seen = []
+    for db_file, sql in statements:
+        sql = ' '.join(sql.split())
+        if sql.upper().startswith(_AUDITED_VERBS) and (db_file, sql) not in seen:
+            seen.append((db_file, sql))
+    return seen
+
+
+def plan_findings(conn, sql):
+    """Return the problems EXPLAIN QUERY PLAN reports for sql"""
+    findings = []
+    upper = sql.upper()
+    selective = ' WHERE ' in upper or ' ORDER BY ' in upper
+    for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}'):
+        detail = row[-1]
+        if detail.startswith('USE TEMP B-TREE'):
+            findings.append(detail)
+        elif selective and _FULL_SCAN.match(detail):
+            findings.append(f"full table scan: {detail}")
+    return findings
+
+
+def audit():
+    """Run the audit in a scratch directory and return a list of failure messages"""
+    failures = [
+        f"{name}: no entry in AUDITED_CALLS"
+        for name in public_functions()
+        if name not in {entry[0] for entry in AUDITED_CALLS}
+    ]
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            migrate(USER_DB)
+            migrate(STUDY_ROOM_DB)
+            migrate(SEARCH_INDEX_DB)
+            queries = trace_queries()
+            for db_file, sql in queries:
+                conn = sqlite3.connect(db_file)
+                try:
+                    findings = plan_findings(conn, sql)
+                finally:
+                    conn.close()
+                status = 'FAIL' if findings else 'ok'
+                print(f"[{status:>4}] {db_file}: {sql}")
+                for finding in findings:
+                    print(f"         {finding}")
+                    failures.append(f"{sql}: {finding}")
+        finally:
+            close_connection()
+            os.chdir(cwd)
+    return failures
+
+
+def main():
+    failures = audit()
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    print(f"{len(failures)} problem(s) found")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
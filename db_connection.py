@@ -0,0 +1,180 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+USER_DB = 'user.db'
+STUDY_ROOM_DB = 'study_room.db'
+# Derived from shared notes and files; safe to delete, it is rebuilt on demand
+SEARCH_INDEX_DB = 'search_index.db'
+
+# Pragma profiles applied to every new connection. WAL lets history readers
+# run while a chat message is being written; the rest trade durability and
+# memory for speed to different degrees.
+PRAGMA_PROFILES = {
+    'safe': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -2000,        # KiB when negative
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT',
+        'busy_timeout': 5000,       # ms
+    },
+    'balanced': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -16000,
+        'mmap_size': 64 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    'fast': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'cache_size': -64000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+}
+
+_pragma_profile = dict(PRAGMA_PROFILES['balanced'])
+
+# Each thread keeps its own long-lived connections per database file, so the
+# GUI thread and any worker threads never share a sqlite3.Connection.
+_local = threading.local()
+
+# Writers to the same file take turns; readers never wait on this lock.
+_writer_locks = {}
+_writer_locks_guard = threading.Lock()
+
+
+def set_pragma_profile(profile):
+    """Select a profile by name or pass a dict of overrides for new connections"""
+    global _pragma_profile
+    if isinstance(profile, str):
+        if profile not in PRAGMA_PROFILES:
+            raise ValueError(f"Unknown pragma profile: {profile}")
+        _pragma_profile = dict(PRAGMA_PROFILES[profile])
+    else:
+        _pragma_profile = {**_pragma_profile, **profile}
+
+
+def get_pragma_profile():
+    """Return a copy of the pragmas applied to new connections"""
+    return dict(_pragma_profile)
+
+
+def bootstrap(conn):
+    """Apply the current pragma profile to a freshly opened connection"""
+    for name, value in _pragma_profile.items():
+        conn.execute(f'PRAGMA {name} = {value}')
+    return conn
+
+
+def _connections(kind):
+    """Return this thread's {db path: value} dict for the given kind"""
+    conns = getattr(_local, kind, None)
+    if conns is None:
+        conns = {}
+        setattr(_local, kind, conns)
+    return conns
+
+
+def _writer_lock(key):
+    with _writer_locks_guard:
+        lock = _writer_locks.get(key)
+        if lock is None:
+            lock = _writer_locks[key] = threading.RLock()
+        return lock
+
+
+def get_connection(db_file=USER_DB):
+    """Return the calling thread's connection to db_file, opening it on first use"""
+    key = os.path.abspath(db_file)
+    conns = _connections('writers')
+    conn = conns.get(key)
+    if conn is None:
+        conn = bootstrap(sqlite3.connect(key))
+        conns[key] = conn
+    return conn
+
+
+def get_read_connection(db_file=USER_DB):
+    """Return the calling thread's query-only connection to db_file"""
+    key = os.path.abspath(db_file)
+    conns = _connections('readers')
+    conn = conns.get(key)
+    if conn is None:
+        conn = bootstrap(sqlite3.connect(key))
+        conn.execute('PRAGMA query_only = ON')
+        conns[key] = conn
+    return conn
+
+
+@contextmanager
+def connection(db_file=USER_DB):
+    """Yield the writer connection, committing on success and rolling back on error.
+
+    Inside an enclosing connection() or transaction() on the same file the
+    block runs in a savepoint instead: a failure undoes only its own work and
+    nothing is committed until the outermost block ends.
+    """
+    key = os.path.abspath(db_file)
+    conn = get_connection(db_file)
+    depths = _connections('depths')
+    with _writer_lock(key):
+        depth = depths.get(key, 0)
+        depths[key] = depth + 1
+        try:
+            if depth:
+                if not conn.in_transaction:
+                    conn.execute('BEGIN')
+                savepoint = f'sp_{depth}'
+                conn.execute(f'SAVEPOINT {savepoint}')
+                try:
+                    yield conn
+                except Exception:
+                    conn.execute(f'ROLLBACK TO {savepoint}')
+                    conn.execute(f'RELEASE {savepoint}')
+                    raise
+                else:
+                    conn.execute(f'RELEASE {savepoint}')
+            else:
+                try:
+                    yield conn
+                except Exception:
+                    conn.rollback()
+                    raise
+                else:
+                    conn.commit()
+        finally:
+            depths[key] = depth
+
+
+@contextmanager
+def transaction(db_file=USER_DB):
+    """Group several writes to db_file, including database.py calls, into one commit"""
+    # Reads through read_connection() see only what was committed before this
+    # block; query `conn` directly to see the block's own writes.
+    with connection(db_file) as conn:
+        if not conn.in_transaction:
+            conn.execute('BEGIN IMMEDIATE')
+        yield conn
+
+
+@contextmanager
+def read_connection(db_file=USER_DB):
+    """Yield a query-only connection; any number of these run beside one writer"""
+    yield get_read_connection(db_file)
+
+
+def close_connection(db_file=None):
+    """Close the calling thread's connections to db_file, or all of them if None"""
+    for kind in ('writers', 'readers'):
+        conns = _connections(kind)
+        keys = list(conns) if db_file is None else [os.path.abspath(db_file)]
+        for key in keys:
+            conn = conns.pop(key, None)
+            if conn is not None:
+                conn.close()
@@ -0,0 +1,318 @@
+"""Versioned schema migrations for user.db, study_room.db and search_index.db.
+
+Each database records the number of migrations applied to it in
+PRAGMA user_version. Pending steps run together in one transaction, so a
+database is either fully upgraded or left untouched.
+
+Upgrade databases offline with:
+    python db_migrations.py [--status] [--target N] [path.db ...]
+"""
+import argparse
+import os
+import sys
+
+from db_connection import USER_DB, STUDY_ROOM_DB, SEARCH_INDEX_DB, connection
+
+
+def _columns(cursor, table):
+    return {row[1] for row in cursor.execute(f'PRAGMA table_info({table})')}
+
+
+# ===== user.db =====
+
+def _create_users(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            username TEXT NOT NULL UNIQUE,
+            email TEXT NOT NULL UNIQUE,
+            password TEXT NOT NULL
+        )
+    ''')
+
+def _add_user_profile_columns(cursor):
+    # Databases created before migrations existed may already have some of
+    # these from the old ALTER-and-ignore startup code.
+    existing = _columns(cursor, 'users')
+    for column_name in ('university', 'department', 'address', 'phone', 'bio'):
+        if column_name not in existing:
+            cursor.execute(f'ALTER TABLE users ADD COLUMN {column_name} TEXT DEFAULT ""')
+
+def _create_tasks(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            category TEXT NOT NULL,
+            date TEXT NOT NULL,
+            time TEXT NOT NULL,
+            description TEXT
+        )
+    ''')
+
+def _create_study_tasks(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS study_tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            subject TEXT NOT NULL,
+            start_time TEXT NOT NULL,
+            duration INTEGER NOT NULL
+        )
+    ''')
+
+def _create_shared_notes(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS shared_notes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            uploader_id INTEGER,
+            uploader_name TEXT,
+            title TEXT,
+            filename TEXT,
+            upload_date TEXT
+        )
+    """)
+
+def _index_tasks_and_study_tasks(cursor):
+    # get_all_tasks reads every column in (date, time) order, so the index
+    # carries them all and the query never touches the table or sorts.
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_tasks_date_time
+        ON tasks (date, time, title, category, description)
+    ''')
+    # Serves delete_study_task's (subject, start_time) lookup and covers
+    # get_all_study_tasks.
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_study_tasks_subject_start
+        ON study_tasks (subject, start_time, duration)
+    ''')
+
+
+# ===== study_room.db =====
+
+def _create_messages(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sender TEXT NOT NULL,
+            message TEXT NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+def _create_shared_files(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS shared_files (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            size TEXT NOT NULL,
+            path TEXT NOT NULL,
+            uploaded_by TEXT NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+def _index_timestamps(cursor):
+    # Chat history is read in timestamp order. Copying message bodies into a
+    # covering index would double the size of the room, so this index holds
+    # only (timestamp, id) and rows are fetched by rowid.
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_messages_timestamp
+        ON messages (timestamp)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_shared_files_timestamp
+        ON shared_files (timestamp, name, size, path)
+    ''')
+
+def _add_shared_file_blobs(cursor):
+    # Uploads are copied into blob_store.py's content-addressed store.
+    # shared_files rows point at their blob by hash and blobs counts those
+    # rows. Rows from before this step keep content_hash NULL and their
+    # original path.
+    if 'content_hash' not in _columns(cursor, 'shared_files'):
+        cursor.execute('ALTER TABLE shared_files ADD COLUMN content_hash TEXT')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS blobs (
+            hash TEXT PRIMARY KEY,
+            refcount INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
+
+def _create_messages_fts(cursor):
+    # External-content FTS5 index over messages: the text lives only in
+    # messages and the triggers keep the index in step with every write,
+    # including the broker's batched inserts. The prefix indexes keep the
+    # two- and three-letter starts of a half-typed word cheap to look up.
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+            sender, message,
+            content='messages', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    ''')
+    # One statement per execute: executescript() would commit the migration
+    # transaction halfway through
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+            INSERT INTO messages_fts (rowid, sender, message) VALUES (new.id, new.sender, new.message);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+            INSERT INTO messages_fts (messages_fts, rowid, sender, message)
+            VALUES ('delete', old.id, old.sender, old.message);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE OF sender, message ON messages BEGIN
+            INSERT INTO messages_fts (messages_fts, rowid, sender, message)
+            VALUES ('delete', old.id, old.sender, old.message);
+            INSERT INTO messages_fts (rowid, sender, message) VALUES (new.id, new.sender, new.message);
+        END
+    ''')
+    # Index the chat that is already there
+    cursor.execute("INSERT INTO messages_fts (messages_fts) VALUES ('rebuild')")
+
+def _cover_shared_files_listing(cursor):
+    # get_all_shared_files also reads uploaded_by and the content_hash column
+    # added since idx_shared_files_timestamp was made; with them in the
+    # index the listing never touches the table.
+    cursor.execute('DROP INDEX IF EXISTS idx_shared_files_timestamp')
+    cursor.execute('''
+        CREATE INDEX idx_shared_files_timestamp
+        ON shared_files (timestamp, name, size, path, uploaded_by, content_hash)
+    ''')
+
+
+# ===== search_index.db =====
+
+def _create_documents(cursor):
+    # One row per indexed shared note or shared file. The hash, mtime and
+    # size recorded at indexing time tell the indexer what has changed.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS documents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source TEXT NOT NULL,
+            source_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            path TEXT NOT NULL,
+            content_hash TEXT,
+            mtime REAL,
+            size INTEGER,
+            UNIQUE (source, source_id)
+        )
+    ''')
+
+def _create_documents_fts(cursor):
+    # Keyed by documents.id; holds its own copy of the extracted text so
+    # results can show snippets
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+            title, body,
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    ''')
+    # ORDER BY rank uses this; a title hit counts ten times a body hit
+    cursor.execute("INSERT INTO documents_fts (documents_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')")
+
+
+# Append new steps to the end of a list; never edit or reorder applied ones.
+# A database at user_version N has had the first N steps of its list applied.
+MIGRATIONS = {
+    USER_DB: [
+        ("create users", _create_users),
+        ("add user profile columns", _add_user_profile_columns),
+        ("create tasks", _create_tasks),
+        ("create study_tasks", _create_study_tasks),
+        ("create shared_notes", _create_shared_notes),
+        ("index tasks and study_tasks", _index_tasks_and_study_tasks),
+    ],
+    STUDY_ROOM_DB: [
+        ("create messages", _create_messages),
+        ("create shared_files", _create_shared_files),
+        ("index message and file timestamps", _index_timestamps),
+        ("store shared files by content hash", _add_shared_file_blobs),
+        ("full-text index messages", _create_messages_fts),
+        ("cover shared file listing", _cover_shared_files_listing),
+    ],
+    SEARCH_INDEX_DB: [
+        ("create documents", _create_documents),
+        ("create documents_fts", _create_documents_fts),
+    ],
+}
+
+# Databases already brought up to date by this process
+_migrated = set()
+
+
+def _steps_for(db_file):
+    name = os.path.basename(db_file)
+    if name not in MIGRATIONS:
+        raise ValueError(f"No migrations registered for {db_file}")
+    return MIGRATIONS[name]
+
+
+def schema_version(db_file):
+    """Return the number of migrations applied to db_file"""
+    with connection(db_file) as conn:
+        return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(db_file, target=None):
+    """Apply pending migrations to db_file in one transaction and return the new version"""
+    key = os.path.abspath(db_file)
+    steps = _steps_for(db_file)
+    if target is None:
+        if key in _migrated:
+            return len(steps)
+        target = len(steps)
+
+    with connection(db_file) as conn:
+        cursor = conn.cursor()
+        # Take the write lock before reading the version, so another process
+        # migrating the same file cannot apply the same steps in between
+        if not conn.in_transaction:
+            cursor.execute('BEGIN IMMEDIATE')
+        current = cursor.execute('PRAGMA user_version').fetchone()[0]
+        if current > len(steps):
+            raise RuntimeError(
+                f"{db_file} is at schema version {current}, newer than this code ({len(steps)})"
+            )
+        if current < target:
+            for _, step in steps[current:target]:
+                step(cursor)
+            cursor.execute(f'PRAGMA user_version = {target}')
+        else:
+            target = current
+
+    if target == len(steps):
+        _migrated.add(key)
+    return target
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Upgrade EduVerse databases to the current schema")
+    parser.add_argument('databases', nargs='*', default=[USER_DB, STUDY_ROOM_DB, SEARCH_INDEX_DB],
+                        help="database files to upgrade (default: all three)")
+    parser.add_argument('--status', action='store_true', help="only report schema versions")
+    parser.add_argument('--target', type=int, help="stop after this schema version")
+    args = parser.parse_args(argv)
+
+    for db_file in args.databases:
+        steps = _steps_for(db_file)
+        before = schema_version(db_file)
+        if args.status:
+            print(f"{db_file}: version {before} of {len(steps)}")
+            for number, (description, _) in enumerate(steps[before:], start=before + 1):
+                print(f"  pending {number}: {description}")
+            continue
+        after = migrate(db_file, args.target)
+        print(f"{db_file}: version {before} -> {after}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""Incremental full-text index over shared notes and Study Room shared files.
+
+sync_index() compares every shared note and shared file with what
+search_index.db recorded when it last indexed them. Files kept in the blob
+store are re-read only when their content hash changes; other files only
+when their mtime or size does. Text comes from text_extract.py.
+
+Bring the index up to date, or search it, from the command line:
+    python document_index.py
+    python document_index.py --search "eigenvalue"
+"""
+import argparse
+import logging
+import os
+import sys
+
+from database import (
+    create_search_index_tables,
+    create_shared_notes_table,
+    create_study_room_tables,
+    delete_indexed_documents,
+    get_all_shared_files,
+    get_indexed_documents,
+    get_shared_notes,
+    save_indexed_document,
+    search_documents,
+)
+from text_extract import can_extract, extract_text
+
+logger = logging.getLogger(__name__)
+
+NOTES_DIR = "shared_notes"
+
+
+def current_documents():
+    """Yield (source, source_id, title, filename, path, content_hash) for every shared note and file"""
+    for note_id, uploader_name, title, filename in get_shared_notes():
+        yield 'note', note_id, title or filename, filename, os.path.join(NOTES_DIR, filename), None
+    for file in get_all_shared_files():
+        yield 'file', file['id'], file['name'], file['name'], file['path'], file['content_hash']
+
+
+def _unchanged(previous, content_hash, stat):
+    if previous is None:
+        return False
+    _, indexed_hash, indexed_mtime, indexed_size = previous
+    if content_hash is not None:
+        return content_hash == indexed_hash
+    return (indexed_mtime, indexed_size) == (stat.st_mtime, stat.st_size)
+
+
+def sync_index(should_stop=None):
+    """Index new and changed documents, drop deleted ones, and return (indexed, removed)"""
+    create_shared_notes_table()
+    create_study_room_tables()
+    create_search_index_tables()
+
+    indexed = get_indexed_documents()
+    seen = set()
+    updated = 0
+    for source, source_id, title, filename, path, content_hash in current_documents():
+        if should_stop is not None and should_stop():
+            # Leave removals for a complete pass
+            return updated, 0
+        key = (source, source_id)
+        seen.add(key)
+        if not can_extract(path, filename):
+            continue
+        try:
+            stat = os.stat(path)
+            if _unchanged(indexed.get(key), content_hash, stat):
+                continue
+            body = extract_text(path, filename)
+        except OSError:
+            continue  # Missing or unreadable; keep whatever was indexed before
+        except Exception:
+            # A malformed document must not stop the rest being indexed
+            logger.exception("Could not extract text from %s (%s)", filename, path)
+            continue
+        save_indexed_document(source, source_id, title, path, content_hash, stat.st_mtime, stat.st_size, body)
+        updated += 1
+
+    removed = [key for key in indexed if key not in seen]
+    if removed:
+        delete_indexed_documents(removed)
+    return updated, len(removed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Update or search the shared notes and files index")
+    parser.add_argument('--search', help="print the best matches for this query instead")
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if args.search:
+        create_search_index_tables()
+        for source, source_id, title, path, snippet in search_documents(args.search, args.limit):
+            print(f"{source} {source_id}: {title} ({path})\n    {' '.join(snippet.split())}")
+        return 0
+
+    updated, removed = sync_index()
+    print(f"indexed {updated} document(s), removed {removed}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
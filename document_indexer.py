@@ -0,0 +1,49 @@
+import logging
+import threading
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from db_connection import close_connection
+from document_index import sync_index
+
+logger = logging.getLogger(__name__)
+
+# Seconds between passes that catch notes edited in place; uploads and
+# deletions made in the app call poke() instead of waiting for this
+RESCAN_INTERVAL = 60.0
+
+
+class DocumentIndexer(QThread):
+    """Keeps search_index.db up to date off the GUI thread"""
+
+    index_updated = pyqtSignal(int, int)   # documents indexed, documents removed
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._wake = threading.Event()
+        self._stopping = False
+
+    def poke(self):
+        """Re-index now, e.g. after a file was shared or removed"""
+        self._wake.set()
+
+    def stop(self):
+        self._stopping = True
+        self._wake.set()
+        self.wait()
+
+    def run(self):
+        try:
+            while not self._stopping:
+                self._wake.clear()
+                try:
+                    updated, removed = sync_index(lambda: self._stopping)
+                except Exception:
+                    # e.g. a locked database; the next pass tries again
+                    logger.exception("Indexing shared documents failed")
+                else:
+                    if updated or removed:
+                        self.index_updated.emit(updated, removed)
+                self._wake.wait(RESCAN_INTERVAL)
+        finally:
+            close_connection()
@@ -0,0 +1,136 @@
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPlainTextEdit, QPushButton, QStackedWidget
+)
+from PyQt5.QtCore import Qt, QSize, pyqtSignal
+from PyQt5.QtGui import QImageReader, QPixmap
+import os
+
+from mapped_file import MappedTextFile, pdf_summary, preview_kind
+
+# Lines shown when a text file opens, and added each time the preview is
+# scrolled to its end
+PREVIEW_LINES = 200
+
+# Largest size an image preview is decoded at
+THUMBNAIL_SIZE = QSize(480, 480)
+
+
+class FilePreviewPane(QWidget):
+    """In-app preview of a shared file: the first screenful of text, an image
+    thumbnail or a PDF summary. Nothing beyond that is read from disk."""
+
+    open_requested = pyqtSignal(str)  # path to open in an external app
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.path = None
+        self.text_file = None
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+
+        self.title_label = QLabel("Select a file to preview")
+        self.title_label.setStyleSheet("font-weight: bold;")
+
+        self.text_view = QPlainTextEdit()
+        self.text_view.setReadOnly(True)
+        self.text_view.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.text_view.verticalScrollBar().valueChanged.connect(self.on_text_scrolled)
+
+        self.image_view = QLabel()
+        self.image_view.setAlignment(Qt.AlignCenter)
+
+        self.info_view = QLabel()
+        self.info_view.setAlignment(Qt.AlignCenter)
+        self.info_view.setWordWrap(True)
+
+        self.stack = QStackedWidget()
+        self.stack.addWidget(self.text_view)
+        self.stack.addWidget(self.image_view)
+        self.stack.addWidget(self.info_view)
+
+        self.open_button = QPushButton("Open Externally")
+        self.open_button.setEnabled(False)
+        self.open_button.clicked.connect(lambda: self.open_requested.emit(self.path))
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        button_layout.addWidget(self.open_button)
+
+        layout.addWidget(self.title_label)
+        layout.addWidget(self.stack)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+    def show_file(self, path, name=None):
+        self.clear()
+        self.path = path
+        self.title_label.setText(name or os.path.basename(path))
+        self.open_button.setEnabled(True)
+        try:
+            kind = preview_kind(path, name)
+            if kind == 'text':
+                self.show_text(path)
+            elif kind == 'image':
+                self.show_image(path)
+            elif kind == 'pdf':
+                self.show_pdf(path)
+            else:
+                self.show_info(f"No preview for this file type\n{os.path.getsize(path) / 1024:.1f} KB")
+        except OSError as e:
+            self.show_info(f"Could not read the file:\n{e}")
+
+    def clear(self):
+        # Release the map so the file can be moved or deleted (Windows)
+        if self.text_file is not None:
+            self.text_file.close()
+            self.text_file = None
+        self.path = None
+        self.title_label.setText("Select a file to preview")
+        self.text_view.clear()
+        self.image_view.clear()
+        self.info_view.clear()
+        self.open_button.setEnabled(False)
+
+    def show_text(self, path):
+        self.text_file = MappedTextFile(path)
+        self.text_view.setPlainText("\n".join(self.text_file.lines(0, PREVIEW_LINES)))
+        self.stack.setCurrentWidget(self.text_view)
+
+    def on_text_scrolled(self, value):
+        if self.text_file is None or self.text_file.complete:
+            return
+        if value == self.text_view.verticalScrollBar().maximum():
+            loaded = self.text_view.blockCount()
+            more = self.text_file.lines(loaded, PREVIEW_LINES)
+            if more:
+                self.text_view.appendPlainText("\n".join(more))
+
+    def show_image(self, path):
+        reader = QImageReader(path)
+        reader.setAutoTransform(True)
+        size = reader.size()
+        if size.isValid() and (size.width() > THUMBNAIL_SIZE.width() or size.height() > THUMBNAIL_SIZE.height()):
+            # Formats that support it (JPEG especially) decode straight to
+            # this size instead of building the full image first
+            reader.setScaledSize(size.scaled(THUMBNAIL_SIZE, Qt.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            self.show_info(f"Could not decode the image:\n{reader.errorString()}")
+            return
+        self.image_view.setPixmap(QPixmap.fromImage(image))
+        self.stack.setCurrentWidget(self.image_view)
+
+    def show_pdf(self, path):
+        summary = pdf_summary(path)
+        lines = [f"PDF {summary['version'] or ''} document, {summary['size'] / 1024:.1f} KB"]
+        if summary['title']:
+            lines.insert(0, summary['title'])
+        if summary['pages']:
+            lines.append(f"{summary['pages']} pages")
+        self.show_info("\n".join(lines))
+
+    def show_info(self, text):
+        self.info_view.setText(text)
+        self.stack.setCurrentWidget(self.info_view)
@@ -0,0 +1,145 @@
+"""Chunked, resumable file copies for Study Room uploads and downloads.
+
+copy_file() writes to DESTINATION + PART_SUFFIX and renames it into place
+only once every byte has arrived. A copy that is cancelled or interrupted
+leaves the partial file behind, and the next copy of the same source to
+the same destination carries on from where it stopped. The source's path,
+size and modification time are kept beside the partial file in
+DESTINATION + PART_SUFFIX + SOURCE_SUFFIX; a partial file left by any
+other source is started over.
+
+Chunks are moved by the kernel with os.copy_file_range() or os.sendfile()
+where the platform supports them. A copy that also has to be hashed, or
+that runs where neither call works, reads and writes through a buffer.
+"""
+import os
+import time
+
+CHUNK_SIZE = 8 * 1024 * 1024
+PART_SUFFIX = '.part'
+SOURCE_SUFFIX = '.source'
+
+# Minimum seconds between progress callbacks, so a fast copy does not flood
+# the GUI thread with updates
+PROGRESS_INTERVAL = 0.1
+
+
+class TransferCancelled(Exception):
+    """Raised by copy_file() when its cancelled() callback returns True"""
+
+
+def _kernel_copy(method, src_fd, dst_fd, offset, count):
+    if method == 'copy_file_range':
+        return os.copy_file_range(src_fd, dst_fd, count, offset, offset)
+    os.lseek(dst_fd, offset, os.SEEK_SET)
+    return os.sendfile(dst_fd, src_fd, offset, count)
+
+
+def _buffered_copy(src_fd, dst_fd, offset, count, digest):
+    # lseek + read/write rather than pread/pwrite, which Windows lacks
+    os.lseek(src_fd, offset, os.SEEK_SET)
+    data = os.read(src_fd, count)
+    if digest is not None:
+        digest.update(data)
+    os.lseek(dst_fd, offset, os.SEEK_SET)
+    view = memoryview(data)
+    while view:
+        view = view[os.write(dst_fd, view):]
+    return len(data)
+
+
+def _kernel_methods():
+    return [name for name in ('copy_file_range', 'sendfile') if hasattr(os, name)]
+
+
+def _hash_prefix(fd, length, digest, chunk_size):
+    os.lseek(fd, 0, os.SEEK_SET)
+    remaining = length
+    while remaining > 0:
+        data = os.read(fd, min(chunk_size, remaining))
+        if not data:
+            break
+        digest.update(data)
+        remaining -= len(data)
+
+
+def _source_identity(path):
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}\n{stat.st_size}\n{stat.st_mtime_ns}\n"
+
+
+def _read_identity(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def copy_file(src, dst, chunk_size=CHUNK_SIZE, progress=None, cancelled=None, digest=None):
+    """Copy src to dst in chunks and return the number of bytes in dst.
+
+    progress(done, total, bytes_per_second) is called as the copy advances
+    and cancelled() is polled between chunks. digest, a hashlib object, is
+    fed every byte of the finished file, including any resumed prefix.
+    """
+    part = dst + PART_SUFFIX
+    source_file = part + SOURCE_SUFFIX
+    total = os.path.getsize(src)
+    identity = _source_identity(src)
+    offset = 0
+    if os.path.exists(part) and _read_identity(source_file) == identity:
+        offset = os.path.getsize(part)
+    if offset > total:
+        offset = 0
+    if offset == 0:
+        # Record the source, so a later call can tell whether the partial file is its own
+        with open(source_file, 'w', encoding='utf-8') as f:
+            f.write(identity)
+
+    methods = _kernel_methods() if digest is None else []
+    src_fd = os.open(src, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        dst_fd = os.open(part, os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            os.ftruncate(dst_fd, offset)
+            if digest is not None:
+                _hash_prefix(dst_fd, offset, digest, chunk_size)
+
+            resumed_from = offset
+            started = time.monotonic()
+            reported = 0.0
+            while offset < total:
+                if cancelled is not None and cancelled():
+                    raise TransferCancelled(part)
+                count = min(chunk_size, total - offset)
+                copied = None
+                while copied is None and methods:
+                    try:
+                        copied = _kernel_copy(methods[0], src_fd, dst_fd, offset, count)
+                    except OSError:
+                        # Not supported for this pair of files; try the next way
+                        methods.pop(0)
+                if copied is None:
+                    copied = _buffered_copy(src_fd, dst_fd, offset, count, digest)
+                if copied == 0:
+                    raise OSError(f"{src} shrank while it was being copied")
+                offset += copied
+
+                now = time.monotonic()
+                if progress is not None and (now - reported >= PROGRESS_INTERVAL or offset == total):
+                    elapsed = now - started
+                    rate = (offset - resumed_from) / elapsed if elapsed > 0 else 0.0
+                    progress(offset, total, rate)
+                    reported = now
+            os.fsync(dst_fd)
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+
+    os.replace(part, dst)
+    os.remove(source_file)
+    if progress is not None and total == 0:
+        progress(0, 0, 0.0)
+    return total
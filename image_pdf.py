@@ -0,0 +1,221 @@
+"""Image-to-PDF conversion pipeline shared by ImageToPDFDialog.
+
+Each image is decoded, converted and re-encoded as a JPEG page in a worker
+process, or as a CCITT G4 page when PageOptions asks for black and white.
+The parent only ever holds encoded pages. It writes them to the PDF in
+order as they come back, and keeps at most a few pages per worker in
+flight. Peak memory is therefore about one decoded image per worker,
+however many pages the document has. With a single worker the pages are
+encoded in the calling process instead.
+"""
+import collections
+import io
+import multiprocessing
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageOps, features
+
+from pdf_writer import StreamingPDFWriter
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+JPEG_QUALITY = 90
+
+# PageOptions.color values
+COLOR = 'color'
+GRAYSCALE = 'gray'
+BILEVEL = 'bw'
+
+# Resolution assumed for images that do not record one. Pillow's PDF
+# writer made the same assumption, so such pages keep their old size.
+DEFAULT_SOURCE_DPI = 72
+
+# Grey level from which a pixel is white on a black-and-white page
+BILEVEL_THRESHOLD = 160
+_BILEVEL_TABLE = [0] * BILEVEL_THRESHOLD + [255] * (256 - BILEVEL_THRESHOLD)
+
+_COLOR_SPACES = {'RGB': 'DeviceRGB', 'L': 'DeviceGray'}
+
+# Pages submitted ahead of the one being written, per worker
+PAGES_IN_FLIGHT_PER_WORKER = 2
+
+
+class ConversionCancelled(Exception):
+    """Raised by convert_images() when its cancelled() callback returns True"""
+
+
+class PageOptions:
+    """How a page is compressed.
+
+    quality is the JPEG quality; None keeps JPEGs as they are and encodes
+    everything else at JPEG_QUALITY. dpi downsamples images scanned at a
+    higher resolution, keeping the printed page size. color is COLOR,
+    GRAYSCALE or BILEVEL; bilevel pages are CCITT G4 encoded, which suits
+    scanned text far better than JPEG.
+    """
+
+    def __init__(self, quality=None, dpi=None, color=COLOR):
+        self.quality = quality
+        self.dpi = dpi
+        self.color = color
+
+
+def default_workers():
+    # Cores this process may actually run on, where the platform says
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+    return max(1, min(cores, 8))
+
+
+def process_pool(workers):
+    """ProcessPoolExecutor whose workers are started fresh, not forked.
+
+    A forked worker would inherit the GUI's Qt state and whatever locks its
+    other threads held at that moment, and could hang on them.
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def _source_dpi(image):
+    dpi = image.info.get('dpi')
+    # PNG stores dots per metre, so 300 dpi comes back as 299.9994
+    return round(dpi[0]) if dpi and dpi[0] >= 1 else DEFAULT_SOURCE_DPI
+
+
+def _encode_bilevel(image):
+    """Return (data, filter, decode_parms) for a mode '1' image"""
+    if features.check('libtiff'):
+        buffer = io.BytesIO()
+        # One strip, so the strip is a complete G4 stream on its own
+        image.save(buffer, 'TIFF', compression='group4', tiffinfo={278: image.height})
+        with Image.open(buffer) as tiff:
+            offsets, counts = tiff.tag_v2[273], tiff.tag_v2[279]
+            black_is_1 = tiff.tag_v2.get(262) == 1
+        if not isinstance(offsets, int) and len(offsets) == 1:
+            offsets, counts = offsets[0], counts[0]
+        if isinstance(offsets, int):
+            data = buffer.getvalue()[offsets:offsets + counts]
+            parms = '<< /K -1 /Columns %d /Rows %d /BlackIs1 %s >>' % (
+                image.width, image.height, 'true' if black_is_1 else 'false')
+            return data, 'CCITTFaxDecode', parms
+    # PDF and Pillow both pack 1-bit rows MSB first, with 1 for white
+    return zlib.compress(image.tobytes(), 6), 'FlateDecode', None
+
+
+def encode_page(path, options=None):
+    """Decode one image and return the add_image_page() arguments for its page"""
+    options = options or PageOptions()
+    with Image.open(path) as image:
+        orientation = image.getexif().get(0x0112, 1)
+        source_dpi = _source_dpi(image)
+        scale = min(1.0, options.dpi / source_dpi) if options.dpi else 1.0
+
+        # The page keeps the image's printed size whatever it is resampled to
+        width, height = image.size
+        if orientation in (5, 6, 7, 8):
+            width, height = height, width
+        page_width, page_height = width * 72 / source_dpi, height * 72 / source_dpi
+        target = (max(1, round(width * scale)), max(1, round(height * scale)))
+
+        # JPEGs that need no rotation, scaling or colour change go in as they are
+        if (image.format == 'JPEG' and options.quality is None and scale == 1.0 and orientation == 1
+                and ((image.mode == 'L' and options.color != BILEVEL)
+                     or (image.mode == 'RGB' and options.color == COLOR))):
+            with open(path, 'rb') as f:
+                data = f.read()
+            return _page_arguments(data, image.size, _COLOR_SPACES[image.mode], 'DCTDecode',
+                                   page_width, page_height)
+
+        if scale < 1.0:
+            # JPEGs decode straight to 1/2, 1/4 or 1/8 size, and to grey, for free
+            mode = 'L' if options.color != COLOR and image.mode == 'RGB' else None
+            image.draft(mode, (round(image.width * scale), round(image.height * scale)))
+
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ('RGBA', 'LA', 'P'):
+            # Flatten transparency onto white, as a printed page would show it
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, 'white')
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        if options.color != COLOR or image.mode == '1':
+            image = image.convert('L')
+        elif image.mode != 'L':
+            image = image.convert('RGB')
+        if image.size != target:
+            image = image.resize(target, Image.Resampling.LANCZOS)
+
+        if options.color == BILEVEL:
+            image = image.point(_BILEVEL_TABLE, '1')
+            data, image_filter, decode_parms = _encode_bilevel(image)
+            return _page_arguments(data, image.size, 'DeviceGray', image_filter, page_width, page_height,
+                                   bits_per_component=1, decode_parms=decode_parms)
+
+        buffer = io.BytesIO()
+        quality = JPEG_QUALITY if options.quality is None else options.quality
+        image.save(buffer, 'JPEG', quality=quality)
+        return _page_arguments(buffer.getvalue(), image.size, _COLOR_SPACES[image.mode], 'DCTDecode',
+                               page_width, page_height)
+
+
+def _page_arguments(data, size, color_space, image_filter, page_width, page_height,
+                    bits_per_component=8, decode_parms=None):
+    return {'data': data, 'width': size[0], 'height': size[1], 'color_space': color_space,
+            'image_filter': image_filter, 'page_width': page_width, 'page_height': page_height,
+            'bits_per_component': bits_per_component, 'decode_parms': decode_parms}
+
+
+def convert_images(paths, output_path, workers=None, progress=None, cancelled=None, options=None):
+    """Write one PDF page per image, in order, and return the page count.
+
+    options is a PageOptions for every page, or a list with one per page.
+
+    progress(done, total) is called after each page is written and
+    cancelled() is polled between pages; a cancelled or failed conversion
+    removes the partial PDF. Errors name the image that caused them.
+    """
+    paths = list(paths)
+    if options is None or isinstance(options, PageOptions):
+        options = [options] * len(paths)
+    workers = workers or default_workers()
+    if workers == 1:
+        # A pool of one would only add copying; the batch converter runs a
+        # document per process this way
+        return _write_pages(paths, output_path, map(encode_page, paths, options), progress, cancelled)
+    with process_pool(workers) as pool:
+        pages = _pooled_pages(pool, paths, options, workers * PAGES_IN_FLIGHT_PER_WORKER)
+        try:
+            return _write_pages(paths, output_path, pages, progress, cancelled)
+        finally:
+            pages.close()
+
+
+def _pooled_pages(pool, paths, options, window):
+    """Yield encoded pages in order, keeping up to window of them in flight"""
+    pending = collections.deque()
+    submitted = 0
+    try:
+        for index in range(len(paths)):
+            while submitted < len(paths) and submitted < index + window:
+                pending.append(pool.submit(encode_page, paths[submitted], options[submitted]))
+                submitted += 1
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _write_pages(paths, output_path, pages, progress, cancelled):
+    with StreamingPDFWriter(output_path) as pdf:
+        for index, path in enumerate(paths):
+            if cancelled is not None and cancelled():
+                raise ConversionCancelled()
+            try:
+                page = next(pages)
+            except Exception as e:
+                raise RuntimeError(f"Failed to convert image {path}: {e}") from e
+            pdf.add_image_page(**page)
+            if progress is not None:
+                progress(index + 1, len(paths))
+    return len(paths)
@@ -0,0 +1,187 @@
+"""Convert folders of scanned images to PDFs without the GUI.
+
+Every folder holding images becomes one PDF of its images in natural sort
+order, so page2.jpg comes before page10.jpg. Folders are converted side by
+side, one per worker process, with the same image_pdf code the
+ImageToPDFDialog uses. Each finished PDF is appended to a manifest. A
+rerun skips every folder whose images and options are unchanged since it
+was converted, so an interrupted batch picks up where it stopped.
+
+    python image_pdf_batch.py submissions/ -o pdfs/
+    python image_pdf_batch.py "scans/**/*.jpg" --dpi 200 --color bw
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import as_completed
+
+from image_pdf import (
+    IMAGE_EXTENSIONS, COLOR, GRAYSCALE, BILEVEL, PageOptions, convert_images, default_workers, process_pool
+)
+
+MANIFEST_NAME = "image_pdf_manifest.jsonl"
+
+
+def natural_key(text):
+    """Sort key that orders the digits in names by value: scan2 < scan10"""
+    return [int(part) if part.isdigit() else part.casefold() for part in re.split(r'(\d+)', text)]
+
+
+def find_folders(inputs):
+    """Map each folder to its images, from directories (searched recursively) and globs"""
+    folders = {}
+    for pattern in inputs:
+        matches = glob.glob(pattern, recursive=True) if any(c in pattern for c in '*?[') else [pattern]
+        for match in matches:
+            if os.path.isdir(match):
+                for root, dirs, files in os.walk(match):
+                    for name in files:
+                        if name.lower().endswith(IMAGE_EXTENSIONS):
+                            folders.setdefault(os.path.abspath(root), set()).add(os.path.join(root, name))
+            elif os.path.isfile(match) and match.lower().endswith(IMAGE_EXTENSIONS):
+                folders.setdefault(os.path.abspath(os.path.dirname(match)), set()).add(match)
+    return {folder: sorted(images, key=lambda path: natural_key(os.path.basename(path)))
+            for folder, images in folders.items()}
+
+
+def plan_jobs(folders, output_dir=None):
+    """Return (folder, images, pdf_path) in natural order of folder.
+
+    Without output_dir each PDF is written next to its folder. With it the
+    folders' layout below their common parent is kept, so a/s1 and b/s1 do
+    not collide.
+    """
+    if not folders:
+        return []
+    common = os.path.commonpath([os.path.dirname(folder) for folder in folders])
+    jobs = []
+    for folder in sorted(folders, key=natural_key):
+        if output_dir is None:
+            pdf_path = folder + '.pdf'
+        else:
+            pdf_path = os.path.join(output_dir, os.path.relpath(folder, common) + '.pdf')
+        jobs.append((folder, folders[folder], pdf_path))
+    return jobs
+
+
+def job_signature(images, options):
+    """Changes when any image is added, removed or modified, or the options change"""
+    digest = hashlib.sha1(repr(sorted(vars(options).items())).encode())
+    for path in images:
+        st = os.stat(path)
+        digest.update(f"\0{os.path.abspath(path)}\0{st.st_size}\0{st.st_mtime_ns}".encode('utf-8', 'surrogateescape'))
+    return digest.hexdigest()
+
+
+def load_manifest(path):
+    """Return {pdf_path: signature} for every PDF the manifest records as done"""
+    done = {}
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # A line cut short when a run was killed
+                done[entry['output']] = entry['signature']
+    return done
+
+
+def convert_folder(images, pdf_path, options):
+    """Worker process: write one folder's PDF and return (pages, input bytes)"""
+    os.makedirs(os.path.dirname(os.path.abspath(pdf_path)), exist_ok=True)
+    # Written under another name, so a half-written PDF never looks finished
+    partial = pdf_path + '.part'
+    pages = convert_images(images, partial, workers=1, options=options)
+    os.replace(partial, pdf_path)
+    return pages, sum(os.path.getsize(path) for path in images)
+
+
+def print_error(message):
+    print(message, file=sys.stderr)
+
+
+def run_batch(jobs, options, manifest_path, workers=None, force=False, report=print, error=print_error):
+    """Convert every job not already done; return (converted, skipped, failed).
+
+    report(message) is called with progress and error(message) with each
+    folder that failed.
+    """
+    done = {} if force else load_manifest(manifest_path)
+    todo = []
+    for folder, images, pdf_path in jobs:
+        signature = job_signature(images, options)
+        if done.get(os.path.abspath(pdf_path)) == signature and os.path.exists(pdf_path):
+            continue
+        todo.append((folder, images, pdf_path, signature))
+    skipped = len(jobs) - len(todo)
+    if skipped:
+        report(f"skipping {skipped} folder(s) already converted")
+
+    converted = failed = total_pages = total_bytes = 0
+    start = time.perf_counter()
+    with open(manifest_path, 'a', encoding='utf-8') as manifest, \
+            process_pool(workers or default_workers()) as pool:
+        futures = {pool.submit(convert_folder, images, pdf_path, options): (folder, pdf_path, signature)
+                   for folder, images, pdf_path, signature in todo}
+        try:
+            for future in as_completed(futures):
+                folder, pdf_path, signature = futures[future]
+                try:
+                    pages, size = future.result()
+                except Exception as e:
+                    failed += 1
+                    error(f"FAIL {folder}: {e}")
+                    continue
+                converted += 1
+                total_pages += pages
+                total_bytes += size
+                manifest.write(json.dumps({'output': os.path.abspath(pdf_path), 'signature': signature,
+                                           'pages': pages}) + '\n')
+                manifest.flush()
+                elapsed = time.perf_counter() - start
+                report(f"[{converted + failed}/{len(todo)}] {pdf_path}: {pages} page(s), "
+                       f"{total_pages / elapsed:.1f} pages/s")
+        except KeyboardInterrupt:
+            pool.shutdown(cancel_futures=True)
+            raise
+
+    elapsed = time.perf_counter() - start
+    if converted:
+        report(f"converted {converted} PDF(s), {total_pages} pages, {total_bytes / 1e6:.1f} MB of images "
+               f"in {elapsed:.1f} s: {converted / elapsed:.2f} PDFs/s, {total_pages / elapsed:.1f} pages/s, "
+               f"{total_bytes / 1e6 / elapsed:.1f} MB/s")
+    return converted, skipped, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert folders of images to one PDF per folder")
+    parser.add_argument('inputs', nargs='+', help="directories (searched recursively) or globs of images")
+    parser.add_argument('-o', '--output', help="directory for the PDFs (default: next to each folder)")
+    parser.add_argument('--workers', type=int, help="folders converted at once (default: one per core)")
+    parser.add_argument('--manifest', help=f"job manifest (default: {MANIFEST_NAME} in the output directory)")
+    parser.add_argument('--force', action='store_true', help="convert every folder, even ones already done")
+    parser.add_argument('--quality', type=int, help="JPEG quality (default: keep JPEGs as they are)")
+    parser.add_argument('--dpi', type=int, help="downsample images scanned at a higher resolution")
+    parser.add_argument('--color', choices=[COLOR, GRAYSCALE, BILEVEL], default=COLOR)
+    args = parser.parse_args(argv)
+
+    jobs = plan_jobs(find_folders(args.inputs), args.output)
+    if not jobs:
+        print_error("no images found")
+        return 1
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+    manifest_path = args.manifest or os.path.join(args.output or '.', MANIFEST_NAME)
+    options = PageOptions(quality=args.quality, dpi=args.dpi, color=args.color)
+    converted, skipped, failed = run_batch(jobs, options, manifest_path, args.workers, args.force)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
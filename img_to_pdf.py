@@ -1,19 +1,49 @@
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QPushButton, QFileDialog, QListWidget, QListWidgetItem,
-    QLabel, QHBoxLayout, QMessageBox, QTextEdit
+    QLabel, QHBoxLayout, QMessageBox, QPlainTextEdit, QProgressBar, QComboBox, QSpinBox
 )
-from PyQt5.QtGui import QPixmap, QIcon
-from PyQt5.QtCore import Qt, QSize
-from PIL import Image
+from PyQt5.QtGui import QPixmap, QIcon, QColor
+from PyQt5.QtCore import Qt, QSize, QThread, pyqtSignal
+import io
 import os
 
+from image_pdf import (
+    IMAGE_EXTENSIONS, COLOR, GRAYSCALE, BILEVEL, ConversionCancelled, PageOptions, convert_images
+)
+from thumbnail_loader import ThumbnailLoader
+from thumbnails import THUMBNAIL_SIZE
+from text_pdf import ExportCancelled, write_text_pdf
+
+# Resolutions offered for downsampling scans; None keeps every pixel
+RESOLUTIONS = [("Original resolution", None), ("300 dpi", 300), ("200 dpi", 200),
+               ("150 dpi", 150), ("100 dpi", 100)]
+COLOR_MODES = [("Colour", COLOR), ("Grayscale", GRAYSCALE), ("Black & white (scanned text)", BILEVEL)]
+
 # ✅ Custom QListWidget to support drag & drop from file explorer
 class DraggableImageList(QListWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setAcceptDrops(True)
         self.setDragDropMode(QListWidget.InternalMove)
-        self.setIconSize(QSize(100, 100))
+        self.setIconSize(QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+
+        # Shown until an image's thumbnail has been made in the background
+        placeholder = QPixmap(THUMBNAIL_SIZE, THUMBNAIL_SIZE)
+        placeholder.fill(QColor("#eee8d5"))
+        self.placeholder_icon = QIcon(placeholder)
+        self.thumbnails = ThumbnailLoader(parent=self)
+        self.thumbnails.thumbnail_ready.connect(self.set_thumbnail)
+
+    def add_image_item(self, path):
+        item = QListWidgetItem(self.placeholder_icon, os.path.basename(path))
+        item.setData(Qt.UserRole, path)
+        self.addItem(item)
+        self.thumbnails.request(path)
+
+    def set_thumbnail(self, path, icon):
+        for i in range(self.count()):
+            if self.item(i).data(Qt.UserRole) == path:
+                self.item(i).setIcon(icon)
 
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls():
@@ -31,12 +61,70 @@ class DraggableImageList(QListWidget):
         if event.mimeData().hasUrls():
             for url in event.mimeData().urls():
                 path = url.toLocalFile()
-                if path.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp')):
+                if path.lower().endswith(IMAGE_EXTENSIONS):
                     self.parent().add_image(path)
             event.acceptProposedAction()
         else:
             super().dropEvent(event)
 
+class ConversionWorker(QThread):
+    """Runs image_pdf.convert_images off the GUI thread"""
+
+    progress = pyqtSignal(int, int)   # pages written, total pages
+    succeeded = pyqtSignal(str)       # output path
+    failed = pyqtSignal(str)          # error message
+    cancelled = pyqtSignal()
+
+    def __init__(self, paths, output_path, options=None, parent=None):
+        super().__init__(parent)
+        self.paths = paths
+        self.output_path = output_path
+        self.options = options
+        self._cancel_requested = False
+
+    def cancel(self):
+        self._cancel_requested = True
+
+    def run(self):
+        try:
+            convert_images(self.paths, self.output_path, options=self.options,
+                           progress=self.progress.emit, cancelled=lambda: self._cancel_requested)
+        except ConversionCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.succeeded.emit(self.output_path)
+
+class TextExportWorker(QThread):
+    """Runs text_pdf.write_text_pdf off the GUI thread"""
+
+    progress = pyqtSignal(int, int)   # lines set, total lines
+    succeeded = pyqtSignal(str, int)  # output path, pages
+    failed = pyqtSignal(str)          # error message
+    cancelled = pyqtSignal()
+
+    def __init__(self, content, output_path, parent=None):
+        super().__init__(parent)
+        self.content = content
+        self.output_path = output_path
+        self._cancel_requested = False
+
+    def cancel(self):
+        self._cancel_requested = True
+
+    def run(self):
+        try:
+            pages = write_text_pdf(io.StringIO(self.content), self.output_path,
+                                   total_lines=self.content.count('\n') + 1,
+                                   progress=self.progress.emit, cancelled=lambda: self._cancel_requested)
+        except ExportCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.succeeded.emit(self.output_path, pages)
+
 class ImageToPDFDialog(QDialog):
     def __init__(self):
         super().__init__()
@@ -63,6 +151,7 @@ class ImageToPDFDialog(QDialog):
         """)
 
         self.image_paths = []
+        self.worker = None
         self.layout = QVBoxLayout(self)
 
         self.btn_layout = QHBoxLayout()
@@ -84,6 +173,34 @@ class ImageToPDFDialog(QDialog):
         self.image_list = DraggableImageList(self)
         self.layout.addWidget(self.image_list)
 
+        # Page compression; the defaults keep the images as they are
+        self.options_layout = QHBoxLayout()
+        self.options_layout.addWidget(QLabel("JPEG quality:"))
+        self.quality_spin = QSpinBox()
+        self.quality_spin.setRange(0, 100)
+        self.quality_spin.setSpecialValueText("Original")
+        self.options_layout.addWidget(self.quality_spin)
+        self.resolution_combo = QComboBox()
+        for label, dpi in RESOLUTIONS:
+            self.resolution_combo.addItem(label, dpi)
+        self.options_layout.addWidget(self.resolution_combo)
+        self.color_combo = QComboBox()
+        for label, color in COLOR_MODES:
+            self.color_combo.addItem(label, color)
+        self.options_layout.addWidget(self.color_combo)
+        self.options_layout.addStretch()
+        self.layout.addLayout(self.options_layout)
+
+        # Conversion progress, shown while a PDF is being written
+        self.progress_layout = QHBoxLayout()
+        self.progress_bar = QProgressBar()
+        self.progress_layout.addWidget(self.progress_bar)
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.cancel_conversion)
+        self.progress_layout.addWidget(self.cancel_btn)
+        self.layout.addLayout(self.progress_layout)
+        self.set_converting(False)
+
     def select_images(self):
         files, _ = QFileDialog.getOpenFileNames(self, "Select Images", "", "Image Files (*.png *.jpg *.jpeg *.bmp)")
         if files:
@@ -91,21 +208,16 @@ class ImageToPDFDialog(QDialog):
             self.refresh_list()
 
     def refresh_list(self):
+        self.image_list.thumbnails.clear()
         self.image_list.clear()
         for path in self.image_paths:
-            pixmap = QPixmap(path).scaled(100, 100, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            item = QListWidgetItem(QIcon(pixmap), os.path.basename(path))
-            item.setData(Qt.UserRole, path)
-            self.image_list.addItem(item)
+            self.image_list.add_image_item(path)
 
     # ✅ Used by drag-and-drop to add image if not already in list
     def add_image(self, path):
         if path not in self.image_paths:
             self.image_paths.append(path)
-            pixmap = QPixmap(path).scaled(100, 100, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            item = QListWidgetItem(QIcon(pixmap), os.path.basename(path))
-            item.setData(Qt.UserRole, path)
-            self.image_list.addItem(item)
+            self.image_list.add_image_item(path)
 
     def convert_to_pdf(self):
         if self.image_list.count() == 0:
@@ -114,18 +226,53 @@ class ImageToPDFDialog(QDialog):
 
         save_path, _ = QFileDialog.getSaveFileName(self, "Save PDF", "", "PDF Files (*.pdf)")
         if save_path:
-            img_list = []
-            for i in range(self.image_list.count()):
-                path = self.image_list.item(i).data(Qt.UserRole)
-                try:
-                    img = Image.open(path).convert("RGB")
-                    img_list.append(img)
-                except Exception as e:
-                    QMessageBox.warning(self, "Error", f"Failed to open image {path}: {str(e)}")
-                    return  # Exit if any image fails to open
-
-            img_list[0].save(save_path, save_all=True, append_images=img_list[1:])
-            QMessageBox.information(self, "Success", "PDF created successfully!")
+            paths = [self.image_list.item(i).data(Qt.UserRole) for i in range(self.image_list.count())]
+            self.progress_bar.setRange(0, len(paths))
+            self.progress_bar.setValue(0)
+            self.set_converting(True)
+
+            self.worker = ConversionWorker(paths, save_path, self.page_options(), self)
+            self.worker.progress.connect(self.on_conversion_progress)
+            self.worker.succeeded.connect(self.on_conversion_succeeded)
+            self.worker.failed.connect(self.on_conversion_failed)
+            self.worker.cancelled.connect(lambda: self.set_converting(False))
+            self.worker.start()
+
+    def page_options(self):
+        return PageOptions(quality=self.quality_spin.value() or None,
+                           dpi=self.resolution_combo.currentData(),
+                           color=self.color_combo.currentData())
+
+    def set_converting(self, converting):
+        self.convert_btn.setEnabled(not converting)
+        self.select_btn.setEnabled(not converting)
+        self.progress_bar.setVisible(converting)
+        self.cancel_btn.setVisible(converting)
+        self.cancel_btn.setEnabled(converting)
+
+    def cancel_conversion(self):
+        if self.worker is not None:
+            self.cancel_btn.setEnabled(False)  # Until the worker stops
+            self.worker.cancel()
+
+    def on_conversion_progress(self, done, total):
+        self.progress_bar.setValue(done)
+        self.progress_bar.setFormat(f"Page {done} of {total}")
+
+    def on_conversion_succeeded(self, save_path):
+        self.set_converting(False)
+        QMessageBox.information(self, "Success", "PDF created successfully!")
+
+    def on_conversion_failed(self, message):
+        self.set_converting(False)
+        QMessageBox.warning(self, "Error", message)
+
+    def done(self, result):
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.cancel()
+            self.worker.wait()
+        self.image_list.thumbnails.wait()
+        super().done(result)
 
     def edit_pdf(self):
         dialog = PDFEditorDialog()
@@ -141,15 +288,17 @@ class PDFEditorDialog(QDialog):
             QDialog {
                 background-color: #fdf6e3;
             }
-            QTextEdit {
+            QPlainTextEdit {
                 font-size: 14px;
                 background-color: white;
                 border: 1px solid #ccc;
             }
         """)
 
+        self.worker = None
         layout = QVBoxLayout(self)
-        self.text_edit = QTextEdit(self)
+        # QPlainTextEdit stays responsive with documents of many thousand lines
+        self.text_edit = QPlainTextEdit(self)
         layout.addWidget(QLabel("Write content to add to a new page in a PDF:"))
         layout.addWidget(self.text_edit)
 
@@ -157,6 +306,16 @@ class PDFEditorDialog(QDialog):
         self.save_btn.clicked.connect(self.save_as_pdf)
         layout.addWidget(self.save_btn)
 
+        # Export progress, shown while a PDF is being written
+        progress_layout = QHBoxLayout()
+        self.progress_bar = QProgressBar()
+        progress_layout.addWidget(self.progress_bar)
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.cancel_export)
+        progress_layout.addWidget(self.cancel_btn)
+        layout.addLayout(progress_layout)
+        self.set_exporting(False)
+
     def save_as_pdf(self):
         content = self.text_edit.toPlainText()
         if not content.strip():
@@ -165,11 +324,43 @@ class PDFEditorDialog(QDialog):
 
         save_path, _ = QFileDialog.getSaveFileName(self, "Save PDF", "", "PDF Files (*.pdf)")
         if save_path:
-            from fpdf import FPDF
-            pdf = FPDF()
-            pdf.add_page()
-            pdf.set_font("Arial", size=12)
-            for line in content.split('\n'):
-                pdf.cell(200, 10, txt=line, ln=True)
-            pdf.output(save_path)
-            QMessageBox.information(self, "Success", "PDF with text saved!")
+            self.progress_bar.setRange(0, content.count('\n') + 1)
+            self.progress_bar.setValue(0)
+            self.set_exporting(True)
+
+            self.worker = TextExportWorker(content, save_path, self)
+            self.worker.progress.connect(self.on_export_progress)
+            self.worker.succeeded.connect(self.on_export_succeeded)
+            self.worker.failed.connect(self.on_export_failed)
+            self.worker.cancelled.connect(lambda: self.set_exporting(False))
+            self.worker.start()
+
+    def set_exporting(self, exporting):
+        self.save_btn.setEnabled(not exporting)
+        self.text_edit.setReadOnly(exporting)
+        self.progress_bar.setVisible(exporting)
+        self.cancel_btn.setVisible(exporting)
+        self.cancel_btn.setEnabled(exporting)
+
+    def cancel_export(self):
+        if self.worker is not None:
+            self.cancel_btn.setEnabled(False)  # Until the worker stops
+            self.worker.cancel()
+
+    def on_export_progress(self, done, total):
+        self.progress_bar.setValue(done)
+        self.progress_bar.setFormat(f"Line {done} of {total}")
+
+    def on_export_succeeded(self, save_path, pages):
+        self.set_exporting(False)
+        QMessageBox.information(self, "Success", f"PDF with text saved! ({pages} pages)")
+
+    def on_export_failed(self, message):
+        self.set_exporting(False)
+        QMessageBox.warning(self, "Error", message)
+
+    def done(self, result):
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.cancel()
+            self.worker.wait()
+        super().done(result)
@@ -0,0 +1,128 @@
+"""Opening very large source files in CodeEditor without freezing it.
+
+ChunkedFileLoader reads a file a slice at a time from the event loop, so
+the editor paints after the first chunk. IdleHighlighter puts a
+CppHighlighter into deferred mode. It highlights whatever is on screen
+straight away and the rest of the document a few milliseconds at a time
+when the event loop is idle.
+"""
+import time
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+CHUNK_CHARS = 256 * 1024
+
+# Milliseconds of highlighting per idle step, in batches of blocks
+HIGHLIGHT_SLICE_MS = 15
+HIGHLIGHT_BATCH = 500
+
+# Blocks highlighted beyond each edge of the viewport, so small scrolls
+# land on highlighted text
+VIEWPORT_MARGIN = 20
+
+
+class ChunkedFileLoader(QObject):
+    chunk_loaded = pyqtSignal(str, int, int)   # text, bytes read, file size
+    finished = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.file = None
+        self.size = 0
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.read_chunk)
+
+    def load(self, path, size):
+        self.cancel()
+        # Text mode handles \r\n and characters split across chunks
+        self.file = open(path, 'r', encoding='utf-8', errors='replace')
+        self.size = size
+        self.timer.start(0)
+
+    def cancel(self):
+        self.timer.stop()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def is_loading(self):
+        return self.file is not None
+
+    def read_chunk(self):
+        try:
+            text = self.file.read(CHUNK_CHARS)
+            position = self.file.buffer.tell()
+        except Exception as e:
+            self.cancel()
+            self.failed.emit(str(e))
+            return
+        if text:
+            self.chunk_loaded.emit(text, position, self.size)
+        else:
+            self.cancel()
+            self.finished.emit()
+
+
+class IdleHighlighter(QObject):
+    """Highlights a large document in an editor viewport first, then the rest when idle"""
+
+    def __init__(self, editor, highlighter, parent=None):
+        super().__init__(parent)
+        self.editor = editor
+        self.highlighter = highlighter
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.highlight_step)
+        editor.verticalScrollBar().valueChanged.connect(self.highlight_viewport)
+
+    def start(self):
+        """Defer highlighting until highlight_viewport() or resume() asks for it"""
+        self.timer.stop()
+        self.highlighter.set_deferred(True)
+
+    def stop(self):
+        self.timer.stop()
+        self.highlighter.set_deferred(False)
+
+    def resume(self):
+        """Highlight the rest of the document during idle time"""
+        if self.highlighter.deferred:
+            self.timer.start(0)
+
+    def highlight_viewport(self):
+        if not self.highlighter.deferred:
+            return
+        first = self.editor.firstVisibleBlock()
+        if not first.isValid():
+            return
+        offset = self.editor.contentOffset()
+        height = self.editor.viewport().height()
+        last = first
+        while last.next().isValid() and \
+                self.editor.blockBoundingGeometry(last.next()).translated(offset).top() < height:
+            last = last.next()
+
+        document = self.editor.document()
+        start = max(0, first.blockNumber() - VIEWPORT_MARGIN)
+        end = min(document.blockCount() - 1, last.blockNumber() + VIEWPORT_MARGIN)
+        self.highlighter.window = (start, end)
+        block = document.findBlockByNumber(start)
+        while block.isValid() and block.blockNumber() <= end:
+            self.highlighter.rehighlightBlock(block)
+            block = block.next()
+
+    def highlight_step(self):
+        document = self.editor.document()
+        deadline = time.perf_counter() + HIGHLIGHT_SLICE_MS / 1000
+        block = document.findBlockByNumber(self.highlighter.highlighted_until)
+        while block.isValid() and time.perf_counter() < deadline:
+            # A block never highlighted has state -1, so highlighting it
+            # changes its state and QSyntaxHighlighter carries straight on
+            # to the next block. One call therefore covers the whole batch,
+            # unless it reaches a block the viewport pass already did.
+            self.highlighter.highlighted_until = block.blockNumber() + HIGHLIGHT_BATCH
+            self.highlighter.rehighlightBlock(block)
+            self.highlighter.highlighted_until = self.highlighter.last_highlighted + 1
+            block = document.findBlockByNumber(self.highlighter.highlighted_until)
+        if not block.isValid():
+            self.stop()
@@ -0,0 +1,128 @@
+"""Memory-mapped readers behind the Study Room file preview.
+
+Opening a file maps it without reading it. Text lines are indexed lazily,
+only as far as the caller has asked for, and a PDF summary reads the first
+kilobyte. Preview cost therefore depends on what is shown, not on how big
+the file is.
+"""
+import mmap
+import os
+import re
+
+TEXT_EXTENSIONS = {
+    '.txt', '.md', '.csv', '.log', '.json', '.xml', '.html', '.css', '.js',
+    '.py', '.c', '.cpp', '.h', '.hpp', '.java', '.sql', '.ini', '.cfg', '.yaml', '.yml',
+}
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.bmp', '.gif', '.webp'}
+
+# A file with a NUL byte in its first block is treated as binary
+SNIFF_SIZE = 8192
+
+# Lines longer than this are wrapped, so one huge line (a minified file,
+# say) cannot make the preview read the whole file
+MAX_LINE_BYTES = 4096
+
+
+def preview_kind(path, name=None):
+    """Return 'text', 'image', 'pdf' or 'binary' for a file.
+
+    The extension is taken from name when given, since blob store paths
+    have none.
+    """
+    extension = os.path.splitext(name or path)[1].lower()
+    if extension in IMAGE_EXTENSIONS:
+        return 'image'
+    if extension == '.pdf':
+        return 'pdf'
+    if extension in TEXT_EXTENSIONS:
+        return 'text'
+    with open(path, 'rb') as f:
+        head = f.read(SNIFF_SIZE)
+    if b'\0' in head:
+        return 'binary'
+    return 'text'
+
+
+class MappedFile:
+    """A read-only memory map of a whole file; an empty file maps to b''"""
+
+    def __init__(self, path):
+        self.path = path
+        self.size = os.path.getsize(path)
+        self._file = open(path, 'rb')
+        # mmap refuses empty files
+        self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MappedTextFile(MappedFile):
+    """Lines of a mapped text file, indexed only as far as they are read"""
+
+    def __init__(self, path, encoding='utf-8'):
+        super().__init__(path)
+        self.encoding = encoding
+        self._line_starts = [0]
+        self._indexed_to = 0     # every line start before this offset is known
+        self.complete = self.size == 0
+
+    def _index_until(self, line_count):
+        while len(self._line_starts) <= line_count and not self.complete:
+            # Search at most one line's worth, so a file without newlines
+            # still costs only what is shown
+            limit = min(self._indexed_to + MAX_LINE_BYTES, self.size)
+            end = self.data.find(b'\n', self._indexed_to, limit)
+            self._indexed_to = limit if end == -1 else end + 1
+            if self._indexed_to < self.size:
+                self._line_starts.append(self._indexed_to)
+            else:
+                self.complete = True
+
+    def lines(self, start, count):
+        """Return up to count decoded lines starting at line number start"""
+        self._index_until(start + count)
+        result = []
+        for number in range(start, min(start + count, len(self._line_starts))):
+            begin = self._line_starts[number]
+            end = self._line_starts[number + 1] if number + 1 < len(self._line_starts) else self.size
+            result.append(self.data[begin:end].rstrip(b'\r\n').decode(self.encoding, errors='replace'))
+        return result
+
+    def indexed_lines(self):
+        """Number of lines found so far; the total once complete is True"""
+        return len(self._line_starts)
+
+
+_PDF_VERSION = re.compile(rb'%PDF-(\d\.\d)')
+_PDF_LINEARIZED_PAGES = re.compile(rb'/Linearized\b[^>]*?/N\s+(\d+)', re.S)
+_PDF_TITLE = re.compile(rb'/Title\s*\(((?:[^()\\]|\\.){0,200})\)', re.S)
+
+
+def pdf_summary(path, head_size=1024):
+    """Return {'version', 'pages', 'title', 'size'} read from the start of a PDF.
+
+    Only the first head_size bytes are looked at. A page count is found in
+    linearized ("fast web view") files and a title when it sits that early;
+    otherwise those values are None.
+    """
+    with MappedFile(path) as mapped:
+        head = mapped.data[:head_size]
+        size = mapped.size
+    version = _PDF_VERSION.search(head)
+    pages = _PDF_LINEARIZED_PAGES.search(head)
+    title = _PDF_TITLE.search(head)
+    return {
+        'version': version.group(1).decode() if version else None,
+        'pages': int(pages.group(1)) if pages else None,
+        'title': title.group(1).decode('latin-1') if title else None,
+        'size': size,
+    }
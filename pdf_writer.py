@@ -0,0 +1,122 @@
+"""A PDF writer that streams each page to disk as soon as it is added.
+
+Only the byte offset of every object is kept in memory until close(), so
+a document of any length costs a few bytes per page. The page tree is
+written last and the pages point at it by a reserved object number.
+
+    with StreamingPDFWriter("out.pdf") as pdf:
+        pdf.add_image_page(jpeg_bytes, 1240, 1754, "DeviceRGB", "DCTDecode")
+        font = pdf.add_font("Helvetica")
+        pdf.add_page(b"BT /F1 12 Tf 72 770 Td (Hello) Tj ET",
+                     b"<< /Font << /F1 %d 0 R >> >>" % font, 595.28, 841.89)
+"""
+import os
+import zlib
+
+# Object 1 is the catalog and object 2 the page tree; both are written by
+# close(), once every page is known
+_CATALOG = 1
+_PAGES = 2
+
+
+class StreamingPDFWriter:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'wb')
+        self._offsets = {}
+        self._next_object = _PAGES + 1
+        self._page_ids = []
+        self._file.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    @property
+    def page_count(self):
+        return len(self._page_ids)
+
+    def _reserve(self):
+        number = self._next_object
+        self._next_object += 1
+        return number
+
+    def _write_object(self, number, body, stream=None):
+        self._offsets[number] = self._file.tell()
+        self._file.write(b'%d 0 obj\n' % number)
+        self._file.write(body)
+        if stream is not None:
+            self._file.write(b'\nstream\n')
+            self._file.write(stream)
+            self._file.write(b'\nendstream')
+        self._file.write(b'\nendobj\n')
+
+    def add_image_page(self, data, width, height, color_space, image_filter,
+                       page_width=None, page_height=None, bits_per_component=8, decode_parms=None):
+        """Write a page showing one image, already encoded with image_filter.
+
+        The page is page_width x page_height points, by default one point
+        per pixel, and the image fills it.
+        """
+        page_width = width if page_width is None else page_width
+        page_height = height if page_height is None else page_height
+
+        image_id = self._reserve()
+        header = (b'<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /%s '
+                  b'/BitsPerComponent %d /Filter /%s /Length %d'
+                  % (width, height, color_space.encode(), bits_per_component, image_filter.encode(), len(data)))
+        if decode_parms:
+            header += b' /DecodeParms ' + decode_parms.encode()
+        self._write_object(image_id, header + b' >>', data)
+
+        content = b'q %.2f 0 0 %.2f 0 0 cm /Im0 Do Q' % (page_width, page_height)
+        resources = b'<< /XObject << /Im0 %d 0 R >> >>' % image_id
+        self.add_page(content, resources, page_width, page_height)
+
+    def add_font(self, base_font, encoding='WinAnsiEncoding'):
+        """Write one of the standard 14 fonts as a resource and return its object number"""
+        font_id = self._reserve()
+        self._write_object(font_id, b'<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /%s >>'
+                           % (base_font.encode(), encoding.encode()))
+        return font_id
+
+    def add_page(self, content, resources, page_width, page_height, compress=False):
+        """Write a page drawn by the content stream, with resources as a PDF dictionary"""
+        content_id = self._reserve()
+        if compress:
+            content = zlib.compress(content, 6)
+            self._write_object(content_id, b'<< /Length %d /Filter /FlateDecode >>' % len(content), content)
+        else:
+            self._write_object(content_id, b'<< /Length %d >>' % len(content), content)
+        page_id = self._reserve()
+        self._write_object(page_id, b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %.2f %.2f] '
+                                    b'/Resources %s /Contents %d 0 R >>'
+                           % (_PAGES, page_width, page_height, resources, content_id))
+        self._page_ids.append(page_id)
+
+    def close(self):
+        """Write the page tree, catalog and cross-reference table"""
+        if self._file.closed:
+            return
+        kids = b' '.join(b'%d 0 R' % page_id for page_id in self._page_ids)
+        self._write_object(_PAGES, b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(self._page_ids)))
+        self._write_object(_CATALOG, b'<< /Type /Catalog /Pages %d 0 R >>' % _PAGES)
+
+        xref = self._file.tell()
+        self._file.write(b'xref\n0 %d\n' % self._next_object)
+        self._file.write(b'0000000000 65535 f \n')
+        for number in range(1, self._next_object):
+            self._file.write(b'%010d 00000 n \n' % self._offsets[number])
+        self._file.write(b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+                         % (self._next_object, _CATALOG, xref))
+        self._file.close()
+
+    def abort(self):
+        """Close and delete a partly written file"""
+        self._file.close()
+        os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -0,0 +1,95 @@
+import codecs
+import threading
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+import sandbox
+from case_runner import CaseBatch
+
+# Output shown per stream; the rest is read and dropped so the program never blocks
+OUTPUT_LIMIT = 1024 * 1024
+
+
+class ProgramRunner(QThread):
+    """Runs a compiled program under sandbox limits, streaming its output"""
+
+    output = pyqtSignal(str)
+    error_output = pyqtSignal(str)
+    run_finished = pyqtSignal(object)   # sandbox.RunResult
+    failed = pyqtSignal(str)            # why it did not start
+
+    def __init__(self, executable, limits=None, parent=None):
+        super().__init__(parent)
+        self.executable = executable
+        self.limits = limits if limits is not None else sandbox.Limits()
+        self.process = None
+        self._lock = threading.Lock()
+        self._stop_requested = False
+
+    def stop(self):
+        with self._lock:
+            self._stop_requested = True
+            if self.process is not None:
+                sandbox.stop(self.process)
+
+    def run(self):
+        with self._lock:
+            if self._stop_requested:
+                return
+            try:
+                self.process = sandbox.start(self.executable, self.limits)
+            except Exception as e:
+                self.failed.emit(str(e))
+                return
+        readers = [threading.Thread(target=self.forward, args=(stream, signal), daemon=True)
+                   for stream, signal in ((self.process.stdout, self.output),
+                                          (self.process.stderr, self.error_output))]
+        for reader in readers:
+            reader.start()
+        result = sandbox.wait(self.process, self.limits)
+        for reader in readers:
+            reader.join()
+        self.run_finished.emit(result)
+
+    def forward(self, stream, signal):
+        decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        shown = 0
+        while True:
+            data = stream.read1(65536)
+            if not data:
+                break
+            if shown < OUTPUT_LIMIT:
+                data = data[:OUTPUT_LIMIT - shown]
+                shown += len(data)
+                text = decoder.decode(data)
+                if shown >= OUTPUT_LIMIT:
+                    text += decoder.decode(b'', final=True) + "\n[output truncated]\n"
+                if text:
+                    signal.emit(text)
+        if shown < OUTPUT_LIMIT:
+            text = decoder.decode(b'', final=True)
+            if text:
+                signal.emit(text)
+        stream.close()
+
+
+class CaseRunner(QThread):
+    """Runs a program against many test cases in parallel, off the GUI thread"""
+
+    case_finished = pyqtSignal(int, object)   # case index, case_runner.CaseResult
+    failed = pyqtSignal(str)
+
+    def __init__(self, executable, cases, limits=None, workers=None, parent=None):
+        super().__init__(parent)
+        self.cases = cases
+        self.batch = CaseBatch(executable, cases, limits if limits is not None else sandbox.Limits(), workers)
+
+    def stop(self):
+        self.batch.stop()
+
+    def run(self):
+        try:
+            for index, result in self.batch.results():
+                self.case_finished.emit(index, result)
+        except Exception as e:
+            self.failed.emit(str(e))
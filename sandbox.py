@@ -0,0 +1,232 @@
+"""Running compiled programs under resource limits, and measuring them.
+
+On POSIX systems every program runs under sandbox_supervisor.py, which
+sets rlimits on it before exec: CPU time, address space, output file size
+and, against fork bombs, how many more processes the user may start. The
+supervisor waits for the program with os.wait4() and reports its CPU time
+and peak memory. Everything the program forked is killed when it ends.
+
+start() and wait() run a program once, with pipes for its output. A
+Worker runs one program many times with input and output in files, all
+under one supervisor, which is much cheaper than starting one per run.
+
+Where the resource module is missing (Windows) programs run without
+limits and only wall time is measured.
+"""
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+SUPERVISOR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sandbox_supervisor.py")
+
+CPU_SECONDS = 10
+MEMORY_BYTES = 512 * 1024 * 1024
+FILE_BYTES = 64 * 1024 * 1024
+EXTRA_PROCESSES = 64
+
+# What a signal that ended a run most likely means
+SIGNAL_REASONS = {
+    'SIGXCPU': "CPU time limit",
+    'SIGXFSZ': "file size limit",
+    'SIGSEGV': "segmentation fault; out of memory?",
+    'SIGABRT': "aborted; out of memory?",
+}
+
+
+class Limits:
+    """Resource limits for one run; None switches a limit off"""
+
+    def __init__(self, cpu_seconds=CPU_SECONDS, memory_bytes=MEMORY_BYTES, file_bytes=FILE_BYTES,
+                 processes=EXTRA_PROCESSES, wall_seconds=None):
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_bytes
+        self.file_bytes = file_bytes
+        self.processes = processes
+        self.wall_seconds = wall_seconds
+
+
+class RunResult:
+    """How a run ended and what it cost; times in seconds, max_rss in bytes"""
+
+    def __init__(self, status, timed_out, wall, user=None, sys=None, max_rss=None):
+        # A negative status is the signal that killed the program
+        self.exit_code = status if status >= 0 else None
+        self.signal_number = -status if status < 0 else None
+        self.timed_out = timed_out
+        self.wall = wall
+        self.user = user
+        self.sys = sys
+        self.max_rss = max_rss
+        self.stdout = b''
+        self.stderr = b''
+
+    def describe(self):
+        if self.timed_out:
+            return "stopped: wall-clock time limit"
+        if self.signal_number is not None:
+            name = signal.Signals(self.signal_number).name
+            reason = SIGNAL_REASONS.get(name)
+            return f"killed by {name}" + (f" ({reason})" if reason else "")
+        return f"exit code {self.exit_code}"
+
+    def stats(self):
+        text = f"wall {self.wall:.3f} s"
+        if self.user is not None:
+            text += f", user {self.user:.3f} s, sys {self.sys:.3f} s, peak {self.max_rss / (1024 * 1024):.1f} MB"
+        return text
+
+
+def _user_tasks():
+    """Processes and threads the current user runs, which RLIMIT_NPROC counts"""
+    uid = os.getuid()
+    count = 0
+    for name in os.listdir('/proc'):
+        if name.isdigit():
+            try:
+                if os.stat(f'/proc/{name}').st_uid == uid:
+                    count += len(os.listdir(f'/proc/{name}/task'))
+            except OSError:
+                pass
+    return count
+
+
+def _supervisor_command(executable, limits):
+    processes = None
+    if limits.processes is not None and os.path.isdir('/proc'):
+        processes = _user_tasks() + limits.processes
+    settings = ["-" if value is None else str(value) for value in
+                (limits.cpu_seconds, limits.memory_bytes, limits.file_bytes, processes, limits.wall_seconds)]
+    return [sys.executable, "-I", "-S", SUPERVISOR, *settings, executable]
+
+
+def _parse_report(report):
+    status, timed_out, wall, user, sys_time, max_rss = report.split()
+    return RunResult(int(status), timed_out == b'1', float(wall), float(user), float(sys_time), int(max_rss))
+
+
+def start(executable, limits, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE):
+    """Start executable under limits; finish with wait()"""
+    if resource is None:
+        process = subprocess.Popen([executable], stdin=stdin, stdout=stdout, stderr=stderr)
+        process.report = None
+        process.started_at = time.perf_counter()
+        return process
+
+    read_fd, write_fd = os.pipe()
+    try:
+        process = subprocess.Popen(_supervisor_command(executable, limits) + [str(write_fd)],
+                                   stdin=stdin, stdout=stdout, stderr=stderr,
+                                   pass_fds=(write_fd,), start_new_session=True)
+    except BaseException:
+        os.close(read_fd)
+        raise
+    finally:
+        os.close(write_fd)
+    process.report = os.fdopen(read_fd, 'rb')
+    process.started_at = time.perf_counter()
+    return process
+
+
+def stop(process):
+    """Kill a running program; wait() still reports what it cost"""
+    try:
+        if process.report is None:
+            process.kill()
+        else:
+            process.send_signal(signal.SIGTERM)   # The supervisor kills the program
+    except ProcessLookupError:
+        pass
+
+
+def wait(process, limits):
+    """Wait for a started program and return its RunResult"""
+    if process.report is None:
+        timed_out = threading.Event()
+        timer = None
+        if limits.wall_seconds is not None:
+            timer = threading.Timer(limits.wall_seconds, lambda: (timed_out.set(), process.kill()))
+            timer.start()
+        process.wait()
+        if timer is not None:
+            timer.cancel()
+        return RunResult(process.returncode, timed_out.is_set(), time.perf_counter() - process.started_at)
+
+    report = process.report.read()
+    process.report.close()
+    process.wait()
+    if not report:
+        # The supervisor itself was killed
+        return RunResult(process.returncode, False, time.perf_counter() - process.started_at)
+    return _parse_report(report)
+
+
+def _read_and_remove(path):
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return b''
+    os.remove(path)
+    return data
+
+
+class Worker:
+    """Runs one program many times, one run at a time, with input and output in files"""
+
+    def __init__(self, executable, limits, folder):
+        self.executable = executable
+        self.limits = limits
+        self.folder = folder
+        self.process = None   # Without a supervisor, the run in progress
+        self.supervisor = None
+        if resource is not None:
+            self.supervisor = subprocess.Popen(_supervisor_command(executable, limits) + ["--serve", folder],
+                                               stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                               start_new_session=True)
+
+    def run(self, name, input):
+        """Run the program on input and return its RunResult with output"""
+        base = os.path.join(self.folder, name)
+        with open(base + ".in", 'wb') as f:
+            f.write(input)
+        if self.supervisor is None:
+            with open(base + ".in", 'rb') as stdin, open(base + ".out", 'wb') as stdout, \
+                    open(base + ".err", 'wb') as stderr:
+                self.process = start(self.executable, self.limits, stdin, stdout, stderr)
+                result = wait(self.process, self.limits)
+        else:
+            self.supervisor.stdin.write(name.encode() + b"\n")
+            self.supervisor.stdin.flush()
+            report = self.supervisor.stdout.readline()
+            if not report:
+                raise RuntimeError("The sandbox supervisor stopped unexpectedly")
+            result = _parse_report(report)
+        # A run stopped as it started may never have opened its output files
+        result.stdout = _read_and_remove(base + ".out")
+        result.stderr = _read_and_remove(base + ".err")
+        os.remove(base + ".in")
+        return result
+
+    def stop(self):
+        """Kill the run in progress, if any"""
+        try:
+            if self.supervisor is not None:
+                self.supervisor.send_signal(signal.SIGTERM)
+            elif self.process is not None:
+                stop(self.process)
+        except ProcessLookupError:
+            pass
+
+    def close(self):
+        if self.supervisor is not None:
+            self.supervisor.stdin.close()
+            self.supervisor.wait()
+            self.supervisor.stdout.close()
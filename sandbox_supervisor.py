@@ -0,0 +1,142 @@
+"""Supervisor that sandbox.start() runs each program under.
+
+Started in a session of its own as
+
+    python -I -S sandbox_supervisor.py CPU MEMORY FILE PROCESSES WALL EXECUTABLE REPORT_FD
+
+where each limit is a number or "-" for none. It forks, sets the rlimits
+and execs the program, waits for it with os.wait4() and writes
+"status timed_out wall user sys max_rss" to REPORT_FD.
+
+With "--serve FOLDER" in place of REPORT_FD it runs the program once for
+every NAME line on its stdin instead, reading FOLDER/NAME.in and writing
+FOLDER/NAME.out and FOLDER/NAME.err, and answers each with the same report
+line on its stdout. Each run gets a process group of its own, which is
+killed when the run ends. SIGTERM kills the run in progress; one that
+arrives when no program is running kills the next as soon as it starts.
+
+The measuring happens here rather than in the editor because Linux carries
+a process's peak RSS across fork and exec. A program started straight from
+the GUI would report at least the GUI's own size. This script imports as
+little as it can, which keeps both that inherited size and its start-up
+time down: the signal and json modules alone would double the time.
+"""
+import os
+import resource
+import sys
+import time
+
+# The signal module is this C module plus enums that take longer to import
+import _signal
+
+LIMITS = (
+    (resource.RLIMIT_CPU, 1),
+    (resource.RLIMIT_AS, 0),
+    (resource.RLIMIT_FSIZE, 0),
+    (resource.RLIMIT_NPROC, 0),
+)
+
+
+def set_limits(values):
+    for (which, grace), value in zip(LIMITS, values):
+        if value is not None:
+            # Past the soft CPU limit comes SIGXCPU, and SIGKILL a second later
+            soft, hard = value, value + grace
+            _, ceiling = resource.getrlimit(which)
+            if ceiling != resource.RLIM_INFINITY:
+                soft, hard = min(soft, ceiling), min(hard, ceiling)
+            resource.setrlimit(which, (soft, hard))
+
+
+# The program running now, the signals that stopped it, and whether a
+# SIGTERM came while none was running
+running = {'pid': None, 'stopped_by': [], 'stop_pending': False}
+
+
+def stop(signum, frame):
+    if running['pid'] is None:
+        if signum == _signal.SIGTERM:
+            running['stop_pending'] = True
+    else:
+        running['stopped_by'].append(signum)
+        try:
+            os.killpg(running['pid'], _signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+def run(executable, limits, wall_seconds, stdio=(), close_fd=None):
+    """Run executable once and return its report line"""
+    started = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.setpgid(0, 0)
+            if close_fd is not None:
+                os.close(close_fd)
+            for fd, (path, flags) in enumerate(stdio):
+                opened = os.open(path, flags, 0o600)
+                os.dup2(opened, fd)
+                os.close(opened)
+            # Python ignores these, and exec would keep them ignored
+            _signal.signal(_signal.SIGPIPE, _signal.SIG_DFL)
+            _signal.signal(_signal.SIGXFSZ, _signal.SIG_DFL)
+            set_limits(limits)
+            os.execv(executable, [executable])
+        except OSError as e:
+            os.write(2, f"{executable}: {e.strerror}\n".encode())
+        os._exit(127)
+
+    try:
+        os.setpgid(pid, pid)  # Also here, so stop() can never miss the group
+    except OSError:
+        pass
+    running['pid'], running['stopped_by'] = pid, []
+    # A SIGTERM from here on finds the pid; one from before the fork is
+    # only recorded, so act on it now
+    if running['stop_pending']:
+        running['stop_pending'] = False
+        stop(_signal.SIGTERM, None)
+    if wall_seconds:
+        _signal.setitimer(_signal.ITIMER_REAL, wall_seconds)
+    _, status, usage = os.wait4(pid, 0)
+    wall = time.perf_counter() - started
+    _signal.setitimer(_signal.ITIMER_REAL, 0)
+    running['pid'] = None
+    # Whatever the program forked and left behind goes too
+    try:
+        os.killpg(pid, _signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+    # ru_maxrss is in kilobytes, except on macOS
+    max_rss = usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+    timed_out = int(_signal.SIGALRM in running['stopped_by'])
+    return (f"{os.waitstatus_to_exitcode(status)} {timed_out} {wall!r} "
+            f"{usage.ru_utime!r} {usage.ru_stime!r} {max_rss}\n").encode()
+
+
+def main(argv):
+    limits = [None if value == '-' else int(value) for value in argv[1:5]]
+    wall_seconds = None if argv[5] == '-' else float(argv[5])
+    executable = argv[6]
+    # SIGTERM is sandbox.stop(), SIGALRM the wall-clock limit
+    _signal.signal(_signal.SIGTERM, stop)
+    _signal.signal(_signal.SIGALRM, stop)
+
+    if argv[7] != '--serve':
+        report_fd = int(argv[7])
+        os.write(report_fd, run(executable, limits, wall_seconds, close_fd=report_fd))
+        return
+
+    folder = argv[8]
+    for line in sys.stdin.buffer:
+        base = os.path.join(folder, line.decode().strip())
+        stdio = ((base + ".in", os.O_RDONLY),
+                 (base + ".out", os.O_WRONLY | os.O_CREAT | os.O_TRUNC),
+                 (base + ".err", os.O_WRONLY | os.O_CREAT | os.O_TRUNC))
+        os.write(1, run(executable, limits, wall_seconds, stdio))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -1,21 +1,47 @@
 from PyQt5.QtWidgets import (
-    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QTextEdit, QListWidget,
-    QPushButton, QLineEdit, QMessageBox, QFileDialog, QTabWidget, QWidget, QListWidgetItem
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QListWidget,
+    QPushButton, QLineEdit, QMessageBox, QFileDialog, QTabWidget, QWidget, QListWidgetItem,
+    QProgressBar, QSplitter, QStackedWidget, QTextBrowser
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont
+import html
 import os
-import shutil
-from datetime import datetime
+
+from chat_view import ChatView
+from document_indexer import DocumentIndexer
+from file_preview import FilePreviewPane
+from study_room_watcher import StudyRoomWatcher
+from study_room_broker_client import StudyRoomBrokerClient
+from transfer_engine import TransferEngine
 
 from database import (
     create_study_room_tables,
     insert_message,
-    get_all_messages,
+    get_messages_page,
+    search_messages,
+    search_documents,
     insert_shared_file,
+    delete_shared_file,
     get_all_shared_files,
 )
 
+# Number of chat messages fetched when the room opens and per scroll-up
+CHAT_PAGE_SIZE = 50
+
+# Search results fetched per page, and the pause in typing before a search runs
+SEARCH_PAGE_SIZE = 50
+SEARCH_DELAY_MS = 250
+
+# Snippet highlight markers; control characters never appear in chat text,
+# so they survive HTML escaping and are swapped for tags afterwards
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+
+# Optional study_room_broker.py address, e.g. "tcp:127.0.0.1:8765" or
+# "unix:/tmp/study_room.sock". Without it chat goes straight to the database.
+BROKER_ADDRESS = os.environ.get("STUDY_ROOM_BROKER")
+
 class StudyRoomWindow(QDialog):
     def __init__(self, username=None):
         super().__init__()
@@ -26,12 +52,47 @@ class StudyRoomWindow(QDialog):
         # Initialize DB tables
         create_study_room_tables()
 
-        # Load persistent data
-        self.chat_history = get_all_messages()
+        # Load persistent data; older chat pages are fetched on scroll
+        self.chat_history = get_messages_page(limit=CHAT_PAGE_SIZE)
+        self.oldest_cursor = self.page_cursor(self.chat_history)
+        self.loading_older = False
         self.shared_files = get_all_shared_files()
 
+        # Uploads and downloads copy on a thread pool; these map transfer ids
+        # to what to do once each one finishes
+        self.transfers = TransferEngine(parent=self)
+        self.transfers.progress.connect(self.on_transfer_progress)
+        self.transfers.finished.connect(self.on_transfer_finished)
+        self.transfers.cancelled.connect(self.on_transfer_stopped)
+        self.transfers.failed.connect(self.on_transfer_failed)
+        self.pending_uploads = {}
+        self.pending_downloads = {}
+        self.transfer_rows = {}
+
         self.init_ui()
 
+        # Live chat through the broker when one is running
+        self.broker = None
+        if BROKER_ADDRESS:
+            client = StudyRoomBrokerClient(BROKER_ADDRESS, self)
+            if client.connect_to_broker():
+                self.broker = client
+                self.broker.message_received.connect(self.on_broker_message)
+                self.broker.disconnected.connect(self.on_broker_disconnected)
+                self.status_label.setText("Live Study Room - Connected to broker")
+
+        # Pick up messages and files from other users sharing study_room.db
+        last_message_id = self.chat_history[-1][0] if self.chat_history else 0
+        last_file_id = max((f["id"] for f in self.shared_files), default=0)
+        self.watcher = StudyRoomWatcher(last_message_id, last_file_id, self.broker is None, self)
+        self.watcher.messages_arrived.connect(self.on_messages_arrived)
+        self.watcher.files_arrived.connect(self.on_files_arrived)
+        self.watcher.start()
+
+        # Keeps the search over shared notes and file contents current
+        self.indexer = DocumentIndexer(self)
+        self.indexer.start()
+
     def init_ui(self):
         self.main_layout = QVBoxLayout()
 
@@ -56,11 +117,34 @@ class StudyRoomWindow(QDialog):
     def init_chat_tab(self):
         layout = QVBoxLayout()
 
-        self.chat_display = QTextEdit()
-        self.chat_display.setReadOnly(True)
-
-        for sender, message, timestamp in self.chat_history:
-            self.append_chat_message(sender, message, timestamp)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search messages...")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.run_search)
+        self.search_input.textChanged.connect(lambda text: self.search_timer.start())
+        self.search_cursor = None
+
+        self.chat_display = ChatView()
+        self.chat_display.prepend_messages(self.chat_history)
+        self.chat_display.verticalScrollBar().valueChanged.connect(self.on_chat_scrolled)
+
+        self.search_results = QTextBrowser()
+        self.more_results_button = QPushButton("Show More Results")
+        self.more_results_button.clicked.connect(self.load_more_results)
+        results_layout = QVBoxLayout()
+        results_layout.setContentsMargins(0, 0, 0, 0)
+        results_layout.addWidget(self.search_results)
+        results_layout.addWidget(self.more_results_button)
+        results_page = QWidget()
+        results_page.setLayout(results_layout)
+
+        # The chat, or search results while there is a query
+        self.chat_stack = QStackedWidget()
+        self.chat_stack.addWidget(self.chat_display)
+        self.chat_stack.addWidget(results_page)
 
         self.message_input = QLineEdit()
         self.message_input.setPlaceholderText("Type your message here...")
@@ -73,21 +157,74 @@ class StudyRoomWindow(QDialog):
         input_layout.addWidget(self.message_input)
         input_layout.addWidget(self.send_button)
 
-        layout.addWidget(self.chat_display)
+        layout.addWidget(self.search_input)
+        layout.addWidget(self.chat_stack)
         layout.addLayout(input_layout)
         self.chat_tab.setLayout(layout)
 
+    def run_search(self):
+        query = self.search_input.text().strip()
+        if not query:
+            self.chat_stack.setCurrentIndex(0)
+            return
+        self.search_results.clear()
+        self.search_cursor = None
+        self.chat_stack.setCurrentIndex(1)
+        self.load_more_results()
+
+    def load_more_results(self):
+        query = self.search_input.text().strip()
+        rows = search_messages(query, SEARCH_PAGE_SIZE, self.search_cursor,
+                               highlight=(HIGHLIGHT_START, HIGHLIGHT_END))
+        if not rows and self.search_cursor is None:
+            self.search_results.setHtml("<i>No messages found</i>")
+        for message_id, sender, snippet, timestamp in rows:
+            snippet = (html.escape(snippet)
+                       .replace(HIGHLIGHT_START, '<b style="background-color: #fff3a0;">')
+                       .replace(HIGHLIGHT_END, '</b>'))
+            self.search_results.append(
+                f'<span style="color: gray;">{html.escape(timestamp or "")}</span> '
+                f'<b>{html.escape(sender)}</b>: {snippet}'
+            )
+        if rows:
+            self.search_cursor = rows[-1][0]
+        self.more_results_button.setVisible(len(rows) == SEARCH_PAGE_SIZE)
+
     def init_files_tab(self):
         layout = QVBoxLayout()
 
         self.shared_files_list = QListWidget()
         for file in self.shared_files:
-            item_text = f"{file['name']} ({file['size']} KB)"
-            item = QListWidgetItem(item_text)
-            item.setData(Qt.UserRole, file["path"])
-            self.shared_files_list.addItem(item)
+            self.add_shared_file_item(file)
 
         self.shared_files_list.itemDoubleClicked.connect(self.view_file)
+        self.shared_files_list.currentItemChanged.connect(lambda current, previous: self.view_file(current))
+
+        self.preview = FilePreviewPane()
+        self.preview.open_requested.connect(self.open_externally)
+
+        self.document_search_input = QLineEdit()
+        self.document_search_input.setPlaceholderText("Search inside shared notes and files...")
+        self.document_search_input.setClearButtonEnabled(True)
+        self.document_search_timer = QTimer(self)
+        self.document_search_timer.setSingleShot(True)
+        self.document_search_timer.setInterval(SEARCH_DELAY_MS)
+        self.document_search_timer.timeout.connect(self.run_document_search)
+        self.document_search_input.textChanged.connect(lambda text: self.document_search_timer.start())
+        self.document_results = []
+
+        self.document_results_view = QTextBrowser()
+        self.document_results_view.setOpenLinks(False)
+        self.document_results_view.anchorClicked.connect(self.preview_document_result)
+
+        # The file list, or search results while there is a query
+        self.files_stack = QStackedWidget()
+        self.files_stack.addWidget(self.shared_files_list)
+        self.files_stack.addWidget(self.document_results_view)
+
+        splitter = QSplitter(Qt.Horizontal)
+        splitter.addWidget(self.files_stack)
+        splitter.addWidget(self.preview)
 
         self.upload_button = QPushButton("Upload File")
         self.upload_button.clicked.connect(self.upload_file)
@@ -95,35 +232,137 @@ class StudyRoomWindow(QDialog):
         self.download_button = QPushButton("Download Selected File")
         self.download_button.clicked.connect(self.download_file)
 
-        layout.addWidget(self.shared_files_list)
+        self.remove_button = QPushButton("Remove Selected File")
+        self.remove_button.clicked.connect(self.remove_file)
+
+        # One row per running, cancelled or failed transfer
+        self.transfers_layout = QVBoxLayout()
+
+        layout.addWidget(self.document_search_input)
+        layout.addWidget(splitter)
+        layout.addLayout(self.transfers_layout)
         layout.addWidget(self.upload_button)
         layout.addWidget(self.download_button)
+        layout.addWidget(self.remove_button)
         self.files_tab.setLayout(layout)
 
+    def run_document_search(self):
+        query = self.document_search_input.text().strip()
+        if not query:
+            self.files_stack.setCurrentIndex(0)
+            return
+        self.document_results = search_documents(query, SEARCH_PAGE_SIZE,
+                                                 highlight=(HIGHLIGHT_START, HIGHLIGHT_END))
+        parts = []
+        for number, (source, source_id, title, path, snippet) in enumerate(self.document_results):
+            snippet = (html.escape(" ".join(snippet.split()))
+                       .replace(HIGHLIGHT_START, '<b style="background-color: #fff3a0;">')
+                       .replace(HIGHLIGHT_END, '</b>'))
+            kind = "Note" if source == 'note' else "File"
+            parts.append(f'<p><a href="result:{number}">{html.escape(title)}</a> '
+                         f'<span style="color: gray;">({kind})</span><br>{snippet}</p>')
+        self.document_results_view.setHtml("".join(parts) or "<i>No notes or files found</i>")
+        self.files_stack.setCurrentIndex(1)
+
+    def preview_document_result(self, url):
+        source, source_id, title, path, _ = self.document_results[int(url.toString().split(":")[1])]
+        if os.path.exists(path):
+            self.preview.show_file(path, title)
+        else:
+            QMessageBox.warning(self, "File Not Found", "The selected file is missing.")
+
+    def add_shared_file_item(self, file):
+        item = QListWidgetItem(f"{file['name']} ({file['size']} KB)")
+        item.setData(Qt.UserRole, file["path"])
+        item.setData(Qt.UserRole + 1, file["id"])
+        item.setData(Qt.UserRole + 2, file["uploaded_by"])
+        item.setData(Qt.UserRole + 3, file["name"])
+        self.shared_files_list.addItem(item)
+
     def send_message(self):
         message = self.message_input.text().strip()
         if message:
-            insert_message(self.username, message)
-            self.append_chat_message(self.username, message)
+            # Our own message comes back from the broker or the watcher, in the
+            # same order everyone else sees it
+            if self.broker is not None:
+                self.broker.send_message(self.username, message)
+            else:
+                insert_message(self.username, message)
+                self.watcher.poke()
             self.message_input.clear()
 
     def upload_file(self):
         file_path, _ = QFileDialog.getOpenFileName(self, "Select File to Share")
         if file_path:
             file_name = os.path.basename(file_path)
-            file_size = os.path.getsize(file_path) / 1024  # Size in KB
-
-            insert_shared_file(file_name, f"{file_size:.1f}", file_path, self.username)
+            # Keep our own copy so the file survives the original moving
+            transfer_id = self.transfers.upload(file_path)
+            self.pending_uploads[transfer_id] = (file_name, file_path)
+            self.add_transfer_row(transfer_id, f"Uploading {file_name}")
 
-            item_text = f"{file_name} ({file_size:.1f} KB)"
-            item = QListWidgetItem(item_text)
-            item.setData(Qt.UserRole, file_path)
-            self.shared_files_list.addItem(item)
+    def remove_file(self):
+        selected_item = self.shared_files_list.currentItem()
+        if not selected_item:
+            QMessageBox.warning(self, "No File Selected", "Please select a file to remove.")
+            return
+        if selected_item.data(Qt.UserRole + 2) != self.username:
+            QMessageBox.warning(self, "Not Your File", "You can only remove files you shared.")
+            return
 
-            self.append_chat_message("System", f"{self.username} shared {file_name}")
+        # The stored copy is deleted only when no other share uses the same content
+        if self.preview.path == selected_item.data(Qt.UserRole):
+            self.preview.clear()
+        delete_shared_file(selected_item.data(Qt.UserRole + 1))
+        self.shared_files_list.takeItem(self.shared_files_list.row(selected_item))
+        self.indexer.poke()
+
+    def on_messages_arrived(self, messages):
+        for message_id, sender, message, timestamp in messages:
+            self.append_chat_message(sender, message, timestamp, message_id)
+
+    def on_broker_message(self, sender, message, timestamp):
+        self.append_chat_message(sender, message, timestamp)
+
+    def on_broker_disconnected(self):
+        # Fall back to polling from whatever the broker has persisted by now
+        self.broker = None
+        latest = get_messages_page(limit=1)
+        self.watcher.last_message_id = latest[-1][0] if latest else 0
+        self.watcher.watch_messages = True
+        self.watcher.poke()
+        self.status_label.setText("Persistent Study Room - Data saved between sessions")
+
+    def on_files_arrived(self, files):
+        for file in files:
+            self.add_shared_file_item(file)
+            self.append_chat_message("System", f"{file['uploaded_by']} shared {file['name']}")
+        self.indexer.poke()
+
+    def done(self, result):
+        self.watcher.stop()
+        self.indexer.stop()
+        self.preview.clear()
+        # Unfinished transfers keep their partial copies for next time
+        self.transfers.wait()
+        if self.broker is not None:
+            self.broker.disconnected.disconnect(self.on_broker_disconnected)
+            self.broker.close()
+        super().done(result)
 
     def view_file(self, item):
+        if item is None:
+            self.preview.clear()
+            return
         path = item.data(Qt.UserRole)
+        if path == self.preview.path:
+            return
+        if os.path.exists(path):
+            self.preview.show_file(path, item.data(Qt.UserRole + 3))
+        else:
+            self.preview.clear()
+            QMessageBox.warning(self, "File Not Found", "The selected file is missing.")
+
+    def open_externally(self, path):
         if os.path.exists(path):
             try:
                 os.startfile(path)  # Windows
@@ -147,16 +386,90 @@ class StudyRoomWindow(QDialog):
             QMessageBox.warning(self, "File Not Found", "The original file is missing.")
             return
 
-        save_path, _ = QFileDialog.getSaveFileName(self, "Save File As", selected_item.text().split(" (")[0])
+        save_path, _ = QFileDialog.getSaveFileName(self, "Save File As", selected_item.data(Qt.UserRole + 3))
         if save_path:
-            try:
-                shutil.copyfile(original_path, save_path)
-                QMessageBox.information(self, "Download Successful", f"File saved to:\n{save_path}")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to save file:\n{str(e)}")
-
-    def append_chat_message(self, sender, message, timestamp=None):
-        ts = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        display_time = datetime.strptime(ts, "%Y-%m-%d %H:%M:%S").strftime("%H:%M")
-        formatted_message = f"[{display_time}] <b>{sender}:</b> {message}"
-        self.chat_display.append(formatted_message)
+            transfer_id = self.transfers.download(original_path, save_path)
+            self.pending_downloads[transfer_id] = save_path
+            self.add_transfer_row(transfer_id, f"Downloading {os.path.basename(save_path)}")
+
+    def add_transfer_row(self, transfer_id, title):
+        label = QLabel(title)
+        progress_bar = QProgressBar()
+        progress_bar.setRange(0, 1000)  # Permille, since file sizes overflow an int
+        button = QPushButton("Cancel")
+        button.clicked.connect(lambda: self.toggle_transfer(transfer_id))
+
+        row = QHBoxLayout()
+        row.addWidget(label)
+        row.addWidget(progress_bar)
+        row.addWidget(button)
+        self.transfers_layout.addLayout(row)
+        self.transfer_rows[transfer_id] = (row, label, progress_bar, button, title)
+
+    def remove_transfer_row(self, transfer_id):
+        row = self.transfer_rows.pop(transfer_id)[0]
+        while row.count():
+            row.takeAt(0).widget().deleteLater()
+        self.transfers_layout.removeItem(row)
+
+    def toggle_transfer(self, transfer_id):
+        _, label, _, button, title = self.transfer_rows[transfer_id]
+        if button.text() == "Cancel":
+            self.transfers.cancel(transfer_id)
+            button.setEnabled(False)  # Until the worker stops
+        else:
+            self.transfers.resume(transfer_id)
+            label.setText(title)
+            button.setText("Cancel")
+
+    def on_transfer_progress(self, transfer_id, done, total, rate):
+        _, label, progress_bar, _, title = self.transfer_rows[transfer_id]
+        progress_bar.setValue(int(done * 1000 / total) if total else 1000)
+        label.setText(f"{title} - {rate / (1024 * 1024):.1f} MB/s")
+
+    def on_transfer_finished(self, transfer_id, result):
+        self.remove_transfer_row(transfer_id)
+        if transfer_id in self.pending_uploads:
+            file_name, file_path = self.pending_uploads.pop(transfer_id)
+            content_hash, size = result
+            file_size = size / 1024  # Size in KB
+            insert_shared_file(file_name, f"{file_size:.1f}", file_path, self.username, content_hash)
+            self.watcher.poke()
+        else:
+            save_path = self.pending_downloads.pop(transfer_id)
+            QMessageBox.information(self, "Download Successful", f"File saved to:\n{save_path}")
+
+    def on_transfer_stopped(self, transfer_id):
+        _, label, _, button, title = self.transfer_rows[transfer_id]
+        label.setText(f"{title} - paused")
+        button.setText("Resume")
+        button.setEnabled(True)
+
+    def on_transfer_failed(self, transfer_id, message):
+        self.on_transfer_stopped(transfer_id)
+        QMessageBox.critical(self, "Error", f"File transfer failed:\n{message}")
+
+    def page_cursor(self, page):
+        """Return the (timestamp, id) cursor above a page, or None when it is the last"""
+        if len(page) < CHAT_PAGE_SIZE:
+            return None
+        message_id, _, _, timestamp = page[0]
+        return (timestamp, message_id)
+
+    def on_chat_scrolled(self, value):
+        if value == self.chat_display.verticalScrollBar().minimum():
+            self.load_older_messages()
+
+    def load_older_messages(self):
+        if self.oldest_cursor is None or self.loading_older:
+            return
+        self.loading_older = True
+        try:
+            page = get_messages_page(self.oldest_cursor, CHAT_PAGE_SIZE)
+            self.oldest_cursor = self.page_cursor(page)
+            self.chat_display.prepend_messages(page)
+        finally:
+            self.loading_older = False
+
+    def append_chat_message(self, sender, message, timestamp=None, message_id=None):
+        self.chat_display.append_message(message_id, sender, message, timestamp)
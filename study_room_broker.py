@@ -0,0 +1,215 @@
+"""Optional local message broker for the Study Room.
+
+Clients connect over localhost TCP or a Unix socket and exchange
+newline-delimited JSON. Every chat message is fanned out to all connected
+clients as soon as it arrives and is persisted to study_room.db afterwards
+in batched write-behind transactions.
+
+    python study_room_broker.py --tcp 127.0.0.1:8765
+    python study_room_broker.py --unix /tmp/study_room.sock
+
+Client -> broker:  {"type": "message", "sender": "...", "message": "..."}
+Broker -> client:  {"type": "message", "sender": "...", "message": "...", "timestamp": "..."}
+
+A client may send {"type": "hello"}; the broker answers {"type": "welcome"}
+once the client is subscribed, so every later broadcast is guaranteed to
+reach it.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from db_connection import STUDY_ROOM_DB, close_connection, connection
+from db_migrations import migrate
+
+logger = logging.getLogger(__name__)
+
+# Attempts close() makes to save what is still queued
+CLOSE_FLUSH_ATTEMPTS = 5
+
+# Clients whose unsent output grows past this are disconnected rather than
+# allowed to slow down everyone else's fan-out.
+MAX_CLIENT_BACKLOG = 1024 * 1024
+
+
+def parse_address(address):
+    """Split "tcp:HOST:PORT" or "unix:PATH" into (kind, value)"""
+    kind, _, rest = address.partition(':')
+    if kind == 'tcp':
+        host, _, port = rest.rpartition(':')
+        return 'tcp', (host or '127.0.0.1', int(port))
+    if kind == 'unix':
+        return 'unix', rest
+    raise ValueError(f"Unsupported broker address: {address}")
+
+
+class StudyRoomBroker:
+    def __init__(self, db_file=STUDY_ROOM_DB, flush_interval=0.2, batch_size=1000):
+        self.db_file = db_file
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.clients = set()
+        self.pending = []
+        self.persisted = 0
+        self.server = None
+        self._flush_task = None
+        self._wake_flusher = None
+        self._closing = False
+        # One thread owns the broker's database connection
+        self._db_executor = ThreadPoolExecutor(max_workers=1)
+
+    async def start(self, address):
+        kind, value = parse_address(address)
+        await self._run_db(migrate, self.db_file)
+        if kind == 'tcp':
+            self.server = await asyncio.start_server(self.handle_client, *value)
+        else:
+            if os.path.exists(value):
+                os.remove(value)
+            self.server = await asyncio.start_unix_server(self.handle_client, value)
+        self._wake_flusher = asyncio.Event()
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        return self.server
+
+    async def close(self):
+        """Stop accepting clients, drop connections and persist everything queued"""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for writer in list(self.clients):
+            writer.close()
+        # Let the flusher finish its current batch rather than cancelling it
+        # halfway through a write
+        self._closing = True
+        if self._flush_task is not None:
+            self._wake_flusher.set()
+            await self._flush_task
+        for _ in range(CLOSE_FLUSH_ATTEMPTS):
+            if await self.flush():
+                break
+            await asyncio.sleep(self.flush_interval)
+        else:
+            logger.error("Study Room broker closed with %d message(s) not saved", len(self.pending))
+        await self._run_db(close_connection)
+        self._db_executor.shutdown()
+
+    async def handle_client(self, reader, writer):
+        self.clients.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    packet = json.loads(line)
+                except ValueError:
+                    continue
+                if packet.get('type') == 'message':
+                    self.publish(str(packet.get('sender', 'Guest')), str(packet.get('message', '')), packet)
+                elif packet.get('type') == 'hello':
+                    writer.write(b'{"type": "welcome"}\n')
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+    def publish(self, sender, message, packet=None):
+        """Fan a message out to every client now and queue it for the database"""
+        if not message:
+            return
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        out = {'type': 'message', 'sender': sender, 'message': message, 'timestamp': timestamp}
+        # Pass through client-supplied extras such as load-test send times
+        if packet and 'sent_at' in packet:
+            out['sent_at'] = packet['sent_at']
+        data = (json.dumps(out) + '\n').encode()
+        for writer in list(self.clients):
+            if writer.transport.get_write_buffer_size() > MAX_CLIENT_BACKLOG:
+                self.clients.discard(writer)
+                writer.close()
+                continue
+            writer.write(data)
+
+        self.pending.append((sender, message, timestamp))
+        if len(self.pending) >= self.batch_size:
+            self._wake_flusher.set()
+
+    async def _flush_loop(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake_flusher.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake_flusher.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write every queued message in one transaction; False if that failed"""
+        if not self.pending:
+            return True
+        batch, self.pending = self.pending, []
+        try:
+            await self._run_db(self._write_batch, batch)
+        except sqlite3.Error as e:
+            # e.g. "database is locked" under load: requeue ahead of anything
+            # published meanwhile and try again on the next tick
+            logger.warning("Saving %d Study Room message(s) failed, will retry: %s", len(batch), e)
+            self.pending[:0] = batch
+            return False
+        self.persisted += len(batch)
+        return True
+
+    def _write_batch(self, batch):
+        conn = None
+        try:
+            with connection(self.db_file) as conn:
+                conn.executemany(
+                    'INSERT INTO messages (sender, message, timestamp) VALUES (?, ?, ?)', batch
+                )
+        except sqlite3.Error:
+            # A failed commit leaves its transaction open, and a retry on top
+            # of it would insert the batch twice
+            if conn is not None and conn.in_transaction:
+                conn.rollback()
+            raise
+
+    def _run_db(self, func, *args):
+        return asyncio.get_running_loop().run_in_executor(self._db_executor, func, *args)
+
+
+async def serve(address, db_file):
+    broker = StudyRoomBroker(db_file)
+    server = await broker.start(address)
+    print(f"Study Room broker listening on {address}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await broker.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the local Study Room message broker")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--tcp', default='127.0.0.1:8765', help="HOST:PORT to listen on")
+    group.add_argument('--unix', help="Unix socket path to listen on")
+    parser.add_argument('--db', default=STUDY_ROOM_DB, help="study room database file")
+    args = parser.parse_args(argv)
+
+    address = f"unix:{args.unix}" if args.unix else f"tcp:{args.tcp}"
+    try:
+        asyncio.run(serve(address, args.db))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,51 @@
+import json
+
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtNetwork import QLocalSocket, QTcpSocket
+
+from study_room_broker import parse_address
+
+
+class StudyRoomBrokerClient(QObject):
+    """Non-blocking connection from a StudyRoomWindow to study_room_broker.py"""
+
+    message_received = pyqtSignal(str, str, str)  # sender, message, timestamp
+    disconnected = pyqtSignal()
+
+    def __init__(self, address, parent=None):
+        super().__init__(parent)
+        self.kind, self.target = parse_address(address)
+        self.socket = QTcpSocket(self) if self.kind == 'tcp' else QLocalSocket(self)
+        self.socket.readyRead.connect(self.read_packets)
+        self.socket.disconnected.connect(self.disconnected)
+
+    def connect_to_broker(self, timeout_ms=1000):
+        """Connect and return True on success; the broker runs locally so this is quick"""
+        if self.kind == 'tcp':
+            self.socket.connectToHost(*self.target)
+        else:
+            self.socket.connectToServer(self.target)
+        if not self.socket.waitForConnected(timeout_ms):
+            return False
+        self.socket.write(b'{"type": "hello"}\n')
+        return True
+
+    def send_message(self, sender, message):
+        packet = {'type': 'message', 'sender': sender, 'message': message}
+        self.socket.write((json.dumps(packet) + '\n').encode())
+
+    def read_packets(self):
+        while self.socket.canReadLine():
+            line = bytes(self.socket.readLine())
+            try:
+                packet = json.loads(line)
+            except ValueError:
+                continue
+            if packet.get('type') == 'message':
+                self.message_received.emit(packet['sender'], packet['message'], packet['timestamp'])
+
+    def close(self):
+        if self.kind == 'tcp':
+            self.socket.disconnectFromHost()
+        else:
+            self.socket.disconnectFromServer()
@@ -0,0 +1,78 @@
+import threading
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from database import get_messages_after, get_shared_files_after, get_study_room_data_version
+from db_connection import close_connection
+
+# Poll interval bounds in seconds; the interval doubles each idle poll
+MIN_POLL_INTERVAL = 0.25
+MAX_POLL_INTERVAL = 5.0
+
+
+class StudyRoomWatcher(QThread):
+    """Delivers chat messages and shared files written by other users.
+
+    Each poll costs one PRAGMA data_version read, which only changes after
+    another connection commits to study_room.db. Only then are the rows past
+    the last seen ids fetched and emitted.
+    """
+
+    messages_arrived = pyqtSignal(list)   # [(id, sender, message, timestamp), ...]
+    files_arrived = pyqtSignal(list)      # [shared file dict, ...]
+
+    def __init__(self, last_message_id=0, last_file_id=0, watch_messages=True, parent=None):
+        super().__init__(parent)
+        self.last_message_id = last_message_id
+        self.last_file_id = last_file_id
+        # Off while chat arrives through the broker instead
+        self.watch_messages = watch_messages
+        self._wake = threading.Event()
+        self._stopping = False
+
+    def poke(self):
+        """Poll immediately and reset the back-off, e.g. right after a local write"""
+        self._wake.set()
+
+    def stop(self):
+        self._stopping = True
+        self._wake.set()
+        self.wait()
+
+    def run(self):
+        interval = MIN_POLL_INTERVAL
+        data_version = None
+        try:
+            while not self._stopping:
+                poked = self._wake.is_set()
+                self._wake.clear()
+                version = get_study_room_data_version()
+                if poked or version != data_version:
+                    data_version = version
+                    if self.fetch_new_rows():
+                        interval = MIN_POLL_INTERVAL
+                    else:
+                        interval = min(interval * 2, MAX_POLL_INTERVAL)
+                else:
+                    interval = min(interval * 2, MAX_POLL_INTERVAL)
+                self._wake.wait(interval)
+        finally:
+            close_connection()
+
+    def fetch_new_rows(self):
+        """Emit rows past the last seen ids and return True if there were any"""
+        found = False
+        while self.watch_messages:
+            messages = get_messages_after(self.last_message_id)
+            if not messages:
+                break
+            self.last_message_id = messages[-1][0]
+            self.messages_arrived.emit(messages)
+            found = True
+
+        files = get_shared_files_after(self.last_file_id)
+        if files:
+            self.last_file_id = files[-1]["id"]
+            self.files_arrived.emit(files)
+            found = True
+        return found
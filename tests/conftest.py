@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_connection import close_connection
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run a test in an empty directory, where the app keeps its databases"""
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path
+    close_connection()
+
+
+@pytest.fixture
+def script(tmp_path):
+    """Make an executable shell script from its body"""
+    def make(body):
+        path = tmp_path / "program"
+        path.write_text("#!/bin/sh\n" + body)
+        os.chmod(path, 0o755)
+        return str(path)
+    return make
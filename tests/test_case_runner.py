@@ -0,0 +1,22 @@
+import threading
+
+import pytest
+
+import case_runner
+import sandbox
+from case_runner import PASSED, STOPPED, CaseBatch
+
+
+@pytest.mark.skipif(sandbox.resource is None, reason="needs the sandbox supervisor")
+def test_stopped_cases_are_not_failures(script):
+    executable = script('read value\nif [ "$value" = slow ]; then sleep 30; fi\necho "$value"\n')
+    # Imported through the module, or pytest takes TestCase for a test class
+    cases = [case_runner.TestCase("fast\n", "fast\n"), case_runner.TestCase("slow\n", "slow\n")]
+    batch = CaseBatch(executable, cases, sandbox.Limits(processes=None), workers=2)
+    results = {}
+    for index, result in batch.results():
+        results[index] = result
+        if index == 0:
+            threading.Timer(0.5, batch.stop).start()
+    assert results[0].verdict == PASSED
+    assert results[1].verdict == STOPPED
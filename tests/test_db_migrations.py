@@ -0,0 +1,16 @@
+import db_migrations
+from db_connection import STUDY_ROOM_DB, connection
+
+
+def test_migrate_is_repeatable(workdir, monkeypatch):
+    steps = db_migrations.MIGRATIONS[STUDY_ROOM_DB]
+    assert db_migrations.migrate(STUDY_ROOM_DB, target=3) == 3
+    assert db_migrations.migrate(STUDY_ROOM_DB) == len(steps)
+
+    # As if another process had just finished migrating the same file
+    monkeypatch.setattr(db_migrations, '_migrated', set())
+    assert db_migrations.migrate(STUDY_ROOM_DB) == len(steps)
+    assert db_migrations.schema_version(STUDY_ROOM_DB) == len(steps)
+    with connection(STUDY_ROOM_DB) as conn:
+        columns = [row[2] for row in conn.execute("PRAGMA index_info('idx_shared_files_timestamp')")]
+    assert columns == ['timestamp', 'name', 'size', 'path', 'uploaded_by', 'content_hash']
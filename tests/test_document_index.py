@@ -0,0 +1,21 @@
+import document_index
+from database import search_documents
+
+
+def test_sync_index_skips_documents_that_fail_to_extract(workdir, monkeypatch):
+    for name in ("bad.txt", "good.txt"):
+        (workdir / name).write_text(f"eigenvalue notes in {name}")
+    documents = [('file', 1, "bad.txt", "bad.txt", str(workdir / "bad.txt"), "hash1"),
+                 ('file', 2, "good.txt", "good.txt", str(workdir / "good.txt"), "hash2")]
+    monkeypatch.setattr(document_index, 'current_documents', lambda: iter(documents))
+
+    extract_text = document_index.extract_text
+
+    def failing_extract(path, name=None):
+        if name == "bad.txt":
+            raise AttributeError("malformed document")
+        return extract_text(path, name)
+
+    monkeypatch.setattr(document_index, 'extract_text', failing_extract)
+    assert document_index.sync_index() == (1, 0)
+    assert [row[2] for row in search_documents("eigenvalue")] == ["good.txt"]
@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+from file_transfer import PART_SUFFIX, TransferCancelled, copy_file
+
+
+def test_partial_copy_of_another_source_is_not_resumed(tmp_path):
+    first = tmp_path / "a.bin"
+    second = tmp_path / "b.bin"
+    first.write_bytes(b"A" * 4096)
+    second.write_bytes(b"B" * 4096)
+    destination = str(tmp_path / "download.bin")
+
+    with pytest.raises(TransferCancelled):
+        copy_file(str(first), destination, chunk_size=1024,
+                  cancelled=lambda: os.path.getsize(destination + PART_SUFFIX) >= 2048)
+    assert os.path.getsize(destination + PART_SUFFIX) == 2048
+
+    copy_file(str(second), destination, chunk_size=1024)
+    with open(destination, 'rb') as f:
+        assert f.read() == b"B" * 4096
+    assert not os.path.exists(destination + PART_SUFFIX)
+
+
+def test_cancelled_copy_resumes(tmp_path):
+    source = tmp_path / "a.bin"
+    source.write_bytes(bytes(range(256)) * 16)
+    destination = str(tmp_path / "download.bin")
+
+    with pytest.raises(TransferCancelled):
+        copy_file(str(source), destination, chunk_size=1024,
+                  cancelled=lambda: os.path.getsize(destination + PART_SUFFIX) >= 2048)
+    done = []
+    copy_file(str(source), destination, chunk_size=1024, progress=lambda *args: done.append(args[0]))
+    assert done[0] == 3072
+    with open(destination, 'rb') as f:
+        assert f.read() == source.read_bytes()
+    assert sorted(os.listdir(tmp_path)) == ["a.bin", "download.bin"]
@@ -0,0 +1,27 @@
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from image_pdf import BILEVEL, GRAYSCALE, PageOptions, encode_page
+
+
+@pytest.fixture
+def gray_jpeg(tmp_path):
+    path = tmp_path / "scan.jpg"
+    image = Image.new('L', (200, 100), 255)
+    image.paste(0, (20, 20, 180, 40))
+    image.save(path, 'JPEG')
+    return str(path)
+
+
+def test_gray_jpeg_passes_through_for_grayscale(gray_jpeg):
+    page = encode_page(gray_jpeg, PageOptions(color=GRAYSCALE))
+    assert page['image_filter'] == 'DCTDecode'
+    with open(gray_jpeg, 'rb') as f:
+        assert page['data'] == f.read()
+
+
+def test_gray_jpeg_is_made_bilevel(gray_jpeg):
+    page = encode_page(gray_jpeg, PageOptions(color=BILEVEL))
+    assert page['image_filter'] == 'CCITTFaxDecode'
+    assert page['bits_per_component'] == 1
@@ -0,0 +1,23 @@
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from image_pdf import PageOptions
+from image_pdf_batch import find_folders, plan_jobs, run_batch
+
+
+def test_failures_go_to_the_error_callback(tmp_path):
+    good = tmp_path / "good"
+    bad = tmp_path / "bad"
+    good.mkdir()
+    bad.mkdir()
+    Image.new('L', (32, 32), 128).save(good / "page1.png")
+    (bad / "page1.png").write_bytes(b"not an image")
+
+    jobs = plan_jobs(find_folders([str(tmp_path)]), str(tmp_path / "pdfs"))
+    reports, errors = [], []
+    converted, skipped, failed = run_batch(jobs, PageOptions(), str(tmp_path / "manifest.jsonl"), workers=1,
+                                           report=reports.append, error=errors.append)
+    assert (converted, skipped, failed) == (1, 0, 1)
+    assert len(errors) == 1 and errors[0].startswith(f"FAIL {bad}")
+    assert not any(message.startswith("FAIL") for message in reports)
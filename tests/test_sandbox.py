@@ -0,0 +1,21 @@
+import time
+
+import pytest
+
+import sandbox
+
+
+@pytest.mark.skipif(sandbox.resource is None, reason="needs the sandbox supervisor")
+def test_stop_between_runs_kills_the_next_run(script, tmp_path):
+    executable = script('read value\nif [ "$value" = slow ]; then sleep 30; fi\n')
+    worker = sandbox.Worker(executable, sandbox.Limits(processes=None), str(tmp_path))
+    try:
+        assert worker.run("1", b"fast\n").exit_code == 0
+        worker.stop()   # Nothing is running now
+        time.sleep(0.2)
+        started = time.perf_counter()
+        result = worker.run("2", b"slow\n")
+        assert time.perf_counter() - started < 10
+        assert result.exit_code is None
+    finally:
+        worker.close()
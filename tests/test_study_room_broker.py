@@ -0,0 +1,42 @@
+import asyncio
+import sqlite3
+
+from study_room_broker import StudyRoomBroker
+
+
+def test_failed_write_is_retried_in_order(workdir):
+    db_file = str(workdir / "study_room.db")
+
+    async def scenario():
+        broker = StudyRoomBroker(db_file, flush_interval=0.01)
+        await broker.start("tcp:127.0.0.1:0")
+        write_batch = broker._write_batch
+        attempts = []
+
+        def fail_once(batch):
+            attempts.append(list(batch))
+            if len(attempts) == 1:
+                raise sqlite3.OperationalError("database is locked")
+            write_batch(batch)
+
+        broker._write_batch = fail_once
+        broker.publish("ann", "one")
+        broker.publish("bob", "two")
+        assert await broker.flush() is False
+        assert [message for _, message, _ in broker.pending] == ["one", "two"]
+
+        # The flush loop is still running and picks the batch up again
+        broker.publish("cat", "three")
+        for _ in range(200):
+            if broker.persisted == 3:
+                break
+            await asyncio.sleep(0.01)
+        await broker.close()
+        return broker, attempts
+
+    broker, attempts = asyncio.run(scenario())
+    assert broker.persisted == 3
+    assert len(attempts) == 2
+    with sqlite3.connect(db_file) as conn:
+        rows = conn.execute("SELECT sender, message FROM messages ORDER BY id").fetchall()
+    assert rows == [("ann", "one"), ("bob", "two"), ("cat", "three")]
@@ -0,0 +1,12 @@
+from text_extract import pdf_text
+
+
+def test_literal_string_escapes():
+    data = b'<< /Length 40 >>\nstream\nBT (a\\(b\\)\\n\\101\\0612) Tj ET\nendstream'
+    assert pdf_text(data) == 'a(b)\nA12'
+
+
+def test_literal_non_octal_digit_escape():
+    # \8 and \9 are not octal; the backslash is ignored
+    data = b'<< /Length 20 >>\nstream\nBT (a\\9b\\8) Tj ET\nendstream'
+    assert pdf_text(data) == 'a9b8'
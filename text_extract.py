@@ -0,0 +1,181 @@
+"""Plain text from shared notes and files, for the document search index.
+
+Text, Markdown and HTML files are read directly. PDFs are read with a small
+built-in extractor that inflates content streams and collects the strings
+drawn by text operators. That covers PDFs with simple font encodings, such
+as those the app's own image and text PDF tools write. PDFs that only embed
+CID fonts or scanned pages yield little or no text.
+"""
+import os
+import re
+import zlib
+from html.parser import HTMLParser
+
+TEXT_EXTENSIONS = {'.txt', '.md', '.csv', '.log', '.rst'}
+HTML_EXTENSIONS = {'.html', '.htm'}
+PDF_EXTENSIONS = {'.pdf'}
+
+# Only this much of a file is read, and only this much text is kept
+MAX_FILE_BYTES = 64 * 1024 * 1024
+MAX_TEXT_CHARS = 2 * 1024 * 1024
+
+
+def _extension(path, name):
+    # Blob store paths have no extension, so callers pass the original name
+    return os.path.splitext(name or path)[1].lower()
+
+
+def can_extract(path, name=None):
+    extension = _extension(path, name)
+    return extension in TEXT_EXTENSIONS | HTML_EXTENSIONS | PDF_EXTENSIONS
+
+
+def extract_text(path, name=None):
+    """Return the searchable text of a file, or '' for unsupported types.
+
+    The type is taken from name's extension when given, else from path's.
+    """
+    extension = _extension(path, name)
+    with open(path, 'rb') as f:
+        data = f.read(MAX_FILE_BYTES)
+    if extension in TEXT_EXTENSIONS:
+        text = data.decode('utf-8', errors='replace')
+    elif extension in HTML_EXTENSIONS:
+        text = html_text(data.decode('utf-8', errors='replace'))
+    elif extension in PDF_EXTENSIONS:
+        text = pdf_text(data)
+    else:
+        text = ''
+    return text[:MAX_TEXT_CHARS]
+
+
+class _HTMLText(HTMLParser):
+    SKIPPED = {'script', 'style'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED:
+            self._skipping += 1
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED and self._skipping:
+            self._skipping -= 1
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.parts.append(data)
+
+
+def html_text(markup):
+    parser = _HTMLText()
+    parser.feed(markup)
+    parser.close()
+    return ' '.join(' '.join(parser.parts).split())
+
+
+# ===== PDF =====
+
+_STREAM = re.compile(rb'<<(.{0,2048}?)>>\s*stream\r?\n(.*?)\r?\nendstream', re.S)
+_TEXT_BLOCK = re.compile(rb'\bBT\b(.*?)\bET\b', re.S)
+# A literal string, hex string or array followed by a text-showing operator,
+# or a line-moving operator
+_TEXT_OP = re.compile(
+    rb'(\((?:[^()\\]|\\.|\((?:[^()\\]|\\.)*\))*\)|<[0-9A-Fa-f\s]*>|\[(?:[^\]\\]|\\.)*\])\s*(Tj|TJ|\'|")'
+    rb'|(T\*|Td\b|TD\b)',
+    re.S,
+)
+_ARRAY_PART = re.compile(rb'\((?:[^()\\]|\\.|\((?:[^()\\]|\\.)*\))*\)|<[0-9A-Fa-f\s]*>|-?\d+(?:\.\d+)?')
+_ESCAPES = {b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'\b', b'f': b'\f',
+            b'(': b'(', b')': b')', b'\\': b'\\'}
+# Kerning in a TJ array wider than this many thousandths of an em is a space
+_TJ_SPACE = 200
+
+
+def _literal(raw):
+    """Decode the body of a PDF (...) string"""
+    out = bytearray()
+    i = 0
+    while i < len(raw):
+        byte = raw[i:i + 1]
+        if byte != b'\\':
+            out += byte
+            i += 1
+            continue
+        nxt = raw[i + 1:i + 2]
+        if nxt in _ESCAPES:
+            out += _ESCAPES[nxt]
+            i += 2
+        elif nxt and nxt in b'01234567':
+            octal = re.match(rb'[0-7]{1,3}', raw[i + 1:i + 4]).group()
+            out.append(int(octal, 8) & 0xFF)
+            i += 1 + len(octal)
+        elif nxt in (b'\r', b'\n'):
+            i += 2  # Line continuation
+        else:
+            i += 1  # The backslash is ignored, as in \8 or \9
+    return bytes(out)
+
+
+def _string(token):
+    if token.startswith(b'('):
+        return _literal(token[1:-1])
+    digits = re.sub(rb'\s', b'', token[1:-1])
+    if len(digits) % 2:
+        digits += b'0'
+    return bytes.fromhex(digits.decode())
+
+
+def _decode(raw):
+    # Two-byte strings starting with a byte-order mark are UTF-16; the rest
+    # are taken as the standard single-byte encodings
+    if raw.startswith(b'\xfe\xff'):
+        return raw[2:].decode('utf-16-be', errors='replace')
+    return raw.decode('cp1252', errors='replace')
+
+
+def _content_streams(data):
+    for match in _STREAM.finditer(data):
+        header, body = match.groups()
+        if b'/Subtype' in header and b'/Image' in header:
+            continue
+        if b'/FlateDecode' in header:
+            try:
+                body = zlib.decompress(body)
+            except zlib.error:
+                continue
+        elif b'/Filter' in header:
+            continue  # Other filters are used for images and fonts
+        if b'BT' in body:
+            yield body
+
+
+def pdf_text(data):
+    """Return the text drawn by the content streams of a PDF"""
+    lines = []
+    line = []
+    for stream in _content_streams(data):
+        for block in _TEXT_BLOCK.finditer(stream):
+            for match in _TEXT_OP.finditer(block.group(1)):
+                operand, operator, move = match.groups()
+                if move is not None or operator in (b"'", b'"'):
+                    if line:
+                        lines.append(''.join(line))
+                        line = []
+                if operand is None:
+                    continue
+                if operator == b'TJ':
+                    for part in _ARRAY_PART.findall(operand[1:-1]):
+                        if part[:1] in (b'(', b'<'):
+                            line.append(_decode(_string(part)))
+                        elif -float(part) > _TJ_SPACE:
+                            line.append(' ')
+                else:
+                    line.append(_decode(_string(operand)))
+            if line:
+                lines.append(''.join(line))
+                line = []
+    return '\n'.join(lines)
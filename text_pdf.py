@@ -0,0 +1,147 @@
+"""Plain text to PDF, streamed a page at a time.
+
+Lines are set in Helvetica, one of the fonts every PDF reader has, so
+nothing is embedded. Text is encoded as Windows-1252 (WinAnsiEncoding);
+characters outside it print as "?". Long lines wrap at spaces, and words
+wider than the page are split. Word widths come from the font's metrics
+and are cached, as documents repeat the same words over and over. Only
+the page being set is held in memory, so the input can be a file object
+of any length.
+"""
+import functools
+import re
+
+from pdf_writer import StreamingPDFWriter
+
+PAGE_SIZE = (595.28, 841.89)   # A4, in points
+MARGIN = 56.69                 # 2 cm
+FONT_SIZE = 11
+LINE_SPACING = 1.3
+TAB_SIZE = 4
+
+# Lines set between progress() calls and cancelled() polls
+PROGRESS_LINES = 2000
+
+# Helvetica advance widths, in 1/1000 em, for WinAnsiEncoding codes 32-255
+# (Adobe's Helvetica.afm). Control codes are dropped before measuring.
+_WIDTHS = [0] * 32 + [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584, 0,
+    556, 0, 222, 556, 333, 1000, 556, 556, 333, 1000, 667, 333, 1000, 0, 611, 0,
+    0, 222, 222, 333, 333, 350, 556, 1000, 333, 1000, 500, 333, 944, 0, 500, 667,
+    278, 333, 556, 556, 556, 556, 260, 556, 333, 737, 370, 556, 584, 333, 737, 333,
+    400, 584, 333, 333, 333, 556, 537, 278, 333, 333, 365, 556, 834, 834, 834, 611,
+    667, 667, 667, 667, 667, 667, 1000, 722, 667, 667, 667, 667, 278, 278, 278, 278,
+    722, 722, 778, 778, 778, 778, 778, 584, 778, 722, 722, 722, 722, 667, 667, 611,
+    556, 556, 556, 556, 556, 556, 889, 500, 556, 556, 556, 556, 278, 278, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 584, 611, 556, 556, 556, 556, 500, 556, 500,
+]
+
+_CONTROL_CHARACTERS = dict.fromkeys(range(32))
+_TOKENS = re.compile(rb'[ ]+|[^ ]+')
+_SPECIAL = re.compile(rb'([\\()])')
+
+
+class ExportCancelled(Exception):
+    """Raised by write_text_pdf() when its cancelled() callback returns True"""
+
+
+@functools.lru_cache(maxsize=65536)
+def text_width(text):
+    """Width of Windows-1252 encoded text in 1/1000 em"""
+    return sum(map(_WIDTHS.__getitem__, text))
+
+
+def _split_word(word, max_width):
+    """Cut a word too wide for a line into pieces that fit"""
+    pieces = []
+    start = width = 0
+    for i, code in enumerate(word):
+        if width + _WIDTHS[code] > max_width and i > start:
+            pieces.append(word[start:i])
+            start, width = i, 0
+        width += _WIDTHS[code]
+    pieces.append(word[start:])
+    return pieces
+
+
+def wrap_line(line, max_width):
+    """Break one encoded line into pieces no wider than max_width (1/1000 em)"""
+    # Most lines fit; measure them whole, without filling the word cache
+    if sum(map(_WIDTHS.__getitem__, line)) <= max_width:
+        return [line]
+    pieces = []
+    current = []
+    width = 0
+    for token in _TOKENS.findall(line):
+        token_width = text_width(token)
+        if width + token_width <= max_width:
+            current.append(token)
+            width += token_width
+        elif token[0] == 0x20:
+            # Break at the spaces, which then take up no room on either line
+            pieces.append(b''.join(current))
+            current, width = [], 0
+        else:
+            if current:
+                pieces.append(b''.join(current).rstrip(b' '))
+            if token_width > max_width:
+                *whole, token = _split_word(token, max_width)
+                pieces.extend(whole)
+                token_width = text_width(token)
+            current, width = [token], token_width
+    if current or not pieces:
+        pieces.append(b''.join(current))
+    return pieces
+
+
+def _page_content(lines, font_size, leading, x, y):
+    content = [b'BT /F1 %.2f Tf %.2f TL %.2f %.2f Td' % (font_size, leading, x, y)]
+    for line in lines:
+        content.append(b'(%s) Tj T*' % _SPECIAL.sub(rb'\\\1', line))
+    content.append(b'ET')
+    return b'\n'.join(content)
+
+
+def write_text_pdf(lines, output_path, font_size=FONT_SIZE, page_size=PAGE_SIZE, margin=MARGIN,
+                   total_lines=None, progress=None, cancelled=None):
+    """Set lines of text into a PDF and return the number of pages.
+
+    lines may be any iterable of strings, such as an open file. Every
+    PROGRESS_LINES lines progress(lines done, total_lines) is called and
+    cancelled() is polled; a cancelled or failed export removes the partial
+    PDF.
+    """
+    page_width, page_height = page_size
+    leading = font_size * LINE_SPACING
+    lines_per_page = max(1, int((page_height - 2 * margin) // leading))
+    max_width = (page_width - 2 * margin) * 1000 / font_size
+    first_baseline = page_height - margin - font_size
+
+    with StreamingPDFWriter(output_path) as pdf:
+        resources = b'<< /Font << /F1 %d 0 R >> >>' % pdf.add_font('Helvetica')
+        page = []
+        done = 0
+        for done, line in enumerate(lines, 1):
+            line = line.rstrip('\r\n').expandtabs(TAB_SIZE).translate(_CONTROL_CHARACTERS)
+            for piece in wrap_line(line.encode('cp1252', 'replace'), max_width):
+                page.append(piece)
+                if len(page) == lines_per_page:
+                    pdf.add_page(_page_content(page, font_size, leading, margin, first_baseline),
+                                 resources, page_width, page_height, compress=True)
+                    page = []
+            if done % PROGRESS_LINES == 0:
+                if cancelled is not None and cancelled():
+                    raise ExportCancelled()
+                if progress is not None:
+                    progress(done, total_lines or done)
+        if page or pdf.page_count == 0:
+            pdf.add_page(_page_content(page, font_size, leading, margin, first_baseline),
+                         resources, page_width, page_height, compress=True)
+        if progress is not None:
+            progress(done, total_lines or done)
+        return pdf.page_count
@@ -0,0 +1,66 @@
+from PyQt5.QtCore import QObject, QRunnable, QThread, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QIcon, QImage, QPixmap
+
+from thumbnails import THUMBNAIL_SIZE, load_thumbnail
+
+
+class _ThumbnailSignals(QObject):
+    ready = pyqtSignal(str, QImage)   # image path, thumbnail
+    failed = pyqtSignal(str)          # image path
+
+
+class _ThumbnailTask(QRunnable):
+    def __init__(self, path, size, signals):
+        super().__init__()
+        self.path = path
+        self.size = size
+        self.signals = signals
+
+    def run(self):
+        # QImage, unlike QPixmap, may be built off the GUI thread
+        try:
+            image = QImage(load_thumbnail(self.path, self.size))
+        except Exception:
+            image = QImage()
+        if image.isNull():
+            self.signals.failed.emit(self.path)
+        else:
+            self.signals.ready.emit(self.path, image)
+
+
+class ThumbnailLoader(QObject):
+    """Makes icon thumbnails on a thread pool, backed by the thumbnails disk cache"""
+
+    thumbnail_ready = pyqtSignal(str, QIcon)   # image path, icon
+
+    def __init__(self, size=THUMBNAIL_SIZE, max_threads=None, parent=None):
+        super().__init__(parent)
+        self.size = size
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads or min(4, max(1, QThread.idealThreadCount())))
+        self.signals = _ThumbnailSignals(self)
+        self.signals.ready.connect(self.on_ready)
+        self.signals.failed.connect(self.on_failed)
+        self._pending = set()
+
+    def request(self, path):
+        """Queue a thumbnail of path; thumbnail_ready fires when it is made"""
+        if path not in self._pending:
+            self._pending.add(path)
+            self.pool.start(_ThumbnailTask(path, self.size, self.signals))
+
+    def clear(self):
+        """Drop queued requests that have not started yet"""
+        self.pool.clear()
+        self._pending.clear()
+
+    def wait(self, timeout_ms=-1):
+        self.clear()
+        return self.pool.waitForDone(timeout_ms)
+
+    def on_ready(self, path, image):
+        self._pending.discard(path)
+        self.thumbnail_ready.emit(path, QIcon(QPixmap.fromImage(image)))
+
+    def on_failed(self, path):
+        self._pending.discard(path)
@@ -0,0 +1,93 @@
+"""Small cached thumbnails of images, for icon lists.
+
+A thumbnail comes from the preview a camera embedded in the EXIF data when
+that is big enough, and otherwise from the image decoded at reduced size
+with draft(). Either way it is saved as a PNG under THUMBNAIL_DIR, named
+after the image's path, mtime and size, so an edited or replaced image
+gets a new one and an unchanged image is never decoded twice.
+"""
+import hashlib
+import io
+import os
+import threading
+
+from PIL import ExifTags, Image
+
+THUMBNAIL_DIR = "thumbnail_cache"
+THUMBNAIL_SIZE = 100
+
+# EXIF orientation -> the transpose that puts the image upright
+_ORIENTATIONS = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+# An embedded preview whose shape differs from the photo's by more than
+# this is letterboxed, and would show black bars
+_ASPECT_TOLERANCE = 0.02
+
+
+def cache_path(path, size=THUMBNAIL_SIZE, cache_dir=THUMBNAIL_DIR):
+    """Where the thumbnail of path, as it is on disk now, is cached"""
+    st = os.stat(path)
+    key = f"{os.path.abspath(path)}\0{st.st_mtime_ns}\0{st.st_size}\0{size}"
+    return os.path.join(cache_dir, hashlib.sha1(key.encode('utf-8', 'surrogateescape')).hexdigest() + '.png')
+
+
+def _exif_thumbnail(image, size):
+    """The camera's embedded preview, if it is big enough and the photo's shape"""
+    raw = image.info.get('exif')
+    if image.format != 'JPEG' or not raw:
+        return None
+    ifd1 = image.getexif().get_ifd(ExifTags.IFD.IFD1)
+    offset, length = ifd1.get(0x0201), ifd1.get(0x0202)
+    if not offset or not length:
+        return None
+    # Offsets count from the TIFF header, which follows b"Exif\0\0"
+    try:
+        thumb = Image.open(io.BytesIO(raw[6 + offset:6 + offset + length]))
+        thumb.load()
+    except Exception:
+        return None
+    if max(thumb.size) < size:
+        return None
+    if abs(thumb.width / thumb.height - image.width / image.height) > _ASPECT_TOLERANCE * image.width / image.height:
+        return None
+    return thumb
+
+
+def make_thumbnail(path, size=THUMBNAIL_SIZE):
+    """Return an upright RGB or RGBA image of path that fits in size x size"""
+    with Image.open(path) as image:
+        orientation = image.getexif().get(0x0112, 1)
+        thumb = _exif_thumbnail(image, size)
+        if thumb is None:
+            # JPEGs decode straight to 1/2, 1/4 or 1/8 size
+            image.draft('RGB', (size, size))
+            thumb = image
+        thumb.thumbnail((size, size))
+    if orientation in _ORIENTATIONS:
+        thumb = thumb.transpose(_ORIENTATIONS[orientation])
+    if thumb.mode not in ('RGB', 'RGBA'):
+        transparent = 'A' in thumb.mode or 'transparency' in thumb.info
+        thumb = thumb.convert('RGBA' if transparent else 'RGB')
+    return thumb
+
+
+def load_thumbnail(path, size=THUMBNAIL_SIZE, cache_dir=THUMBNAIL_DIR):
+    """Return the path of a cached PNG thumbnail of path, making it if needed"""
+    cached = cache_path(path, size, cache_dir)
+    if os.path.exists(cached):
+        return cached
+    thumb = make_thumbnail(path, size)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Written under a private name first so a reader never sees half a PNG
+    partial = f"{cached}.{os.getpid()}.{threading.get_ident()}"
+    thumb.save(partial, 'PNG')
+    os.replace(partial, cached)
+    return cached
@@ -0,0 +1,109 @@
+import itertools
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from blob_store import store_file
+from file_transfer import TransferCancelled, copy_file
+
+
+class _TransferSignals(QObject):
+    progress = pyqtSignal(int, object, object, float)   # id, done bytes, total bytes, bytes/s
+    finished = pyqtSignal(int, object)                  # id, result
+    cancelled = pyqtSignal(int)
+    failed = pyqtSignal(int, str)
+
+
+class _TransferTask(QRunnable):
+    def __init__(self, transfer_id, job, signals, cancel_event):
+        super().__init__()
+        self.transfer_id = transfer_id
+        self.job = job
+        self.signals = signals
+        self.cancel_event = cancel_event
+
+    def run(self):
+        try:
+            result = self.job(self.report_progress, self.cancel_event.is_set)
+        except TransferCancelled:
+            self.signals.cancelled.emit(self.transfer_id)
+        except Exception as e:
+            self.signals.failed.emit(self.transfer_id, str(e))
+        else:
+            self.signals.finished.emit(self.transfer_id, result)
+
+    def report_progress(self, done, total, rate):
+        self.signals.progress.emit(self.transfer_id, done, total, rate)
+
+
+class TransferEngine(QObject):
+    """Runs Study Room uploads and downloads on a thread pool.
+
+    Every transfer gets an id that the signals report against. A cancelled
+    transfer keeps its partial copy, and resume() starts it again from there.
+    """
+
+    progress = pyqtSignal(int, object, object, float)   # id, done bytes, total bytes, bytes/s
+    finished = pyqtSignal(int, object)                  # id, download path or (content_hash, size)
+    cancelled = pyqtSignal(int)
+    failed = pyqtSignal(int, str)
+
+    def __init__(self, max_threads=2, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self.signals = _TransferSignals(self)
+        self.signals.progress.connect(self.progress)
+        self.signals.finished.connect(self.on_finished)
+        self.signals.cancelled.connect(self.cancelled)
+        self.signals.failed.connect(self.on_failed)
+        self._ids = itertools.count(1)
+        self._jobs = {}
+        self._cancel_events = {}
+
+    def upload(self, path):
+        """Copy a file into the blob store; finished carries (content_hash, size)"""
+        return self._start(lambda progress, cancelled: store_file(path, progress=progress, cancelled=cancelled))
+
+    def download(self, source, destination):
+        """Copy a file to destination; finished carries the destination path"""
+        def job(progress, cancelled):
+            copy_file(source, destination, progress=progress, cancelled=cancelled)
+            return destination
+        return self._start(job)
+
+    def cancel(self, transfer_id):
+        if transfer_id in self._cancel_events:
+            self._cancel_events[transfer_id].set()
+
+    def resume(self, transfer_id):
+        """Restart a cancelled or failed transfer from its partial copy"""
+        if transfer_id in self._jobs:
+            self._run(transfer_id)
+
+    def wait(self, timeout_ms=-1):
+        """Cancel running transfers and wait for the pool to drain"""
+        for event in self._cancel_events.values():
+            event.set()
+        return self.pool.waitForDone(timeout_ms)
+
+    def _start(self, job):
+        transfer_id = next(self._ids)
+        self._jobs[transfer_id] = job
+        self._run(transfer_id)
+        return transfer_id
+
+    def _run(self, transfer_id):
+        self._cancel_events[transfer_id] = threading.Event()
+        self.pool.start(_TransferTask(transfer_id, self._jobs[transfer_id], self.signals,
+                                      self._cancel_events[transfer_id]))
+
+    def on_finished(self, transfer_id, result):
+        self._jobs.pop(transfer_id, None)
+        self._cancel_events.pop(transfer_id, None)
+        self.finished.emit(transfer_id, result)
+
+    def on_failed(self, transfer_id, message):
+        # Kept in _jobs so the transfer can still be resumed
+        self._cancel_events.pop(transfer_id, None)
+        self.failed.emit(transfer_id, message)